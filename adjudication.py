@@ -0,0 +1,125 @@
+from collections import deque
+
+# ==========================================================
+# ⚙️ AYARLAR
+# ==========================================================
+SETTINGS = {
+    "ENABLED":               True,
+    "RESIGN_RATED_HUMANS":   False,   # Puanlı insan maçlarında asla terk etme (config ile açılabilir)
+    "DRAW_OFFER_INTERVAL":   10,      # Kendi beraberlik teklifimiz en fazla N hamlede bir
+    "DEFAULTS": {
+        "resign_score":      -1000,   # cp, kendi açımızdan
+        "resign_moves":      6,       # Art arda bu kadar arama bu eşiğin altındaysa terk
+        "draw_score":        15,      # |skor| bu değerin altında ise ölü beraberlik adayı
+        "draw_moves":        10,
+        "draw_min_ply":      80,      # Erken oyunda beraberlik teklif etme
+        "accept_draw_score": -150,    # Rakip teklif ederse bu skorun altında kabul et
+        "tb_resign":         True,    # Tablebase kesin kayıp gösterirse terk et
+        "tb_draw":           True,    # Tablebase beraberlik gösterirse teklif et / kabul et
+    },
+    # Oyun türü başına farklar (bullet'ta saat zaten belirleyici, daha geç terk edilir)
+    "PER_MODE": {
+        "bullet":    {"resign_score": -1500, "resign_moves": 8},
+        "blitz":     {},
+        "rapid":     {"resign_moves": 5},
+        "classical": {"resign_moves": 4, "draw_min_ply": 60},
+        "chess960":  {},
+    },
+}
+
+MATE_SCORE = 32000
+
+# Lichess tablebase 'category' → WDL (hamle sırasındaki taraf açısından)
+# maybe-win lanetli de olabilir ama kazanç sayılır: belirsizken beraberlik verilmez
+TB_WDL = {
+    "win":          2,
+    "cursed-win":   1,
+    "maybe-win":    2,
+    "draw":         0,
+    "unknown":      None,
+    "maybe-loss":  -1,
+    "blessed-loss": -1,
+    "loss":        -2,
+}
+
+
+def load_config(config):
+    """config.yml'deki 'adjudication' bölümünü SETTINGS'e uygular."""
+    section = (config or {}).get("adjudication") or {}
+    if "enabled" in section:
+        SETTINGS["ENABLED"] = bool(section["enabled"])
+    if "resign_rated_humans" in section:
+        SETTINGS["RESIGN_RATED_HUMANS"] = bool(section["resign_rated_humans"])
+    if "draw_offer_interval" in section:
+        SETTINGS["DRAW_OFFER_INTERVAL"] = int(section["draw_offer_interval"])
+    for key in SETTINGS["DEFAULTS"]:
+        if key in section:
+            SETTINGS["DEFAULTS"][key] = section[key]
+    for mode, overrides in (section.get("time_controls") or {}).items():
+        SETTINGS["PER_MODE"].setdefault(mode, {}).update(overrides or {})
+
+
+def rules_for(mode):
+    rules = dict(SETTINGS["DEFAULTS"])
+    rules.update(SETTINGS["PER_MODE"].get(mode, {}))
+    return rules
+
+
+class GameAdjudicator:
+    """Bir oyunun skor geçmişinden terk / beraberlik kararı verir."""
+
+    def __init__(self, mode, rated, vs_human):
+        self.rules      = rules_for(mode)
+        self.may_resign = not (rated and vs_human) or SETTINGS["RESIGN_RATED_HUMANS"]
+        size            = max(self.rules["resign_moves"], self.rules["draw_moves"])
+        self.scores     = deque(maxlen=size)
+        self.wdl        = None
+        self.last_offer = None
+
+    def record(self, report):
+        """get_best_move raporundan skoru (bizim açımızdan cp) ve TB sonucunu alır."""
+        if not report:
+            return
+        # TB sonucu yalnızca raporun pozisyonu için geçerli; motor hamleleri onu siler
+        self.wdl = report.get("wdl")
+        score = report.get("score")
+        if score is not None and report.get("source") in ("engine", "cache"):
+            self.scores.append(max(-MATE_SCORE, min(MATE_SCORE, score)))
+
+    def _streak(self, n, test):
+        if n <= 0 or len(self.scores) < n:
+            return False
+        return all(test(s) for s in list(self.scores)[-n:])
+
+    def decide(self, board, opponent_offers_draw):
+        """'resign', 'accept_draw', 'claim_draw', 'offer_draw' veya None."""
+        if not SETTINGS["ENABLED"]:
+            return None
+        r   = self.rules
+        ply = len(board.move_stack)
+
+        ahead = bool(self.scores) and self.scores[-1] > r["draw_score"]
+        # can_claim_fifty_moves() 99. yarım hamlede de True; talep ancak sayaç 100 olunca geçerli
+        if not ahead and (board.is_fifty_moves() or board.is_repetition(3)):
+            return 'claim_draw'
+
+        lost = (r["tb_resign"] and self.wdl == -2) or self._streak(
+            r["resign_moves"], lambda s: s <= r["resign_score"])
+        if lost and self.may_resign:
+            return 'resign'
+
+        dead_draw = (r["tb_draw"] and self.wdl in (-1, 0, 1)) or (
+            ply >= r["draw_min_ply"]
+            and self._streak(r["draw_moves"], lambda s: abs(s) <= r["draw_score"]))
+
+        if opponent_offers_draw:
+            worse = self.scores and self.scores[-1] <= r["accept_draw_score"]
+            if dead_draw or worse or (lost and not self.may_resign):
+                return 'accept_draw'
+            return None
+
+        if dead_draw and (self.last_offer is None
+                          or ply - self.last_offer >= 2 * SETTINGS["DRAW_OFFER_INTERVAL"]):
+            self.last_offer = ply
+            return 'offer_draw'
+        return None
@@ -0,0 +1,347 @@
+import itertools
+import threading
+import time
+
+import botlog
+from matchmaking import SETTINGS as MM_SETTINGS, _TIER_NAME
+from metrics import METRICS
+
+log = botlog.get_logger("admission")
+
+# ==========================================================
+# ⚙️ AYARLAR
+# ==========================================================
+SETTINGS = {
+    "HOLD_SECONDS":     3.0,      # Slot boşken teklif bu kadar bekletilir; daha değerlisi gelebilir
+    "MAX_WAIT":         20.0,     # Slot açılmazsa bu sürenin sonunda 'later' ile reddedilir
+    "QUEUE_LIMIT":      8,        # Fazlası en düşük puanlıdan başlayarak hemen reddedilir
+    "TICK":             0.25,
+    "START_TTL":        30.0,     # gameStart gelmeyen rezervasyon bu süre sonunda sunucudan doğrulanır
+    "TIER_VALUE":       {"Elite": 1.0, "High": 0.8, "Mid": 0.55, "Low": 0.3},
+    "HUMAN_FACTOR":     0.7,      # İnsanlar yalnız casual oynar; aynı puandaki bottan az değerli
+    "RATED_BONUS":      0.3,
+    "TC_FIT_WEIGHT":    0.4,      # Kalan oturuma göre kısa oyun slotu erken bırakır, oturum sonunu taşırmaz
+    "REPEAT_PENALTY":   0.15,     # Aynı rakiple bu saat içinde oynanmış her oyun için
+}
+
+
+def estimated_duration(limit_sn, inc_sn):
+    """Oyunun kaba süre tahmini (sn): iki saat + 60 hamlelik artış."""
+    return (limit_sn * 2) + (inc_sn * 120)
+
+
+def tier_of(rating):
+    for (lo, hi), name in _TIER_NAME.items():
+        if lo <= rating < hi:
+            return name
+    return None
+
+
+class Offer:
+    __slots__ = ("ch_id", "challenge", "user", "reason", "limit", "inc", "arrived")
+
+    def __init__(self, challenge, reason):
+        tc             = challenge.get('timeControl', {})
+        self.ch_id     = challenge['id']
+        self.challenge = challenge
+        self.user      = (challenge.get('challenger') or {}).get('id', '').lower()
+        self.reason    = reason
+        self.limit     = tc.get('limit', 0)
+        self.inc       = tc.get('increment', 0)
+        self.arrived   = time.monotonic()
+
+
+class AdmissionController:
+    """Gelen meydan okumaları kısa süre kuyrukta tutar; slot boşaldıkça en değerlisini kabul eder.
+
+    Slot hesabı tek yerde yapılır: aktif oyunlar + kabul edilip gameStart'ı
+    beklenenler + Matchmaker'ın yanıt bekleyen teklifleri. Matchmaker teklif
+    göndermeden önce reserve_outgoing ile slot alır, kuyrukta kabul edilebilir
+    teklif varken hiç göndermez.
+    """
+
+    def __init__(self, client, my_id, mm, active_count, max_games, session_left,
+                 max_time_limit, min_remaining):
+        self.client         = client
+        self.my_id          = (my_id or "").lower()
+        self.mm             = mm
+        self.active_count   = active_count      # () -> aktif oyun sayısı
+        self.max_games      = max_games         # () -> MAX_PARALLEL_GAMES
+        self.session_left   = session_left      # () -> kalan oturum süresi (sn)
+        self.max_time_limit = max_time_limit
+        self.min_remaining  = min_remaining
+        self.lock           = threading.Lock()
+        self.queue          = {}                # ch_id -> Offer
+        self.accepted       = {}                # ch_id -> kabul anı (gameStart bekleniyor)
+        self.outgoing       = {}                # anahtar -> [ch_id | None, gönderim anı]
+        self.keys           = itertools.count(1)
+        self.waits          = []
+        self.values         = []
+        self.counts         = {"accepted": 0, "declined": 0, "expired": 0, "displaced": 0}
+        self.thread         = None
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+        return self
+
+    # ------------------------------------------------------
+    # Slot hesabı
+    # ------------------------------------------------------
+    def _free(self):
+        return self.max_games() - self.active_count() - len(self.accepted) - len(self.outgoing)
+
+    def free_slots(self):
+        with self.lock:
+            return self._free()
+
+    def holding(self):
+        """Kuyrukta kabul sırası bekleyen teklif var mı (Matchmaker bu sürede göndermez)."""
+        with self.lock:
+            return bool(self.queue)
+
+    def reserve_outgoing(self):
+        """Matchmaker teklifi için slot; yer yoksa None."""
+        with self.lock:
+            if self.queue or self._free() <= 0:
+                return None
+            key = next(self.keys)
+            self.outgoing[key] = [None, time.monotonic()]
+            return key
+
+    def outgoing_sent(self, key, response):
+        ch = (response or {}).get('challenge', response) or {}
+        with self.lock:
+            if key in self.outgoing:
+                self.outgoing[key][0] = ch.get('id')
+
+    def release_outgoing(self, key):
+        with self.lock:
+            self.outgoing.pop(key, None)
+
+    # ------------------------------------------------------
+    # Olaylar
+    # ------------------------------------------------------
+    def _fits_session(self, limit, inc):
+        est  = estimated_duration(limit, inc)
+        left = self.session_left()
+        if left <= est + self.min_remaining:
+            return False, f"Oturum süresi yetersiz ({int(left)}s < {int(est)}s)"
+        return True, None
+
+    def _check(self, ch):
+        tc    = ch.get('timeControl', {})
+        limit = tc.get('limit', 0)
+        ok, reason = self._fits_session(limit, tc.get('increment', 0))
+        if not ok:
+            return ok, reason
+        if limit > self.max_time_limit:
+            return False, f"Oyun çok uzun ({limit}s)"
+        if self.mm:
+            return self.mm.is_challenge_acceptable(ch)
+        return True, 'policy'
+
+    def offer(self, ch):
+        """'challenge' olayı: kesin uymayanı hemen reddeder, kalanı kuyruğa alır."""
+        challenger = (ch.get('challenger') or {}).get('id', '').lower()
+        if challenger and challenger == self.my_id:
+            return      # Kendi gönderdiğimiz teklifin yankısı
+        with self.lock:
+            if ch['id'] in self.queue or ch['id'] in self.accepted:
+                return  # Akış yeniden bağlanınca bekleyen teklifler tekrar gelir
+        ok, reason = self._check(ch)
+        if not ok:
+            self._decline(ch['id'], reason)
+            return
+        offer = Offer(ch, reason)
+        with self.lock:
+            self.queue[offer.ch_id] = offer
+            overflow = None
+            if len(self.queue) > SETTINGS["QUEUE_LIMIT"]:
+                now      = time.monotonic()
+                overflow = min(self.queue.values(), key=lambda o: self._score(o, now))
+                del self.queue[overflow.ch_id]
+                self.counts["displaced"] += 1
+        if overflow is not offer:
+            log.info(f"📥 Kuyruğa alındı: {offer.ch_id} | {reason} | "
+                     f"{offer.limit}+{offer.inc} | puan {self._score(offer, offer.arrived):.2f}")
+        if overflow is not None:
+            self._decline(overflow.ch_id, "Kuyruk dolu, daha değerli teklifler var")
+
+    def closed(self, ch_id):
+        """challengeCanceled / challengeDeclined: teklif kuyruktan, gönderilen slot rezervden düşer."""
+        with self.lock:
+            self.queue.pop(ch_id, None)
+            self.accepted.pop(ch_id, None)
+            for key, (out_id, _) in list(self.outgoing.items()):
+                if out_id == ch_id:
+                    del self.outgoing[key]
+
+    def game_started(self, game_id):
+        """gameStart: oyunu getiren rezervasyonu bırakır (oyun artık aktif sayılır).
+
+        Lichess'te oyun kimliği teklif kimliğidir. Eşleşmeyen oyun (turnuva, rövanş)
+        rezervasyonsuz gelmiştir; başka bir teklifin slotunu almaz.
+        """
+        with self.lock:
+            if self.accepted.pop(game_id, None) is not None:
+                return
+            for key, (out_id, _) in list(self.outgoing.items()):
+                if out_id == game_id:
+                    del self.outgoing[key]
+                    return
+
+    # ------------------------------------------------------
+    # Puanlama ve karar
+    # ------------------------------------------------------
+    def _score(self, offer, now):
+        ch     = offer.challenge
+        player = ch.get('challenger') or {}
+        rating = player.get('rating') or 0
+        value  = SETTINGS["TIER_VALUE"].get(tier_of(rating), 0.1)
+        if (player.get('title') or '').upper() != 'BOT':
+            value *= SETTINGS["HUMAN_FACTOR"]
+        if ch.get('rated') and MM_SETTINGS["RATED_MODE"]:
+            value += SETTINGS["RATED_BONUS"]
+        avail = self.session_left() - self.min_remaining
+        if avail > 0:
+            fit    = max(0.0, 1.0 - estimated_duration(offer.limit, offer.inc) / avail)
+            value += SETTINGS["TC_FIT_WEIGHT"] * fit
+        if self.mm:
+            with self.mm.opponent_lock:
+                played = self.mm.opponent_tracker.get(offer.user, 0)
+            value -= SETTINGS["REPEAT_PENALTY"] * played
+        # Eşit puanda önce gelen
+        return value + 0.001 * (now - offer.arrived)
+
+    def _decline(self, ch_id, detail):
+        try:
+            self.client.challenges.decline(ch_id, reason='later')
+            log.info(f"❌ Reddedildi: {ch_id} | {detail}")
+        except Exception as e:
+            log.warning(f"⚠️ Challenge işleme hatası: {e}")
+        METRICS.inc("admission_declined")
+        with self.lock:
+            self.counts["declined"] += 1
+
+    def _expire(self, now):
+        """gameStart'ı gecikmiş rezervasyonlar: oyun hâlâ başlayabiliyorsa slot tutulur.
+
+        Gönderilen teklif önce iptal edilir (sonradan kabul edilemesin); ardından oyun
+        sunucuda sürüyorsa gameStart yoldadır (akış kopmuş olabilir), rezervasyon kalır.
+        """
+        with self.lock:
+            stale = [(None, ch_id) for ch_id, t in self.accepted.items() if now - t > SETTINGS["START_TTL"]]
+            stale += [(key, out_id) for key, (out_id, t) in self.outgoing.items()
+                      if out_id and now - t > SETTINGS["START_TTL"]]
+        if not stale:
+            return
+        for key, ch_id in stale:
+            if key is not None:
+                try:
+                    self.client.challenges.cancel(ch_id)
+                except Exception:
+                    pass    # Zaten kabul / red / iptal edilmiş olabilir
+        try:
+            ongoing = {g.get('gameId') for g in self.client.games.get_ongoing(count=50)}
+        except Exception as e:
+            log.warning(f"⚠️ [Admission] Süren oyunlar alınamadı, rezervasyonlar korunuyor: {e}")
+            ongoing = None
+        with self.lock:
+            for key, ch_id in stale:
+                alive = ongoing is None or ch_id in ongoing
+                if key is None:
+                    if ch_id not in self.accepted:
+                        continue
+                    if alive:
+                        self.accepted[ch_id] = now
+                    else:
+                        del self.accepted[ch_id]
+                elif key in self.outgoing:
+                    if alive:
+                        self.outgoing[key][1] = now
+                    else:
+                        del self.outgoing[key]
+                if not alive:
+                    log.info(f"🧹 Rezervasyon bırakıldı: {ch_id} (oyun başlamadı)")
+
+    def _tick(self):
+        now = time.monotonic()
+        self._expire(now)
+        with self.lock:
+            if not self.queue:
+                return
+            offers = list(self.queue.values())
+            free   = self._free()
+
+        # Oturum ilerledikçe süre uygunluğu değişir (politika kontrolü offer'da yapıldı)
+        for offer in offers:
+            ok, reason = self._fits_session(offer.limit, offer.inc)
+            if not ok:
+                with self.lock:
+                    self.queue.pop(offer.ch_id, None)
+                self._decline(offer.ch_id, reason)
+        offers = [o for o in offers if o.ch_id in self.queue]
+        if not offers:
+            return
+
+        if free > 0 and now - min(o.arrived for o in offers) >= SETTINGS["HOLD_SECONDS"]:
+            best = max(offers, key=lambda o: self._score(o, now))
+            self._accept(best, now)
+            return
+
+        for offer in offers:
+            if now - offer.arrived >= SETTINGS["MAX_WAIT"]:
+                with self.lock:
+                    if self.queue.pop(offer.ch_id, None) is None:
+                        continue
+                    self.counts["expired"] += 1
+                METRICS.inc("admission_expired")
+                self._decline(offer.ch_id, f"Paralel maç limiti dolu ({int(now - offer.arrived)}s beklendi)")
+
+    def _accept(self, offer, now):
+        with self.lock:
+            # Slot o arada dolduysa teklif kuyrukta kalır (sonra kabul ya da MAX_WAIT'te red)
+            if offer.ch_id not in self.queue or self._free() <= 0:
+                return
+            del self.queue[offer.ch_id]
+            self.accepted[offer.ch_id] = now
+        value = self._score(offer, now)
+        wait  = now - offer.arrived
+        try:
+            self.client.challenges.accept(offer.ch_id)
+        except Exception as e:
+            with self.lock:
+                self.accepted.pop(offer.ch_id, None)
+            log.warning(f"⚠️ Challenge işleme hatası: {e}")
+            return
+        est = estimated_duration(offer.limit, offer.inc)
+        log.info(f"✅ Kabul: {offer.ch_id} | {offer.reason} | puan {value:.2f} | "
+                 f"bekleme {wait:.1f}s | Kalan: {int(self.session_left())}s | Tahmini maç: {int(est)}s")
+        METRICS.inc("admission_accepted")
+        with self.lock:
+            self.counts["accepted"] += 1
+            self.waits  = (self.waits + [wait])[-200:]
+            self.values = (self.values + [value])[-200:]
+
+    def _run(self):
+        while True:
+            try:
+                self._tick()
+            except Exception as e:
+                log.warning(f"⚠️ [Admission] Hata: {e}")
+            time.sleep(SETTINGS["TICK"])
+
+    def stats(self):
+        with self.lock:
+            waits = sorted(self.waits)
+            return {
+                "queued":     len(self.queue),
+                "accepted":   len(self.accepted),
+                "outgoing":   len(self.outgoing),
+                "free_slots": self._free(),
+                "wait_p50":   round(waits[len(waits) // 2], 2) if waits else None,
+                "value_mean": round(sum(self.values) / len(self.values), 3) if self.values else None,
+                **self.counts,
+            }
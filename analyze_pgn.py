@@ -0,0 +1,302 @@
+import argparse
+import csv
+import glob
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import time
+
+import chess
+import chess.engine
+import chess.pgn
+import yaml
+
+from engines import open_engine
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# ==========================================================
+# ⚙️ AYARLAR
+# ==========================================================
+SETTINGS = {
+    "ENGINE_PATH":     "./src/Ethereal",
+    "CONFIG_PATH":     "./config.yml",
+    "OUT_DIR":         "./analysis",
+    "WORKERS":         os.cpu_count() or 1,
+    "DEPTH":           18,
+    "NODES":           None,     # Verilirse derinlik yerine düğüm limiti
+    "MULTIPV":         3,
+    "HASH_MB":         64,       # İşçi başına; canlı oyun ayarı (512) N işçiyle çarpılırsa RAM biter
+    "PART_ROWS":       50000,    # Bu kadar satırda bir parça dosyası yazılır ve checkpoint ilerler
+    "SKIP_PLIES":      0,        # İlk N yarım hamle (kitap) analiz edilmez
+    "INFLIGHT":        4,        # İşçi başına kuyruktaki oyun; PGN akış olarak okunur, belleğe dolmaz
+}
+
+COLUMNS = ("game_key", "site", "white", "black", "ply", "fen", "played",
+           "rank", "move", "score_cp", "mate", "depth", "nodes", "pv")
+
+# İşçi sürecinin motoru (initializer'da açılır)
+_engine  = None
+_limit   = None
+_multipv = 1
+_open    = None     # Çöken motoru yeniden açmak için
+
+
+def game_key(headers, text):
+    """Oyunun kalıcı kimliği: başlık + hamle metninin özeti; Site bir URL ise oyun kimliği öne eklenir.
+
+    Site tek başına yetmez ("?", kulüp adı, "lichess.org" gibi ortak değerler çakışır).
+    """
+    digest = hashlib.sha1(text.strip().encode("utf-8")).hexdigest()[:16]
+    site   = headers.get("Site", "")
+    gid    = site.rstrip("/").rsplit("/", 1)[-1] if "://" in site else ""
+    return f"{gid}-{digest}" if gid else digest
+
+
+def _split_games(f):
+    """İkili dosyayı oyun oyun bayt dilimlerine böler; her dilim ayrı çözülür.
+
+    Metin kipinde tell()/seek() karakter değil opak çerez döndürür; ASCII dışı başlıklarda
+    dilimler kayar. Yeni oyun, hamle metni görülmüş bir oyundan sonraki ilk '[' satırıdır.
+    """
+    chunk, body = [], False
+    for line in f:
+        stripped = line.strip()
+        if stripped.startswith(b"[") and body:
+            yield b"".join(chunk)
+            chunk, body = [], False
+        elif chunk and not stripped.startswith(b"["):
+            body = True
+        chunk.append(line)
+    if chunk:
+        yield b"".join(chunk)
+
+
+def iter_games(paths):
+    """(anahtar, pgn metni) akışı; dosyalar bellekte tutulmadan oyun oyun okunur."""
+    for path in paths:
+        with open(path, "rb") as f:
+            for data in _split_games(f):
+                text    = data.decode("utf-8-sig", errors="replace")
+                headers = chess.pgn.read_headers(io.StringIO(text))
+                if headers is None:
+                    continue
+                yield game_key(headers, text), text
+
+
+def expand_inputs(inputs):
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.extend(sorted(glob.glob(os.path.join(item, "**", "*.pgn"), recursive=True)))
+        else:
+            paths.append(item)
+    return paths
+
+
+# ==========================================================
+# 🔧 İŞÇİ
+# ==========================================================
+def _init_worker(engine_path, uci_options, limit, multipv):
+    global _engine, _limit, _multipv, _open
+    _open    = lambda: open_engine(engine_path, uci_options)
+    _engine  = _open()
+    _limit   = chess.engine.Limit(**limit)
+    _multipv = multipv
+
+
+def analyse_game(task):
+    """(anahtar, satırlar, hata): motor hatası o oyuna yazılır, çöken motor yeniden açılır."""
+    global _engine
+    key = task[0]
+    try:
+        return key, _analyse_rows(task), None
+    except chess.engine.EngineError as e:
+        try:
+            _engine.quit()
+        except Exception:
+            pass
+        _engine = _open()
+        return key, [], f"{type(e).__name__}: {e}"
+    except Exception as e:
+        return key, [], f"{type(e).__name__}: {e}"
+
+
+def _analyse_rows(task):
+    """Bir oyunun tüm pozisyonlarını analiz eder; satır listesi döndürür."""
+    key, text, skip = task
+    game = chess.pgn.read_game(io.StringIO(text))
+    if game is None:
+        return []
+    board   = game.board()
+    headers = game.headers
+    rows    = []
+    for ply, move in enumerate(game.mainline_moves()):
+        if ply >= skip:
+            infos = _engine.analyse(board, _limit, multipv=_multipv, game=key)
+            fen   = board.fen()
+            for rank, info in enumerate(infos, 1):
+                score = info.get("score")
+                pov   = score.pov(board.turn) if score else None
+                pv    = info.get("pv") or []
+                rows.append((key, headers.get("Site", ""), headers.get("White", ""),
+                             headers.get("Black", ""), ply, fen, move.uci(), rank,
+                             pv[0].uci() if pv else "",
+                             pov.score() if pov is not None and not pov.is_mate() else None,
+                             pov.mate() if pov is not None and pov.is_mate() else None,
+                             info.get("depth"), info.get("nodes"),
+                             " ".join(m.uci() for m in pv)))
+        board.push(move)
+    return rows
+
+
+# ==========================================================
+# 💾 ÇIKTI VE CHECKPOINT
+# ==========================================================
+class PartWriter:
+    """Satırları parça dosyalarına yazar; parça diske inince anahtarları checkpoint'e ekler."""
+
+    def __init__(self, out_dir, part_rows):
+        self.out_dir    = out_dir
+        self.part_rows  = part_rows
+        self.checkpoint = os.path.join(out_dir, "done.txt")
+        self.failures   = os.path.join(out_dir, "failed.txt")
+        self.rows       = []
+        self.keys       = []
+        self.parts      = len(glob.glob(os.path.join(out_dir, "part-*")))
+        self.fmt        = "parquet" if pyarrow is not None else "csv"
+        os.makedirs(out_dir, exist_ok=True)
+
+    def done_keys(self):
+        try:
+            with open(self.checkpoint, "r", encoding="utf-8") as f:
+                return set(line.strip() for line in f if line.strip())
+        except FileNotFoundError:
+            return set()
+
+    def fail(self, key, error):
+        """Başarısız oyun checkpoint'e girmez (--resume tekrar dener); sebebi ayrı dosyaya yazılır."""
+        with open(self.failures, "a", encoding="utf-8") as f:
+            f.write(f"{key}\t{error}\n")
+
+    def add(self, key, rows):
+        self.rows.extend(rows)
+        self.keys.append(key)
+        if len(self.rows) >= self.part_rows:
+            self.flush()
+
+    def flush(self):
+        if not self.keys:
+            return
+        self.parts += 1
+        path = os.path.join(self.out_dir, f"part-{self.parts:05d}.{self.fmt}")
+        tmp  = path + ".tmp"
+        if self.fmt == "parquet":
+            table = pyarrow.table({c: [r[i] for r in self.rows] for i, c in enumerate(COLUMNS)})
+            pyarrow.parquet.write_table(table, tmp, compression="zstd")
+        else:
+            with open(tmp, "w", encoding="utf-8", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(COLUMNS)
+                writer.writerows(self.rows)
+        os.replace(tmp, path)
+        # Checkpoint parça dosyasından sonra: çökme olursa en fazla son parça tekrar analiz edilir
+        with open(self.checkpoint, "a", encoding="utf-8") as f:
+            f.write("\n".join(self.keys) + "\n")
+        self.rows, self.keys = [], []
+
+
+# ==========================================================
+# 🚀 CLI
+# ==========================================================
+def load_uci_options(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            config = yaml.safe_load(f) or {}
+        return dict(config.get("engine", {}).get("uci_options", {}) or {})
+    except FileNotFoundError:
+        return {}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="PGN dosyalarını motor havuzuyla toplu analiz eder")
+    parser.add_argument("inputs", nargs="+", help="PGN dosyaları veya klasörler")
+    parser.add_argument("--engine", default=SETTINGS["ENGINE_PATH"])
+    parser.add_argument("--config", default=SETTINGS["CONFIG_PATH"])
+    parser.add_argument("--out", default=SETTINGS["OUT_DIR"])
+    parser.add_argument("--workers", type=int, default=SETTINGS["WORKERS"])
+    parser.add_argument("--depth", type=int, default=SETTINGS["DEPTH"])
+    parser.add_argument("--nodes", type=int, default=SETTINGS["NODES"])
+    parser.add_argument("--multipv", type=int, default=SETTINGS["MULTIPV"])
+    parser.add_argument("--hash", type=int, default=SETTINGS["HASH_MB"])
+    parser.add_argument("--skip-plies", type=int, default=SETTINGS["SKIP_PLIES"])
+    parser.add_argument("--part-rows", type=int, default=SETTINGS["PART_ROWS"])
+    return parser.parse_args()
+
+
+def main():
+    args    = parse_args()
+    options = load_uci_options(args.config)
+    # Çekirdekler süreçlerle doyurulur: motor başına tek thread, ponder kapalı
+    options.update({"Threads": 1, "Hash": args.hash, "Ponder": False})
+    limit   = {"nodes": args.nodes} if args.nodes else {"depth": args.depth}
+
+    writer = PartWriter(args.out, args.part_rows)
+    done   = writer.done_keys()
+    paths  = expand_inputs(args.inputs)
+    tasks  = ((key, text, args.skip_plies) for key, text in iter_games(paths) if key not in done)
+
+    print(f"🔬 {len(paths)} dosya | {args.workers} işçi | {limit} | MultiPV {args.multipv} | "
+          f"çıktı: {args.out} ({writer.fmt}) | atlanan: {len(done)} oyun", flush=True)
+
+    t0, games, positions, failed = time.time(), 0, 0, 0
+    # imap_unordered üreteci baştan tüketir (tüm veritabanı belleğe); kuyruktaki iş sınırlanır
+    results  = queue.Queue()
+    window   = max(1, args.workers * SETTINGS["INFLIGHT"])
+    inflight = 0
+    with multiprocessing.Pool(args.workers, initializer=_init_worker,
+                              initargs=(args.engine, options, limit, args.multipv)) as pool:
+        try:
+            while True:
+                while inflight < window:
+                    task = next(tasks, None)
+                    if task is None:
+                        break
+                    pool.apply_async(analyse_game, (task,), callback=results.put,
+                                     error_callback=lambda e, key=task[0]: results.put(
+                                         (key, [], f"{type(e).__name__}: {e}")))
+                    inflight += 1
+                if inflight == 0:
+                    break
+                key, rows, error = results.get()
+                inflight -= 1
+                if error:
+                    failed += 1
+                    writer.fail(key, error)
+                    print(f"   ⚠️ {key}: {error}", flush=True)
+                    continue
+                writer.add(key, rows)
+                games     += 1
+                positions += len({row[4] for row in rows})
+                if games % 10 == 0:
+                    rate = positions / max(1e-6, time.time() - t0)
+                    print(f"   📊 {games} oyun | {positions} pozisyon | {rate:.1f} poz/sn", flush=True)
+        finally:
+            writer.flush()
+
+    elapsed = time.time() - t0
+    print(json.dumps({"games": games, "failed": failed, "positions": positions, "seconds": round(elapsed, 1),
+                      "positions_per_s": round(positions / max(1e-6, elapsed), 2)}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+import contextlib
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+
+# ==========================================================
+# ⚙️ AYARLAR
+# ==========================================================
+SETTINGS = {
+    "LEVEL":           os.environ.get("LOG_LEVEL", "INFO"),
+    "PATH":            os.environ.get("LOG_PATH", "./logs/bot.jsonl"),   # "" = dosya kapalı
+    "MAX_BYTES":       10 * 1024 * 1024,
+    "BACKUPS":         5,
+    "CONSOLE":         True,
+    "QUEUE_SIZE":      10000,   # Dolarsa kayıt düşürülür; hamle yolu asla beklemez
+    "SAMPLE_WINDOW":   60.0,    # Aynı satırdan gelen uyarı/hatalar bu pencerede
+    "SAMPLE_BURST":    5,       # en fazla bu kadar yazılır, gerisi sayılır
+}
+
+ROOT = "bot"
+
+# Oyun iş parçacığının bağlamı; her kayda otomatik eklenir
+_CONTEXT = contextvars.ContextVar("botlog_context", default={})
+
+# Kaydın JSON'a yazılmayan standart alanları
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+def load_config(config):
+    """config.yml'deki 'logging' bölümünü SETTINGS'e uygular."""
+    section = (config or {}).get("logging") or {}
+    for key in ("level", "path", "max_bytes", "backups", "console", "sample_window", "sample_burst"):
+        if key in section:
+            SETTINGS[key.upper()] = section[key]
+
+
+def get_logger(name):
+    return logging.getLogger(f"{ROOT}.{name}")
+
+
+@contextlib.contextmanager
+def game_context(game_id, **fields):
+    """Bu blok içindeki tüm kayıtlara game_id (ve ek alanlar) eklenir."""
+    token = _CONTEXT.set({**_CONTEXT.get(), "game_id": game_id, **fields})
+    try:
+        yield
+    finally:
+        _CONTEXT.reset(token)
+
+
+def bind(**fields):
+    """Geçerli oyun bağlamına alan ekler (rakip, tempo gibi sonradan öğrenilenler)."""
+    _CONTEXT.set({**_CONTEXT.get(), **fields})
+
+
+class ContextFilter(logging.Filter):
+    def filter(self, record):
+        ctx = _CONTEXT.get()
+        if ctx:
+            record.ctx = {**ctx, **getattr(record, "ctx", {})}
+        return True
+
+
+class ErrorSampler(logging.Filter):
+    """Aynı çağrı noktasından gelen WARNING+ kayıtları pencere başına SAMPLE_BURST ile sınırlar.
+
+    Pencere kapanınca ilk kayda bastırılan sayı 'suppressed' alanı olarak eklenir.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.lock  = threading.Lock()
+        self.sites = {}   # (dosya, satır) → [pencere başı, yazılan, bastırılan]
+
+    def filter(self, record):
+        if record.levelno < logging.WARNING:
+            return True
+        key, now = (record.pathname, record.lineno), time.monotonic()
+        with self.lock:
+            site = self.sites.get(key)
+            if site is None or now - site[0] >= SETTINGS["SAMPLE_WINDOW"]:
+                suppressed = site[2] if site else 0
+                self.sites[key] = site = [now, 0, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+            if site[1] >= SETTINGS["SAMPLE_BURST"]:
+                site[2] += 1
+                return False
+            site[1] += 1
+        return True
+
+
+class DropQueueHandler(logging.handlers.QueueHandler):
+    """Kuyruk doluysa beklemek yerine kaydı düşürür ve sayar."""
+
+    def __init__(self, q):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Mesaj burada biçimlenir; args/exc_info dinleyiciye taşınmaz
+        record.message  = record.getMessage()
+        record.msg      = record.message
+        record.args     = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        doc = {
+            "ts":     round(record.created, 3),
+            "level":  record.levelname,
+            "logger": record.name[len(ROOT) + 1:] or record.name,
+            "thread": record.threadName,
+            "msg":    record.getMessage(),
+        }
+        doc.update(getattr(record, "ctx", None) or {})
+        for key, value in vars(record).items():
+            if key not in _RESERVED and key != "ctx":
+                doc[key] = value
+        if record.exc_text:
+            doc["exc"] = record.exc_text
+        return json.dumps(doc, ensure_ascii=False, default=str)
+
+
+class ConsoleFormatter(logging.Formatter):
+    """Konsolda eski print çıktısıyla aynı görünüm: sadece mesaj."""
+
+    def format(self, record):
+        text = record.getMessage()
+        if getattr(record, "suppressed", 0):
+            text += f" (+{record.suppressed} benzer kayıt bastırıldı)"
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            text += "\n" + record.exc_text
+        return text
+
+
+_state = {"listener": None, "handler": None}
+
+
+def _console_handler():
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(ConsoleFormatter())
+    return handler
+
+
+def setup(config=None):
+    """Kuyruk tabanlı yazıcıyı başlatır; çağıranlar sadece kuyruğa kayıt bırakır."""
+    if config is not None:
+        load_config(config)
+    shutdown()
+
+    sinks = []
+    if SETTINGS["CONSOLE"]:
+        sinks.append(_console_handler())
+    if SETTINGS["PATH"]:
+        os.makedirs(os.path.dirname(os.path.abspath(SETTINGS["PATH"])), exist_ok=True)
+        rotating = logging.handlers.RotatingFileHandler(
+            SETTINGS["PATH"], maxBytes=SETTINGS["MAX_BYTES"],
+            backupCount=SETTINGS["BACKUPS"], encoding="utf-8")
+        rotating.setFormatter(JsonFormatter())
+        sinks.append(rotating)
+
+    handler = DropQueueHandler(queue.Queue(SETTINGS["QUEUE_SIZE"]))
+    handler.addFilter(ContextFilter())
+    handler.addFilter(ErrorSampler())
+    listener = logging.handlers.QueueListener(handler.queue, *sinks, respect_handler_level=False)
+    listener.start()
+
+    root = logging.getLogger(ROOT)
+    root.handlers = [handler]
+    root.setLevel(str(SETTINGS["LEVEL"]).upper())
+    root.propagate = False
+    _state.update(listener=listener, handler=handler)
+    return handler
+
+
+def shutdown():
+    """Kuyruktaki kayıtları yazar ve dinleyiciyi durdurur."""
+    listener = _state["listener"]
+    if listener is not None:
+        listener.stop()
+        _state.update(listener=None, handler=None)
+
+
+def dropped():
+    handler = _state["handler"]
+    return handler.dropped if handler else 0
+
+
+# setup() çağrılmadan (clock_sim, tek seferlik araçlar) kayıtlar doğrudan konsola gider
+_root = logging.getLogger(ROOT)
+if not _root.handlers:
+    _fallback = _console_handler()
+    _fallback.addFilter(ContextFilter())
+    _root.addHandler(_fallback)
+    _root.setLevel(logging.INFO)
+    _root.propagate = False
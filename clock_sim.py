@@ -0,0 +1,323 @@
+import argparse
+import importlib.util
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+import chess
+import chess.engine
+import chess.pgn
+import yaml
+
+from matchmaking import SETTINGS as MM_SETTINGS, _parse_tc
+
+# ==========================================================
+# ⚙️ AYARLAR
+# ==========================================================
+SETTINGS = {
+    "BOT_PATH":         os.path.join(os.path.dirname(os.path.abspath(__file__)), "lichess-bot.py"),
+    "CONFIG_PATH":      "config.yml",
+    "GAMES_PER_TC":     4,
+    "MAX_PLIES":        240,     # Sonsuz oyunlara karşı emniyet
+    "LATENCY_MS":       80,      # Sunucu + ağ gecikmesi (tek yön toplam)
+    "LATENCY_JITTER_MS": 40,
+    "REPORT_MOVE":      40,      # "40. hamlede kalan süre" ölçümü
+    "RANDOM_PLIES":     4,       # Sentetik oyunlarda rastgele açılış yarım hamlesi
+}
+
+
+def load_bot_module(path=None):
+    """lichess-bot.py dosya adında tire olduğu için importlib ile yüklenir."""
+    spec   = importlib.util.spec_from_file_location("lichess_bot", path or SETTINGS["BOT_PATH"])
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+# ==========================================================
+# ⏱️ SİMÜLE SAAT
+# ==========================================================
+class SimClock:
+    """Lichess saatini taklit eder: düşünme + gecikme düşülür, artırma hamleden sonra eklenir."""
+
+    def __init__(self, limit_sn, inc_sn):
+        self.remaining = {chess.WHITE: float(limit_sn), chess.BLACK: float(limit_sn)}
+        self.inc       = float(inc_sn)
+
+    def spend(self, color, seconds):
+        self.remaining[color] -= seconds
+        if self.remaining[color] <= 0:
+            self.remaining[color] = 0.0
+            return False
+        self.remaining[color] += self.inc
+        return True
+
+    def state(self):
+        """handle_game'in gördüğü gameState alanları (milisaniye)."""
+        inc_ms = int(self.inc * 1000)
+        return (int(self.remaining[chess.WHITE] * 1000), int(self.remaining[chess.BLACK] * 1000),
+                inc_ms, inc_ms)
+
+
+class ReplayStats:
+    def __init__(self, tc_str):
+        self.tc_str      = tc_str
+        self.games       = 0
+        self.flags       = 0
+        self.move_times  = []
+        self.left_at_40  = []
+        self.tier_counts = {'panic': 0, 'transition': 0, 'standard': 0}
+
+    def summary(self):
+        return {
+            "tc":              self.tc_str,
+            "games":           self.games,
+            "flags":           self.flags,
+            "flag_rate":       round(self.flags / self.games, 3) if self.games else 0.0,
+            "moves":           len(self.move_times),
+            "move_time_mean":  round(statistics.mean(self.move_times), 3) if self.move_times else 0.0,
+            "move_time_p50":   round(_percentile(self.move_times, 50), 3),
+            "move_time_p95":   round(_percentile(self.move_times, 95), 3),
+            "move_time_max":   round(max(self.move_times), 3) if self.move_times else 0.0,
+            "left_at_40_mean": round(statistics.mean(self.left_at_40), 2) if self.left_at_40 else None,
+            "left_at_40_min":  round(min(self.left_at_40), 2) if self.left_at_40 else None,
+            "tiers":           dict(self.tier_counts),
+        }
+
+
+# ==========================================================
+# 🎮 REPLAY HARNESS
+# ==========================================================
+class ClockReplayHarness:
+    def __init__(self, bot_module, bot, opponent=None, latency_ms=None, jitter_ms=None,
+                 max_plies=None, seed=None):
+        self.mod        = bot_module
+        self.bot        = bot
+        self.opponent   = opponent
+        self.latency    = (SETTINGS["LATENCY_MS"] if latency_ms is None else latency_ms) / 1000.0
+        self.jitter     = (SETTINGS["LATENCY_JITTER_MS"] if jitter_ms is None else jitter_ms) / 1000.0
+        self.max_plies  = max_plies or SETTINGS["MAX_PLIES"]
+        self.rng        = random.Random(seed)
+
+    def _injected_latency(self):
+        return max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+
+    def _our_move(self, board, clock, color, stats, game_id=None):
+        wtime, btime, winc, binc = clock.state()
+        my_seconds = max(0.01, clock.remaining[color] - self.mod.SETTINGS.get("LATENCY_BUFFER", 0.07))
+        stats.tier_counts[self.mod.clock_tier(my_seconds)] += 1
+
+        t0   = time.perf_counter()
+        move = self.bot.get_best_move(board, wtime, btime, winc, binc,
+                                      tc=stats.tc_str, game_id=game_id)
+        used = time.perf_counter() - t0 + self._injected_latency()
+
+        stats.move_times.append(used)
+        return move, clock.spend(color, used)
+
+    def _opponent_move(self, board, clock, color):
+        wtime, btime, winc, binc = clock.state()
+        limit = chess.engine.Limit(
+            white_clock=wtime / 1000.0, black_clock=btime / 1000.0,
+            white_inc=winc / 1000.0, black_inc=binc / 1000.0,
+        )
+        t0     = time.perf_counter()
+        result = self.opponent.play(board, limit)
+        clock.spend(color, time.perf_counter() - t0)
+        return result.move
+
+    def _finish_game(self, flagged, left_at_40, stats):
+        stats.games += 1
+        if flagged:
+            stats.flags += 1
+        if left_at_40 is not None:
+            stats.left_at_40.append(left_at_40)
+
+    def play_synthetic(self, tc_str, our_color, stats, random_plies=0):
+        limit_sn, inc_sn = _parse_tc(tc_str)
+        clock     = SimClock(limit_sn, inc_sn)
+        board     = chess.Board()
+        game_id   = f"sim-{tc_str}-{stats.games}"
+        # Aynı motorlar deterministik oynamasın diye birkaç rastgele açılış yarım hamlesi
+        for _ in range(random_plies):
+            legal = list(board.legal_moves)
+            if not legal:
+                break
+            board.push(self.rng.choice(legal))
+        our_moves = 0
+        left_40   = None
+        flagged   = False
+
+        while not board.is_game_over(claim_draw=True) and len(board.move_stack) < self.max_plies:
+            if board.turn == our_color:
+                move, alive = self._our_move(board, clock, our_color, stats, game_id)
+                if not alive:
+                    flagged = True
+                    break
+                our_moves += 1
+                if our_moves == SETTINGS["REPORT_MOVE"]:
+                    left_40 = clock.remaining[our_color]
+            else:
+                move = self._opponent_move(board, clock, not our_color)
+                if clock.remaining[not our_color] <= 0:
+                    break
+            if move is None or move not in board.legal_moves:
+                break
+            board.push(move)
+
+        self.bot.forget(game_id)
+        self._finish_game(flagged, left_40, stats)
+
+    def replay_recorded(self, game, tc_str, our_color, stats):
+        """Kayıtlı partinin hamleleri oynanır; bizim sıramızda sadece düşünme süresi ölçülür."""
+        limit_sn, inc_sn = _parse_tc(tc_str)
+        clock     = SimClock(limit_sn, inc_sn)
+        board     = game.board()
+        game_id   = f"replay-{tc_str}-{stats.games}"
+        our_moves = 0
+        left_40   = None
+        flagged   = False
+
+        for node in game.mainline():
+            if len(board.move_stack) >= self.max_plies:
+                break
+            if board.turn == our_color:
+                _, alive = self._our_move(board, clock, our_color, stats, game_id)
+                if not alive:
+                    flagged = True
+                    break
+                our_moves += 1
+                if our_moves == SETTINGS["REPORT_MOVE"]:
+                    left_40 = clock.remaining[our_color]
+            else:
+                recorded = node.clock()
+                if recorded is not None:
+                    clock.remaining[not our_color] = max(0.01, float(recorded))
+            board.push(node.move)
+
+        self.bot.forget(game_id)
+        self._finish_game(flagged, left_40, stats)
+
+
+def _read_pgn_games(path, limit=None):
+    games = []
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        while limit is None or len(games) < limit:
+            game = chess.pgn.read_game(f)
+            if game is None:
+                break
+            games.append(game)
+    return games
+
+
+def _print_report(rows, latency_ms, jitter_ms):
+    print(f"\n📊 Saat Simülasyonu | Gecikme: {latency_ms}±{jitter_ms}ms")
+    print(f"{'TC':>8} {'Oyun':>5} {'Flag%':>6} {'Ort.sn':>7} {'p95sn':>7} {'Max sn':>7} "
+          f"{'40.hamle':>9}  Kademeler")
+    for r in rows:
+        left = "-" if r["left_at_40_mean"] is None else f"{r['left_at_40_mean']:.1f}"
+        print(f"{r['tc']:>8} {r['games']:>5} {r['flag_rate'] * 100:>5.1f}% "
+              f"{r['move_time_mean']:>7.3f} {r['move_time_p95']:>7.3f} {r['move_time_max']:>7.3f} "
+              f"{left:>9}  {r['tiers']}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="get_best_move zaman yönetimini simüle saat ile çevrimdışı test eder."
+    )
+    parser.add_argument("--engine", default=None, help="Motor yolu (varsayılan: bot ENGINE_PATH)")
+    parser.add_argument("--opponent-engine", default=None, help="Rakip motor yolu (varsayılan: aynı motor)")
+    parser.add_argument("--tc", action="append", help="Test edilecek TC (örn. 60+1). Varsayılan: TC_ALL")
+    parser.add_argument("--games", type=int, default=SETTINGS["GAMES_PER_TC"], help="TC başına oyun")
+    parser.add_argument("--pgn", default=None, help="Kayıtlı oyunları bu PGN'den tekrar oynat")
+    parser.add_argument("--latency-ms", type=float, default=SETTINGS["LATENCY_MS"])
+    parser.add_argument("--jitter-ms", type=float, default=SETTINGS["LATENCY_JITTER_MS"])
+    parser.add_argument("--latency-buffer", type=float, default=None, help="LATENCY_BUFFER (sn)")
+    parser.add_argument("--panic-threshold", type=float, default=None, help="PANIC_TIME_THRESHOLD (sn)")
+    parser.add_argument("--safe-threshold", type=float, default=None, help="SAFE_TIME_THRESHOLD (sn)")
+    parser.add_argument("--online-tablebase", action="store_true", help="Online tablebase sorgularını aç")
+    parser.add_argument("--clock-panic", action="store_true",
+                        help="Panikte düğüm bütçesi yerine eski sahte saat yöntemini kullan")
+    parser.add_argument("--position-cache", action="store_true", help="Kalıcı pozisyon önbelleğini kullan")
+    parser.add_argument("--random-plies", type=int, default=SETTINGS["RANDOM_PLIES"])
+    parser.add_argument("--max-plies", type=int, default=SETTINGS["MAX_PLIES"])
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", default=None, help="Sonuçları JSON olarak bu dosyaya yaz")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    mod  = load_bot_module()
+
+    if args.latency_buffer is not None:
+        mod.SETTINGS["LATENCY_BUFFER"] = args.latency_buffer
+    if args.panic_threshold is not None:
+        mod.SETTINGS["PANIC_TIME_THRESHOLD"] = args.panic_threshold
+    if args.safe_threshold is not None:
+        mod.SETTINGS["SAFE_TIME_THRESHOLD"] = args.safe_threshold
+    mod.SETTINGS["ONLINE_TABLEBASE_ENABLED"] = args.online_tablebase
+    mod.SETTINGS["POSITION_CACHE_ENABLED"]   = args.position_cache
+    mod.SETTINGS["NODE_BUDGET_PANIC"]        = not args.clock_panic
+
+    uci_options = {}
+    if os.path.exists(SETTINGS["CONFIG_PATH"]):
+        with open(SETTINGS["CONFIG_PATH"], "r", encoding="utf-8") as f:
+            config = yaml.safe_load(f) or {}
+        uci_options = config.get('engine', {}).get('uci_options', {}) or {}
+
+    engine_path = args.engine or mod.SETTINGS["ENGINE_PATH"]
+    bot         = mod.OxydanV11(engine_path, uci_options=uci_options, pool_size=1)
+    opponent    = chess.engine.SimpleEngine.popen_uci(args.opponent_engine or engine_path, timeout=30)
+
+    harness = ClockReplayHarness(mod, bot, opponent, args.latency_ms, args.jitter_ms,
+                                 args.max_plies, args.seed)
+    recorded = _read_pgn_games(args.pgn) if args.pgn else None
+
+    rows = []
+    try:
+        for tc_str in args.tc or MM_SETTINGS["TC_ALL"]:
+            stats = ReplayStats(tc_str)
+            for i in range(args.games):
+                our_color = chess.WHITE if i % 2 == 0 else chess.BLACK
+                if recorded:
+                    harness.replay_recorded(recorded[i % len(recorded)], tc_str, our_color, stats)
+                else:
+                    harness.play_synthetic(tc_str, our_color, stats, args.random_plies)
+                print(f"   [{tc_str}] oyun {i + 1}/{args.games} | flag: {stats.flags}", flush=True)
+            rows.append(stats.summary())
+    finally:
+        opponent.quit()
+        bot.close()
+
+    _print_report(rows, args.latency_ms, args.jitter_ms)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "latency_ms":      args.latency_ms,
+                "jitter_ms":       args.jitter_ms,
+                "latency_buffer":  mod.SETTINGS["LATENCY_BUFFER"],
+                "panic_threshold": mod.SETTINGS["PANIC_TIME_THRESHOLD"],
+                "safe_threshold":  mod.SETTINGS["SAFE_TIME_THRESHOLD"],
+                "results":         rows,
+                "latency":         mod.LATENCY.snapshot(),
+                "node_budget":     bot.node_budget.stats(),
+            }, f, indent=2)
+
+    return 1 if any(r["flags"] for r in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+import math
+import random
+import threading
+import time
+
+import botlog
+
+log = botlog.get_logger("deadlines")
+
+# ==========================================================
+# ⚙️ AYARLAR
+# ==========================================================
+SETTINGS = {
+    "TICK_SECONDS":    0.25,    # Zamanlayıcı çözünürlüğü
+    "WHEEL_SLOTS":     512,     # 512 × 0.25 sn = 128 sn'lik tur
+    "STALL_GRACE":     30.0,    # Sıradakinin saati bittikten sonra olay beklenen ek süre
+    "STALL_RECHECK":   30.0,    # Oyun hâlâ sürüyorsa tekrar kontrol aralığı
+
+    # Akış yeniden bağlanma: ilk deneme hemen, sonra BASE·2^n (en fazla CAP), JITTER oranında rastgele kısaltma
+    "RECONNECT_BASE":      0.5,
+    "RECONNECT_CAP":       15.0,
+    "RECONNECT_JITTER":    0.5,
+    "RECONNECT_GIVE_UP":   300.0,   # Bu kadar süre bağlanılamazsa oyun akışı bırakılır
+    "RATE_LIMIT_WAIT":     60.0,    # 429 sonrası Lichess'in istediği bekleme
+}
+
+# Yeniden denemenin anlamsız olduğu HTTP durumları
+PERMANENT_STATUS = (401, 403, 404)
+
+
+class Timer:
+    __slots__ = ("fn", "args", "rounds", "cancelled")
+
+    def __init__(self, fn, args, rounds):
+        self.fn        = fn
+        self.args      = args
+        self.rounds    = rounds
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class TimerWheel:
+    """Tüm oyunların son tarihlerini tek iş parçacığında tutan hashed timer wheel.
+
+    Ekleme ve iptal O(1); her tikte sadece o yuvadaki zamanlayıcılara bakılır.
+    Geri çağrılar wheel iş parçacığında çalışır, bu yüzden kısa olmalıdır
+    (oyun kuyruğuna olay bırakmak gibi).
+    """
+
+    def __init__(self, tick=None, slots=None):
+        self.tick   = tick or SETTINGS["TICK_SECONDS"]
+        self.slots  = [[] for _ in range(slots or SETTINGS["WHEEL_SLOTS"])]
+        self.cursor = 0
+        self.lock   = threading.Lock()
+        self.thread = None
+
+    def start(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+        return self
+
+    def schedule(self, delay, fn, *args):
+        # +1: içinde bulunulan tik yarım kalmış olabilir, erken tetiklenmesin
+        ticks = int(math.ceil(delay / self.tick)) + 1
+        with self.lock:
+            rounds, offset = divmod(ticks, len(self.slots))
+            if not offset:
+                rounds -= 1   # İmlecin kendi yuvası: bir tam tur sonra ziyaret edilir
+            timer = Timer(fn, args, rounds)
+            self.slots[(self.cursor + offset) % len(self.slots)].append(timer)
+        return timer
+
+    def _advance(self):
+        with self.lock:
+            self.cursor = (self.cursor + 1) % len(self.slots)
+            slot, due   = self.slots[self.cursor], []
+            keep        = []
+            for timer in slot:
+                if timer.cancelled:
+                    continue
+                if timer.rounds:
+                    timer.rounds -= 1
+                    keep.append(timer)
+                else:
+                    due.append(timer)
+            self.slots[self.cursor] = keep
+        return due
+
+    def _run(self):
+        next_tick = time.monotonic() + self.tick
+        while True:
+            time.sleep(max(0.0, next_tick - time.monotonic()))
+            next_tick += self.tick
+            for timer in self._advance():
+                if timer.cancelled:
+                    continue
+                try:
+                    timer.fn(*timer.args)
+                except Exception as e:
+                    log.warning(f"⚠️ [Deadline] Zamanlayıcı hatası: {e}")
+
+
+class GameDeadlines:
+    """Bir oyunun tür başına tek son tarihi; süresi dolan tür oyun kuyruğuna olay olarak düşer."""
+
+    def __init__(self, wheel, events):
+        self.wheel  = wheel
+        self.events = events
+        self.timers = {}
+
+    def arm(self, kind, delay):
+        self.disarm(kind)
+        event = {"type": "deadline", "kind": kind}
+        self.timers[kind] = (self.wheel.schedule(max(0.0, delay), self.events.put, event), event)
+
+    def disarm(self, kind):
+        entry = self.timers.pop(kind, None)
+        if entry is not None:
+            entry[0].cancel()
+
+    def take(self, event):
+        """Olay bu türün hâlâ geçerli son tarihi mi? (iptalden önce kuyruğa düşmüş olabilir)"""
+        entry = self.timers.get(event.get("kind"))
+        if entry is None or entry[1] is not event:
+            return False
+        del self.timers[event["kind"]]
+        return True
+
+    def clear(self):
+        for kind in list(self.timers):
+            self.disarm(kind)
+
+
+class Backoff:
+    """Jitterlı üstel bekleme; aynı anda kopan akışlar sunucuya birlikte yüklenmesin."""
+
+    def __init__(self, base=None, cap=None, jitter=None):
+        self.base    = base or SETTINGS["RECONNECT_BASE"]
+        self.cap     = cap or SETTINGS["RECONNECT_CAP"]
+        self.jitter  = SETTINGS["RECONNECT_JITTER"] if jitter is None else jitter
+        self.attempt = 0
+
+    def next(self, error=None):
+        n = self.attempt
+        self.attempt += 1
+        if getattr(error, "status_code", None) == 429:
+            return SETTINGS["RATE_LIMIT_WAIT"]
+        if n == 0:
+            return 0.0
+        delay = min(self.cap, self.base * 2 ** (n - 1))
+        return delay * random.uniform(1.0 - self.jitter, 1.0)
+
+    def reset(self):
+        self.attempt = 0
+
+
+def pump_stream(open_stream, events, stop, backoff=None):
+    """Oyun akışını kuyruğa aktarır; koparsa open_stream() ile yeniden açar.
+
+    Kopunca 'streamLost', yeni akıştan ilk olay gelince 'streamResumed' (kopukluk
+    süresiyle) bırakılır. Yeni akış gameFull ile başladığı için tahta ve saatler
+    oradan senkronlanır. Kalıcı hata veya RECONNECT_GIVE_UP aşılırsa 'streamEnd'.
+    """
+    backoff = backoff or Backoff()
+    lost_at = None
+    while not stop.is_set():
+        error = None
+        try:
+            for state in open_stream():
+                if stop.is_set():
+                    return
+                if lost_at is not None:
+                    events.put({"type": "streamResumed", "lost_for": time.monotonic() - lost_at,
+                                "attempts": backoff.attempt})
+                    lost_at = None
+                    backoff.reset()
+                events.put(state)
+        except Exception as e:
+            error = e
+            if getattr(e, "status_code", None) in PERMANENT_STATUS:
+                events.put({"type": "streamEnd", "error": f"{type(e).__name__}: {e}"})
+                return
+        if stop.is_set():
+            return
+        # Hatasız bitiş de kopuş sayılır: oyun bittiyse sonuç olayı zaten kuyrukta
+        reason = f"{type(error).__name__}: {error}" if error else "akış kapandı"
+        if lost_at is None:
+            lost_at = time.monotonic()
+            events.put({"type": "streamLost", "reason": reason})
+        elif time.monotonic() - lost_at > SETTINGS["RECONNECT_GIVE_UP"]:
+            events.put({"type": "streamEnd", "error": reason})
+            return
+        stop.wait(backoff.next(error))
+
+
+def queued_events(events):
+    while True:
+        yield events.get()
+
+
+DEADLINES = TimerWheel()
@@ -0,0 +1,398 @@
+import time
+
+import chess
+
+# ==========================================================
+# ⚙️ AYARLAR
+# ==========================================================
+SETTINGS = {
+    "MIN_BUDGET":    0.02,    # Arama süresi alt sınırı (sn)
+    "MAX_BUDGET":    1.5,     # Motor çöktüyse bile bundan uzun düşünme
+    "CLOCK_SHARE":   1 / 40,  # Kalan sürenin hamle başına payı
+    "INC_SHARE":     0.5,     # Artırmanın hamle başına payı
+    "HARD_SHARE":    0.25,    # Kalan sürenin asla aşılmayacak oranı
+    "MAX_DEPTH":     32,
+    "CHECK_EVERY":   1023,    # Saat kontrolü kaç düğümde bir (2^n - 1)
+}
+
+# 10x12 mailbox: a1 = 21, h8 = 98; kenar kareleri OFF
+OFF   = 7
+EMPTY = 0
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = 1, 2, 3, 4, 5, 6
+
+MATE     = 30000
+INF      = 10**6
+VALUES   = (0, 100, 320, 330, 500, 900, 0)
+
+N_STEPS  = (-21, -19, -12, -8, 8, 12, 19, 21)
+B_DIRS   = (-11, -9, 9, 11)
+R_DIRS   = (-10, -1, 1, 10)
+K_STEPS  = B_DIRS + R_DIRS
+PROMOS   = (QUEEN, KNIGHT, ROOK, BISHOP)
+
+# Hamle kodu: from | to << 7 | terfi << 14 | tür << 17
+NORMAL, EN_PASSANT, CASTLE, DOUBLE = 0, 1, 2, 3
+
+SQUARES   = [21 + (s & 7) + 10 * (s >> 3) for s in range(64)]
+TO_CHESS  = {m: s for s, m in enumerate(SQUARES)}
+
+# Hamlenin kalkış/varış karesine göre kalan rok hakları (1 WK, 2 WQ, 4 BK, 8 BQ)
+CASTLE_MASK = [15] * 120
+CASTLE_MASK[25], CASTLE_MASK[28], CASTLE_MASK[21] = 12, 14, 13
+CASTLE_MASK[95], CASTLE_MASK[98], CASTLE_MASK[91] = 3, 11, 7
+
+
+def _center_bonus(sq, weight):
+    f, r = sq % 10 - 1, sq // 10 - 2
+    return weight * (6 - (abs(2 * f - 7) + abs(2 * r - 7)) // 2)
+
+
+def _build_values():
+    """VAL[parça + 6][kare]: beyaz açısından işaretli materyal + basit konum puanı."""
+    table = [[0] * 120 for _ in range(13)]
+    for sq in SQUARES:
+        rank = sq // 10 - 2
+        for piece in range(1, 7):
+            for color, rel_rank in ((1, rank), (-1, 7 - rank)):
+                v = VALUES[piece]
+                if piece == PAWN:
+                    v += (rel_rank - 1) * 6 + (_center_bonus(sq, 2) if 2 <= rel_rank <= 4 else 0)
+                elif piece in (KNIGHT, BISHOP):
+                    v += _center_bonus(sq, 4)
+                elif piece == QUEEN:
+                    v += _center_bonus(sq, 1)
+                elif piece == KING:
+                    v += -_center_bonus(sq, 3) if rel_rank <= 1 else -20
+                table[color * piece + 6][sq] = color * v
+    return table
+
+
+VAL = _build_values()
+
+
+class _Timeout(Exception):
+    pass
+
+
+class Position:
+    """python-chess nesnesi üretmeden hamle yapıp geri alınabilen kompakt konum."""
+
+    __slots__ = ("b", "side", "castle", "ep", "kings", "score", "castling_ok", "undo")
+
+    def __init__(self, board):
+        self.b = [OFF] * 120
+        for sq in SQUARES:
+            self.b[sq] = EMPTY
+        self.kings = {1: 0, -1: 0}
+        self.score = 0
+        for s, piece in board.piece_map().items():
+            code = piece.piece_type * (1 if piece.color == chess.WHITE else -1)
+            sq   = SQUARES[s]
+            self.b[sq] = code
+            self.score += VAL[code + 6][sq]
+            if piece.piece_type == KING:
+                self.kings[1 if piece.color == chess.WHITE else -1] = sq
+
+        self.side   = 1 if board.turn == chess.WHITE else -1
+        self.ep     = SQUARES[board.ep_square] if board.ep_square is not None else 0
+        self.castle = 0
+        # 960'ta rok kuralları farklı; acil aramada orada rok üretilmez
+        self.castling_ok = not board.chess960
+        if self.castling_ok:
+            rights = board.castling_rights
+            for bit, sq in ((1, chess.H1), (2, chess.A1), (4, chess.H8), (8, chess.A8)):
+                if rights & chess.BB_SQUARES[sq]:
+                    self.castle |= bit
+        self.undo = []
+
+    # ------------------------------------------------------
+    def attacked(self, sq, by):
+        b = self.b
+        if by == 1:
+            if b[sq - 9] == PAWN or b[sq - 11] == PAWN:
+                return True
+        elif b[sq + 9] == -PAWN or b[sq + 11] == -PAWN:
+            return True
+        knight, king = KNIGHT * by, KING * by
+        for o in N_STEPS:
+            if b[sq + o] == knight:
+                return True
+        for o in K_STEPS:
+            if b[sq + o] == king:
+                return True
+        bishop, rook, queen = BISHOP * by, ROOK * by, QUEEN * by
+        for o in B_DIRS:
+            t = sq + o
+            while b[t] == EMPTY:
+                t += o
+            if b[t] == bishop or b[t] == queen:
+                return True
+        for o in R_DIRS:
+            t = sq + o
+            while b[t] == EMPTY:
+                t += o
+            if b[t] == rook or b[t] == queen:
+                return True
+        return False
+
+    def in_check(self, side=None):
+        side = self.side if side is None else side
+        return self.attacked(self.kings[side], -side)
+
+    # ------------------------------------------------------
+    def moves(self, captures_only=False):
+        """Yarı yasal hamleler (şahı açıkta bırakanlar make() sonrası elenir)."""
+        b, s, out = self.b, self.side, []
+        add = out.append
+        for sq in SQUARES:
+            p = b[sq] * s
+            if p <= 0:
+                continue
+            if p == PAWN:
+                fwd  = 10 * s
+                last = (sq + fwd) // 10 in (2, 9)
+                for t in (sq + fwd - 1, sq + fwd + 1):
+                    c = b[t]
+                    if c != OFF and c * s < 0:
+                        if last:
+                            for pr in PROMOS:
+                                add(sq | t << 7 | pr << 14)
+                        else:
+                            add(sq | t << 7)
+                    elif t == self.ep and self.ep:
+                        add(sq | t << 7 | EN_PASSANT << 17)
+                t = sq + fwd
+                if b[t] == EMPTY:
+                    if last:
+                        for pr in (PROMOS[:1] if captures_only else PROMOS):
+                            add(sq | t << 7 | pr << 14)
+                    elif not captures_only:
+                        add(sq | t << 7)
+                        start = sq // 10 == (3 if s == 1 else 8)
+                        if start and b[t + fwd] == EMPTY:
+                            add(sq | (t + fwd) << 7 | DOUBLE << 17)
+            elif p == KNIGHT or p == KING:
+                for o in (N_STEPS if p == KNIGHT else K_STEPS):
+                    t = sq + o
+                    c = b[t]
+                    if c == OFF or c * s > 0:
+                        continue
+                    if c or not captures_only:
+                        add(sq | t << 7)
+            else:
+                dirs = B_DIRS if p == BISHOP else R_DIRS if p == ROOK else K_STEPS
+                for o in dirs:
+                    t = sq + o
+                    while True:
+                        c = b[t]
+                        if c == OFF or c * s > 0:
+                            break
+                        if c or not captures_only:
+                            add(sq | t << 7)
+                        if c:
+                            break
+                        t += o
+
+        if not captures_only and self.castle and self.castling_ok:
+            home = 25 if s == 1 else 95
+            k_bit, q_bit = (1, 2) if s == 1 else (4, 8)
+            if b[home] == KING * s and not self.attacked(home, -s):
+                if (self.castle & k_bit and b[home + 1] == EMPTY and b[home + 2] == EMPTY
+                        and b[home + 3] == ROOK * s
+                        and not self.attacked(home + 1, -s) and not self.attacked(home + 2, -s)):
+                    add(home | (home + 2) << 7 | CASTLE << 17)
+                if (self.castle & q_bit and b[home - 1] == EMPTY and b[home - 2] == EMPTY
+                        and b[home - 3] == EMPTY and b[home - 4] == ROOK * s
+                        and not self.attacked(home - 1, -s) and not self.attacked(home - 2, -s)):
+                    add(home | (home - 2) << 7 | CASTLE << 17)
+        return out
+
+    def make(self, m):
+        b, s = self.b, self.side
+        frm, to = m & 127, (m >> 7) & 127
+        promo, kind = (m >> 14) & 7, m >> 17
+        piece, captured = b[frm], b[to]
+        self.undo.append((m, piece, captured, self.castle, self.ep, self.score))
+
+        score = self.score - VAL[piece + 6][frm]
+        if captured:
+            score -= VAL[captured + 6][to]
+        if kind == EN_PASSANT:
+            cap_sq = to - 10 * s
+            score -= VAL[b[cap_sq] + 6][cap_sq]
+            b[cap_sq] = EMPTY
+        elif kind == CASTLE:
+            r_from, r_to = (frm + 3, frm + 1) if to > frm else (frm - 4, frm - 1)
+            rook = b[r_from]
+            score += VAL[rook + 6][r_to] - VAL[rook + 6][r_from]
+            b[r_to], b[r_from] = rook, EMPTY
+
+        placed = promo * s if promo else piece
+        b[to], b[frm] = placed, EMPTY
+        self.score = score + VAL[placed + 6][to]
+        if piece == KING * s:
+            self.kings[s] = to
+        self.ep     = frm + 10 * s if kind == DOUBLE else 0
+        self.castle &= CASTLE_MASK[frm] & CASTLE_MASK[to]
+        self.side   = -s
+
+    def unmake(self):
+        m, piece, captured, self.castle, self.ep, self.score = self.undo.pop()
+        b = self.b
+        self.side = s = -self.side
+        frm, to, kind = m & 127, (m >> 7) & 127, m >> 17
+        b[frm], b[to] = piece, captured
+        if piece == KING * s:
+            self.kings[s] = frm
+        if kind == EN_PASSANT:
+            b[to - 10 * s] = -PAWN * s
+        elif kind == CASTLE:
+            r_from, r_to = (frm + 3, frm + 1) if to > frm else (frm - 4, frm - 1)
+            b[r_from], b[r_to] = b[r_to], EMPTY
+
+    def evaluate(self):
+        return self.score * self.side
+
+    def to_move(self, m):
+        promo = (m >> 14) & 7
+        return chess.Move(TO_CHESS[m & 127], TO_CHESS[(m >> 7) & 127], promo or None)
+
+
+def perft(pos, depth):
+    """Hamle üretecinin doğrulaması için düğüm sayımı."""
+    if depth == 0:
+        return 1
+    n, side = 0, pos.side
+    for m in pos.moves():
+        pos.make(m)
+        if not pos.in_check(side):
+            n += perft(pos, depth - 1)
+        pos.unmake()
+    return n
+
+
+class EmergencySearch:
+    """Motor çökünce devreye giren, katı süre sınırlı alpha-beta + quiescence araması."""
+
+    def __init__(self, board, budget):
+        self.pos      = Position(board)
+        self.deadline = time.perf_counter() + budget
+        self.nodes    = 0
+        self.depth    = 0
+
+    def _tick(self):
+        self.nodes += 1
+        if not self.nodes & SETTINGS["CHECK_EVERY"] and time.perf_counter() >= self.deadline:
+            raise _Timeout()
+
+    def _ordered(self, moves):
+        b = self.pos.b
+        def key(m):
+            captured = b[(m >> 7) & 127]
+            return -(abs(captured) * 16 - abs(b[m & 127]) + ((m >> 14) & 7) * 32)
+        moves.sort(key=key)
+        return moves
+
+    def quiesce(self, alpha, beta):
+        self._tick()
+        pos = self.pos
+        stand = pos.evaluate()
+        if stand >= beta:
+            return stand
+        if stand > alpha:
+            alpha = stand
+        side = pos.side
+        for m in self._ordered(pos.moves(captures_only=True)):
+            pos.make(m)
+            if pos.in_check(side):
+                pos.unmake()
+                continue
+            score = -self.quiesce(-beta, -alpha)
+            pos.unmake()
+            if score >= beta:
+                return score
+            if score > alpha:
+                alpha = score
+        return alpha
+
+    def search(self, depth, alpha, beta, ply):
+        pos = self.pos
+        checked = pos.in_check()
+        if checked:
+            depth += 1
+        if depth <= 0:
+            return self.quiesce(alpha, beta)
+        self._tick()
+        side, legal = pos.side, 0
+        for m in self._ordered(pos.moves()):
+            pos.make(m)
+            if pos.in_check(side):
+                pos.unmake()
+                continue
+            legal += 1
+            score = -self.search(depth - 1, -beta, -alpha, ply + 1)
+            pos.unmake()
+            if score >= beta:
+                return score
+            if score > alpha:
+                alpha = score
+        if not legal:
+            return -MATE + ply if checked else 0
+        return alpha
+
+    def run(self, board):
+        """(hamle, skor, derinlik); süre biterse son tamamlanan derinliğin sonucu."""
+        pos   = self.pos
+        legal = set(board.legal_moves)
+        root  = []
+        for m in self._ordered(pos.moves()):
+            move = pos.to_move(m)
+            if move in legal:
+                root.append(m)
+        if not root:
+            return (next(iter(legal), None), 0, 0)
+
+        # Tekrara giden hamleler beraberlik (0) sayılır
+        draws = set()
+        for m in root:
+            board.push(pos.to_move(m))
+            if board.is_repetition(2):
+                draws.add(m)
+            board.pop()
+
+        best, best_score = root[0], -INF
+        try:
+            for depth in range(1, SETTINGS["MAX_DEPTH"] + 1):
+                alpha, iter_best = -INF, root[0]
+                for m in root:
+                    if m in draws:
+                        score = 0
+                    else:
+                        pos.make(m)
+                        score = -self.search(depth - 1, -INF, -alpha, 1)
+                        pos.unmake()
+                    if score > alpha:
+                        alpha, iter_best = score, m
+                best, best_score, self.depth = iter_best, alpha, depth
+                root.remove(best)
+                root.insert(0, best)
+                if abs(best_score) >= MATE - SETTINGS["MAX_DEPTH"]:
+                    break
+        except _Timeout:
+            while pos.undo:
+                pos.unmake()
+        return pos.to_move(best), best_score, self.depth
+
+
+def budget_for(my_seconds, my_inc=0.0):
+    """Kalan saatten acil arama süresi."""
+    budget = my_seconds * SETTINGS["CLOCK_SHARE"] + my_inc * SETTINGS["INC_SHARE"]
+    budget = min(budget, SETTINGS["MAX_BUDGET"], my_seconds * SETTINGS["HARD_SHARE"])
+    return max(SETTINGS["MIN_BUDGET"], budget)
+
+
+def emergency_move(board, my_seconds, my_inc=0.0):
+    """Tek giriş noktası: (hamle, skor, derinlik, düğüm)."""
+    searcher = EmergencySearch(board, budget_for(my_seconds, my_inc))
+    move, score, depth = searcher.run(board)
+    return move, score, depth, searcher.nodes
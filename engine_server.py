@@ -0,0 +1,514 @@
+import argparse
+import heapq
+import itertools
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+import chess
+import chess.engine
+import yaml
+
+import botlog
+from engines import open_engine, move_overhead
+
+log = botlog.get_logger("engine_server")
+
+# ==========================================================
+# ⚙️ AYARLAR
+# ==========================================================
+SETTINGS = {
+    "LISTEN":            os.environ.get("ENGINE_SERVER_LISTEN", "unix:/tmp/void-engine.sock"),
+    "TOKEN":             os.environ.get("ENGINE_SERVER_TOKEN", ""),   # TCP'de paylaşılan sır
+    "ENGINE_PATH":       "./src/Ethereal",
+    "CONFIG_PATH":       "config.yml",
+    "POOL_SIZE":         4,
+    "RESERVED_FOR_MOVES": 1,     # Analiz işlerinin asla kullanamayacağı motor sayısı
+    "CLIENT_QUEUE_LIMIT": 16,    # İstemci başına kuyrukta + çalışan iş üst sınırı
+    "CLIENT_ANALYSIS_LIMIT": 2,  # İstemci başına eşzamanlı analiz işi üst sınırı
+    "CONNECT_TIMEOUT":   5.0,
+    "RESTART_DELAY":     1.0,    # Motor yeniden açılamazsa tekrar deneme aralığı (sn)
+    "LOG_PATH":          os.environ.get("ENGINE_SERVER_LOG_PATH", "./logs/engine_server.jsonl"),   # Botun dosyasıyla çakışmasın
+}
+
+# Düşük sayı önce çalışır
+PRIORITIES = {"move": 0, "analysis": 1}
+
+LIMIT_FIELDS = ("time", "depth", "nodes", "mate", "white_clock", "black_clock",
+                "white_inc", "black_inc", "remaining_moves")
+INFO_FIELDS  = ("depth", "seldepth", "nodes", "nps", "time", "hashfull", "tbhits",
+                "multipv", "currmovenumber", "string")
+
+
+# ==========================================================
+# 🔌 PROTOKOL (satır başına bir JSON nesnesi)
+# ==========================================================
+def encode_board(board):
+    root = board.root()
+    return {
+        "fen":      root.fen(),
+        "moves":    [m.uci() for m in board.move_stack],
+        "chess960": board.chess960,
+    }
+
+
+def decode_board(data):
+    board = chess.Board(data["fen"], chess960=bool(data.get("chess960")))
+    for uci in data.get("moves", ()):
+        board.push_uci(uci)
+    return board
+
+
+def encode_limit(limit):
+    return {k: getattr(limit, k) for k in LIMIT_FIELDS if getattr(limit, k, None) is not None}
+
+
+def decode_limit(data):
+    return chess.engine.Limit(**{k: v for k, v in data.items() if k in LIMIT_FIELDS})
+
+
+def encode_info(info):
+    out = {k: info[k] for k in INFO_FIELDS if k in info}
+    score = info.get("score")
+    if score is not None:
+        rel = score.relative
+        out["score"] = {"mate": rel.mate()} if rel.is_mate() else {"cp": rel.score()}
+    if info.get("pv"):
+        out["pv"] = [m.uci() for m in info["pv"]]
+    return out
+
+
+def decode_info(data, board):
+    info = {k: data[k] for k in INFO_FIELDS if k in data}
+    score = data.get("score")
+    if score is not None:
+        rel = chess.engine.Mate(score["mate"]) if "mate" in score else chess.engine.Cp(score["cp"])
+        info["score"] = chess.engine.PovScore(rel, board.turn)
+    if data.get("pv"):
+        info["pv"] = [chess.Move.from_uci(u) for u in data["pv"]]
+    return info
+
+
+def parse_address(address):
+    """'unix:/yol/soket' veya 'host:port'."""
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[5:]
+    host, _, port = address.rpartition(":")
+    return socket.AF_INET, (host or "127.0.0.1", int(port))
+
+
+# ==========================================================
+# 🖥️ SUNUCU
+# ==========================================================
+class Job:
+    __slots__ = ("client", "kind", "op", "payload", "reply", "expires")
+
+    def __init__(self, client, kind, op, payload, reply):
+        self.client  = client
+        self.kind    = kind
+        self.op      = op
+        self.payload = payload
+        self.reply   = reply
+        # İstemci bu süreden sonra yanıtı beklemiyor (kendi zaman aşımı)
+        timeout      = payload.get("timeout")
+        self.expires = time.monotonic() + float(timeout) if timeout else None
+
+
+class EngineServer:
+    """UCI havuzunu tek başına sahiplenen, öncelikli kuyrukla iş dağıtan sunucu."""
+
+    def __init__(self, engine_path, uci_options=None, pool_size=None):
+        self.engine_path = engine_path
+        self.uci_options = uci_options
+        self.pool_size = pool_size or SETTINGS["POOL_SIZE"]
+        self.jobs      = []     # (öncelik, sıra, Job) yığını
+        self.seq       = itertools.count()
+        self.lock      = threading.Lock()
+        self.ready     = threading.Condition(self.lock)
+        self.analysis_running = 0
+        self.clients   = {}     # isim → {"pending", "analysis", "done", "rejected", "expired"}
+        self.busy      = 0
+        self.restarts  = 0
+        self.started   = time.time()
+
+        for i in range(self.pool_size):
+            eng = open_engine(engine_path, uci_options)
+            threading.Thread(target=self._worker, args=(eng,), daemon=True,
+                             name=f"engine-{i}").start()
+        log.info(f"🚀 [EngineServer] {self.pool_size} motor hazır. "
+                 f"Move Overhead: {move_overhead(uci_options)}ms")
+
+    def _client(self, name):
+        return self.clients.setdefault(name, {"pending": 0, "analysis": 0, "done": 0,
+                                              "rejected": 0, "expired": 0})
+
+    def submit(self, client, kind, op, payload, reply):
+        """Kota aşılırsa hata mesajı döner, aksi halde None."""
+        with self.ready:
+            c = self._client(client)
+            if c["pending"] >= SETTINGS["CLIENT_QUEUE_LIMIT"]:
+                c["rejected"] += 1
+                return "quota: too many pending requests"
+            if kind == "analysis" and c["analysis"] >= SETTINGS["CLIENT_ANALYSIS_LIMIT"]:
+                c["rejected"] += 1
+                return "quota: too many analysis requests"
+            c["pending"] += 1
+            if kind == "analysis":
+                c["analysis"] += 1
+            heapq.heappush(self.jobs, (PRIORITIES[kind], next(self.seq), Job(client, kind, op, payload, reply)))
+            self.ready.notify_all()
+        return None
+
+    def _take(self):
+        """Analiz işleri hamle için ayrılan motorları işgal edemez.
+
+        Yığının başı analiz ise kuyrukta hamle işi yoktur; kota doluysa bir analiz
+        bitene ya da yeni iş gelene kadar beklenir.
+        """
+        limit = max(1, self.pool_size - SETTINGS["RESERVED_FOR_MOVES"])
+        with self.ready:
+            while True:
+                if self.jobs:
+                    job = self.jobs[0][2]
+                    if job.kind != "analysis":
+                        return heapq.heappop(self.jobs)[2]
+                    if self.analysis_running < limit:
+                        self.analysis_running += 1
+                        return heapq.heappop(self.jobs)[2]
+                self.ready.wait()
+
+    def _restart(self, engine, error):
+        """Çöken / yanıt vermeyen motoru kapatıp aynı seçeneklerle yeniden açar."""
+        log.warning(f"⚠️ [EngineServer] Motor hatası, yeniden başlatılıyor: {error}")
+        try:
+            engine.quit()
+        except Exception:
+            pass
+        while True:
+            try:
+                engine = open_engine(self.engine_path, self.uci_options)
+                break
+            except Exception as e:
+                log.error(f"🚨 [EngineServer] Motor açılamadı: {e}")
+                time.sleep(SETTINGS["RESTART_DELAY"])
+        with self.lock:
+            self.restarts += 1
+        return engine
+
+    def _worker(self, engine):
+        while True:
+            job = self._take()
+            with self.lock:
+                self.busy += 1
+                expired = job.expires is not None and time.monotonic() > job.expires
+                if expired:
+                    self._client(job.client)["expired"] += 1
+            try:
+                if expired:
+                    # İstemci vazgeçti; motoru boşuna meşgul etme
+                    job.reply({"ok": False, "error": "expired: client timed out"})
+                    continue
+                board = decode_board(job.payload["board"])
+                limit = decode_limit(job.payload.get("limit", {}))
+                flags = chess.engine.Info(job.payload.get("info", int(chess.engine.INFO_ALL)))
+                if job.op == "play":
+                    result = engine.play(board, limit, info=flags)
+                    job.reply({"ok": True,
+                               "move": result.move.uci() if result.move else None,
+                               "ponder": result.ponder.uci() if result.ponder else None,
+                               "info": encode_info(result.info)})
+                else:
+                    info = engine.analyse(board, limit, info=flags)
+                    job.reply({"ok": True, "info": encode_info(info)})
+            except chess.engine.EngineError as e:
+                # EngineTerminatedError dahil: ölü motorla sonraki işler de başarısız olurdu
+                job.reply({"ok": False, "error": f"{type(e).__name__}: {e}"})
+                engine = self._restart(engine, e)
+            except Exception as e:
+                job.reply({"ok": False, "error": f"{type(e).__name__}: {e}"})
+            finally:
+                with self.ready:
+                    self.busy -= 1
+                    c = self._client(job.client)
+                    c["pending"] -= 1
+                    c["done"] += 1
+                    if job.kind == "analysis":
+                        c["analysis"] -= 1
+                        self.analysis_running -= 1
+                        self.ready.notify_all()
+
+    def stats(self):
+        with self.lock:
+            return {
+                "uptime_s":  round(time.time() - self.started, 1),
+                "pool_size": self.pool_size,
+                "busy":      self.busy,
+                "restarts":  self.restarts,
+                "queued":    len(self.jobs),
+                "clients":   {k: dict(v) for k, v in self.clients.items()},
+            }
+
+
+class EngineRequestHandler(socketserver.StreamRequestHandler):
+    server_ref = None
+
+    def handle(self):
+        engine_server = self.server_ref
+        write_lock    = threading.Lock()
+        client        = None
+
+        def send(msg):
+            data = (json.dumps(msg, separators=(",", ":")) + "\n").encode("utf-8")
+            with write_lock:
+                try:
+                    self.wfile.write(data)
+                    self.wfile.flush()
+                except OSError:
+                    pass
+
+        for raw in self.rfile:
+            try:
+                msg = json.loads(raw)
+            except ValueError:
+                send({"ok": False, "error": "bad json"})
+                continue
+            rid = msg.get("id")
+            op  = msg.get("op")
+
+            if op == "hello":
+                if SETTINGS["TOKEN"] and msg.get("token") != SETTINGS["TOKEN"]:
+                    send({"id": rid, "ok": False, "error": "unauthorized"})
+                    return
+                client = str(msg.get("client") or f"anon-{self.client_address}")
+                send({"id": rid, "ok": True, "pool_size": engine_server.pool_size})
+                continue
+            if client is None:
+                send({"id": rid, "ok": False, "error": "hello required"})
+                return
+            if op == "stats":
+                send({"id": rid, "ok": True, "stats": engine_server.stats()})
+                continue
+            if op not in ("play", "analyse"):
+                send({"id": rid, "ok": False, "error": f"unknown op: {op}"})
+                continue
+
+            kind = msg.get("priority", "move" if op == "play" else "analysis")
+            if kind not in PRIORITIES:
+                kind = "analysis"
+            reply = lambda payload, rid=rid: send(dict(payload, id=rid))
+            error = engine_server.submit(client, kind, op, msg, reply)
+            if error:
+                send({"id": rid, "ok": False, "error": error})
+
+
+def serve(engine_server, address=None):
+    family, addr = parse_address(address or SETTINGS["LISTEN"])
+    handler = type("BoundEngineRequestHandler", (EngineRequestHandler,), {"server_ref": engine_server})
+    if family == socket.AF_UNIX:
+        if os.path.exists(addr):
+            os.unlink(addr)
+        server = socketserver.ThreadingUnixStreamServer(addr, handler)
+    else:
+        server = socketserver.ThreadingTCPServer(addr, handler)
+    server.daemon_threads = True
+    return server
+
+
+# ==========================================================
+# 📞 İSTEMCİ
+# ==========================================================
+class PlayResult:
+    __slots__ = ("move", "ponder", "info")
+
+    def __init__(self, move, ponder, info):
+        self.move   = move
+        self.ponder = ponder
+        self.info   = info
+
+
+class EngineConnection:
+    """Sunucuya tek soket; istekler id ile çoklanır, bağlantı koparsa yeniden kurulur."""
+
+    def __init__(self, address=None, client_name=None, token=None):
+        self.address  = address or SETTINGS["LISTEN"]
+        self.name     = client_name or f"{socket.gethostname()}:{os.getpid()}"
+        self.token    = token if token is not None else SETTINGS["TOKEN"]
+        self.lock     = threading.Lock()
+        self.ids      = itertools.count(1)
+        self.pending  = {}
+        self.sock     = None
+        self.rfile    = None
+        self.pool_size = None
+
+    def _connect(self):
+        family, addr = parse_address(self.address)
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.settimeout(SETTINGS["CONNECT_TIMEOUT"])
+        try:
+            sock.connect(addr)
+        except OSError as e:
+            sock.close()
+            raise chess.engine.EngineTerminatedError(f"engine server unreachable: {e}")
+        sock.settimeout(None)
+        if family == socket.AF_INET:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock, self.rfile = sock, sock.makefile("rb")
+        threading.Thread(target=self._reader, args=(sock, self.rfile), daemon=True).start()
+
+    def _reader(self, sock, rfile):
+        try:
+            for raw in rfile:
+                msg = json.loads(raw)
+                with self.lock:
+                    fut = self.pending.pop(msg.get("id"), None)
+                if fut is not None:
+                    fut.set_result(msg)
+        except (OSError, ValueError):
+            pass
+        with self.lock:
+            if self.sock is sock:
+                self.sock = None
+            dead, self.pending = self.pending, {}
+        for fut in dead.values():
+            fut.set_exception(chess.engine.EngineTerminatedError("engine server connection lost"))
+
+    def request(self, msg, timeout=None):
+        fut = Future()
+        with self.lock:
+            if self.sock is None:
+                self._connect()
+                hello_id = next(self.ids)
+                hello    = Future()
+                self.pending[hello_id] = hello
+                self._send({"id": hello_id, "op": "hello", "client": self.name, "token": self.token})
+            else:
+                hello = None
+            rid = next(self.ids)
+            self.pending[rid] = fut
+            if timeout is not None:
+                msg = dict(msg, timeout=timeout)   # Sunucu süresi geçen işi çalıştırmaz
+            self._send(dict(msg, id=rid))
+        if hello is not None:
+            ack = hello.result(timeout=SETTINGS["CONNECT_TIMEOUT"])
+            if not ack.get("ok"):
+                raise chess.engine.EngineError(ack.get("error", "hello rejected"))
+            self.pool_size = ack.get("pool_size")
+        try:
+            reply = fut.result(timeout=timeout)
+        except FutureTimeout:
+            # Geç gelen yanıt sahipsiz kalır ve okuyucu tarafından atılır
+            with self.lock:
+                self.pending.pop(rid, None)
+            raise chess.engine.EngineError(f"engine server timed out after {timeout:.2f}s")
+        if not reply.get("ok"):
+            raise chess.engine.EngineError(reply.get("error", "engine server error"))
+        return reply
+
+    def _send(self, msg):
+        """Kilit altında çağrılır."""
+        try:
+            self.sock.sendall((json.dumps(msg, separators=(",", ":")) + "\n").encode("utf-8"))
+        except OSError as e:
+            self.sock = None
+            raise chess.engine.EngineTerminatedError(f"engine server send failed: {e}")
+
+    def stats(self):
+        return self.request({"op": "stats"})["stats"]
+
+    def close(self):
+        with self.lock:
+            if self.sock is not None:
+                try:
+                    self.sock.close()
+                except OSError:
+                    pass
+                self.sock = None
+
+
+class RemoteEngine:
+    """OxydanV11'in kullandığı SimpleEngine alt kümesi (play/analyse/configure/quit)."""
+
+    def __init__(self, connection, priority="move"):
+        self.conn     = connection
+        self.priority = priority
+
+    def play(self, board, limit, info=chess.engine.INFO_NONE, timeout=None, **kwargs):
+        """timeout: yanıt için üst sınır (sn); aşılırsa EngineError (çağıran yedek hamleye geçer)."""
+        reply = self.conn.request({
+            "op": "play", "priority": self.priority, "board": encode_board(board),
+            "limit": encode_limit(limit), "info": int(info),
+        }, timeout=timeout)
+        move   = chess.Move.from_uci(reply["move"]) if reply.get("move") else None
+        ponder = chess.Move.from_uci(reply["ponder"]) if reply.get("ponder") else None
+        return PlayResult(move, ponder, decode_info(reply.get("info", {}), board))
+
+    def analyse(self, board, limit, info=chess.engine.INFO_ALL, **kwargs):
+        reply = self.conn.request({
+            "op": "analyse", "priority": kwargs.get("priority", "analysis"),
+            "board": encode_board(board), "limit": encode_limit(limit), "info": int(info),
+        })
+        return decode_info(reply.get("info", {}), board)
+
+    def configure(self, options):
+        # Seçenekler sunucu tarafında config.yml'den uygulanır
+        pass
+
+    def quit(self):
+        pass
+
+
+# ==========================================================
+# 🚀 CLI
+# ==========================================================
+def parse_args():
+    parser = argparse.ArgumentParser(description="Paylaşılan UCI motor sunucusu")
+    parser.add_argument("--listen", default=SETTINGS["LISTEN"], help="unix:/yol veya host:port")
+    parser.add_argument("--engine", default=SETTINGS["ENGINE_PATH"])
+    parser.add_argument("--config", default=SETTINGS["CONFIG_PATH"])
+    parser.add_argument("--pool", type=int, default=SETTINGS["POOL_SIZE"])
+    parser.add_argument("--reserved", type=int, default=SETTINGS["RESERVED_FOR_MOVES"],
+                        help="Sadece hamle isteklerine ayrılan motor sayısı")
+    parser.add_argument("--client-queue-limit", type=int, default=SETTINGS["CLIENT_QUEUE_LIMIT"])
+    parser.add_argument("--client-analysis-limit", type=int, default=SETTINGS["CLIENT_ANALYSIS_LIMIT"])
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    SETTINGS["RESERVED_FOR_MOVES"]    = args.reserved
+    SETTINGS["CLIENT_QUEUE_LIMIT"]    = args.client_queue_limit
+    SETTINGS["CLIENT_ANALYSIS_LIMIT"] = args.client_analysis_limit
+
+    config = {}
+    if os.path.exists(args.config):
+        with open(args.config, "r", encoding="utf-8") as f:
+            config = yaml.safe_load(f) or {}
+    uci_options = (config.get("engine") or {}).get("uci_options") or {}
+
+    botlog.load_config(config)
+    botlog.SETTINGS["PATH"] = SETTINGS["LOG_PATH"]
+    botlog.setup()
+
+    if not args.listen.startswith("unix:") and not SETTINGS["TOKEN"]:
+        log.warning("⚠️ [EngineServer] TCP dinleniyor ama ENGINE_SERVER_TOKEN boş.")
+
+    engine_server = EngineServer(args.engine, uci_options, args.pool)
+    server        = serve(engine_server, args.listen)
+    log.info(f"📡 [EngineServer] {args.listen} dinleniyor")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        botlog.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
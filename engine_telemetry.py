@@ -0,0 +1,166 @@
+import itertools
+import threading
+import time
+from collections import deque
+
+import botlog
+from metrics import METRICS
+
+log = botlog.get_logger("telemetry")
+
+# ==========================================================
+# ⚙️ AYARLAR
+# ==========================================================
+SETTINGS = {
+    "WINDOW":            200,      # Motor başına tutulan son arama sayısı
+    "HASHFULL_ALERT":    900,      # ‰; bu doluluk HASHFULL_STREAK arama sürerse Hash küçüktür
+    "HASHFULL_STREAK":   10,
+    "NPS_BASELINE_MIN":  20,       # Taban NPS bu kadar aramadan sonra güvenilir sayılır
+    "NPS_DROP_RATIO":    0.6,      # Son aramaların medyanı tabanın bu oranının altındaysa uyarı
+    "NPS_RECENT":        8,
+    "NPS_MIN_TIME":      0.05,     # Sn; bundan kısa aramaların NPS'i gürültülü, sayılmaz
+    "OVERSHOOT_RATIO":   5.0,      # Saatli aramada süre > oran × bütçe (motor en fazla ~5× kullanır)
+    "NODE_OVERSHOOT":    1.5,      # Düğüm bütçeli (panik) aramada süre > oran × bütçe
+    "ALERT_COOLDOWN":    300.0,    # Aynı motor + uyarı türü için tekrar aralığı (sn)
+}
+
+
+class EngineStats:
+    __slots__ = ("label", "searches", "recent", "baseline", "baseline_n", "hash_streak",
+                 "overshoots", "alerts", "last_alert", "last", "network")
+
+    def __init__(self, label):
+        self.label       = label
+        self.searches    = 0
+        self.recent      = deque(maxlen=SETTINGS["WINDOW"])
+        self.baseline    = None     # Uzun vadeli NPS (yavaş EMA)
+        self.baseline_n  = 0
+        self.hash_streak = 0
+        self.overshoots  = 0
+        self.alerts      = {}
+        self.last_alert  = {}
+        self.last        = None
+        self.network     = None     # 'go' öncesi basılan "Network replica N: Shared memory." satırı
+
+
+class EngineTelemetry:
+    """Her aramanın son 'info' satırını motor başına saklar ve sapmalarda uyarır.
+
+    Taban NPS yavaş bir EMA'dır; ısıl kısma veya paylaşımlı makinede aşırı
+    abonelik son aramaların medyanını tabanın altına çeker.
+    """
+
+    def __init__(self):
+        self.lock    = threading.Lock()
+        self.engines = {}
+        self.labels  = itertools.count(1)   # Unutulan motorların etiketleri yeniden kullanılmaz
+
+    def _stats(self, engine):
+        key = id(engine)
+        st  = self.engines.get(key)
+        if st is None:
+            st = self.engines[key] = EngineStats(f"engine-{next(self.labels)}")
+        return st
+
+    def _alert(self, st, kind, message):
+        now = time.monotonic()
+        st.alerts[kind] = st.alerts.get(kind, 0) + 1
+        METRICS.inc(f"telemetry_alert_{kind}")
+        if now - st.last_alert.get(kind, -1e9) >= SETTINGS["ALERT_COOLDOWN"]:
+            st.last_alert[kind] = now
+            return f"⚠️ [Telemetry] {st.label}: {message}"
+        return None
+
+    def observe(self, engine, info, wall, budget=None, node_limited=False, tc=None):
+        """engine.play sonrası: info=INFO_ALL sonucu, duvar saati ve ayrılan bütçe (sn)."""
+        info   = info or {}
+        nodes  = info.get("nodes")
+        t      = info.get("time") or wall
+        nps    = info.get("nps") or (int(nodes / t) if nodes and t else None)
+        sample = {
+            "ts":       round(time.time(), 3),
+            "tc":       tc,
+            "depth":    info.get("depth"),
+            "seldepth": info.get("seldepth"),
+            "nodes":    nodes,
+            "nps":      nps,
+            "hashfull": info.get("hashfull"),
+            "tbhits":   info.get("tbhits"),
+            "time":     round(t, 4) if t else None,
+            "wall":     round(wall, 4),
+            "budget":   round(budget, 4) if budget else None,
+        }
+        messages = []
+        with self.lock:
+            st = self._stats(engine)
+            st.searches += 1
+            st.recent.append(sample)
+            st.last = sample
+            text = info.get("string")
+            if text and text.startswith("Network replica"):
+                st.network = text
+
+            hashfull = sample["hashfull"]
+            if hashfull is not None and hashfull >= SETTINGS["HASHFULL_ALERT"]:
+                st.hash_streak += 1
+                if st.hash_streak == SETTINGS["HASHFULL_STREAK"]:
+                    messages.append(self._alert(st, "hashfull",
+                                                f"hashfull {hashfull}‰, {st.hash_streak} aramadır dolu — Hash büyütülmeli"))
+            else:
+                st.hash_streak = 0
+
+            if nps and t >= SETTINGS["NPS_MIN_TIME"]:
+                recent = [s["nps"] for s in list(st.recent)[-SETTINGS["NPS_RECENT"]:]
+                          if s["nps"] and (s["time"] or 0) >= SETTINGS["NPS_MIN_TIME"]]
+                if st.baseline_n >= SETTINGS["NPS_BASELINE_MIN"] and len(recent) >= SETTINGS["NPS_RECENT"]:
+                    median = sorted(recent)[len(recent) // 2]
+                    if median < SETTINGS["NPS_DROP_RATIO"] * st.baseline:
+                        messages.append(self._alert(st, "nps_drop",
+                                                    f"NPS {median:,} < taban {int(st.baseline):,} "
+                                                    f"(kısma / aşırı abonelik?)"))
+                        # Düşüş sürüyorsa taban takip etmesin
+                        nps = None
+                if nps:
+                    st.baseline_n += 1
+                    st.baseline = nps if st.baseline is None else st.baseline + 0.02 * (nps - st.baseline)
+
+            if budget:
+                ratio = SETTINGS["NODE_OVERSHOOT"] if node_limited else SETTINGS["OVERSHOOT_RATIO"]
+                if wall > ratio * budget:
+                    st.overshoots += 1
+                    messages.append(self._alert(st, "overshoot",
+                                                f"arama {wall:.2f}s, bütçe {budget:.2f}s ({wall / budget:.1f}×)"))
+        for message in messages:
+            if message:
+                log.warning(message)
+        return sample
+
+    def forget(self, engine):
+        with self.lock:
+            self.engines.pop(id(engine), None)
+
+    def stats(self):
+        with self.lock:
+            out = {}
+            for st in self.engines.values():
+                recent = list(st.recent)
+                nps    = sorted(s["nps"] for s in recent if s["nps"])
+                hf     = [s["hashfull"] for s in recent if s["hashfull"] is not None]
+                depth  = [s["depth"] for s in recent if s["depth"]]
+                out[st.label] = {
+                    "searches":      st.searches,
+                    "nps_p50":       nps[len(nps) // 2] if nps else None,
+                    "nps_baseline":  int(st.baseline) if st.baseline else None,
+                    "hashfull_mean": int(sum(hf) / len(hf)) if hf else None,
+                    "hashfull_max":  max(hf) if hf else None,
+                    "depth_mean":    round(sum(depth) / len(depth), 1) if depth else None,
+                    "tbhits":        sum(s["tbhits"] or 0 for s in recent),
+                    "overshoots":    st.overshoots,
+                    "alerts":        dict(st.alerts),
+                    "network":       st.network,
+                    "last":          st.last,
+                }
+            return out
+
+
+TELEMETRY = EngineTelemetry()
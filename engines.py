@@ -0,0 +1,31 @@
+import chess.engine
+
+DEFAULT_MOVE_OVERHEAD = 100
+
+
+def move_overhead(uci_options):
+    """config.yml'deki Move Overhead değeri (iki yazımı da kabul edilir)."""
+    if not uci_options:
+        return DEFAULT_MOVE_OVERHEAD
+    return uci_options.get("Move Overhead", uci_options.get("MoveOverhead", DEFAULT_MOVE_OVERHEAD))
+
+
+def open_engine(path, uci_options=None, timeout=30, **popen_args):
+    """UCI motorunu başlatır ve seçenekleri uygular; desteklenmeyen seçenekler atlanır."""
+    eng = chess.engine.SimpleEngine.popen_uci(path, timeout=timeout, **popen_args)
+    overhead = move_overhead(uci_options)
+    try:
+        eng.configure({"Move Overhead": overhead})
+    except Exception:
+        try:
+            eng.configure({"MoveOverhead": overhead})
+        except Exception:
+            pass
+    for opt, val in (uci_options or {}).items():
+        if opt in ("MoveOverhead", "Move Overhead"):
+            continue
+        try:
+            eng.configure({opt: val})
+        except Exception:
+            pass
+    return eng
@@ -0,0 +1,303 @@
+import gzip
+import json
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+
+import chess
+import chess.pgn
+
+import botlog
+from position_cache import encode_move, decode_move
+
+log = botlog.get_logger("archive")
+
+# ==========================================================
+# ⚙️ AYARLAR
+# ==========================================================
+SETTINGS = {
+    "DIR":             "./archive",
+    "PGN_FILE":        "games.pgn.gz",    # Oyun başına bir gzip üyesi; dosya bütün olarak da açılabilir
+    "MOVES_FILE":      "moves.bin",       # Oyun başına zlib'li ikili hamle tablosu
+    "INDEX_FILE":      "index.jsonl",     # Oyun başına bir satır: ofsetler + arama alanları
+    "QUEUE_SIZE":      256,
+}
+
+# Hamle kaynağı kodları (1 bayt); listede olmayanlar 'other'
+# Kodlar diske yazılır: yeni kaynaklar sona eklenir, mevcut sıra değişmez
+SOURCES = ("opponent", "engine", "cache", "book", "tablebase",
+           "instant_forced", "instant_pv", "fallback", "other", "instant_tablebase")
+SOURCE_CODE = {name: i for i, name in enumerate(SOURCES)}
+
+BLOCK_HEADER = struct.Struct("<4sH12sI")             # magic, sürüm, oyun id, hamle sayısı
+MOVE_RECORD  = struct.Struct("<HHBBhIIQIH")          # ply, hamle, kaynak, derinlik, skor, saat, düşünme, düğüm, nps, gecikme
+MAGIC        = b"VGAM"
+VERSION      = 1
+NO_SCORE     = -32768
+U32          = 0xFFFFFFFF
+
+
+def _clamp(value, hi):
+    return max(0, min(hi, int(value or 0)))
+
+
+def _clock_comment(ms):
+    s = int(ms // 1000)
+    return f"[%clk {s // 3600}:{s // 60 % 60:02d}:{s % 60:02d}]"
+
+
+class MoveStat:
+    __slots__ = ("ply", "move", "source", "depth", "score", "clock_ms",
+                 "think_ms", "nodes", "nps", "latency_ms")
+
+    def __init__(self, ply, move, source="opponent", depth=0, score=None, clock_ms=0,
+                 think_ms=0, nodes=0, nps=0, latency_ms=0):
+        self.ply        = ply
+        self.move       = move
+        self.source     = source
+        self.depth      = depth
+        self.score      = score
+        self.clock_ms   = clock_ms
+        self.think_ms   = think_ms
+        self.nodes      = nodes
+        self.nps        = nps
+        self.latency_ms = latency_ms
+
+    def pack(self):
+        return MOVE_RECORD.pack(
+            self.ply, encode_move(self.move), SOURCE_CODE.get(self.source, SOURCE_CODE["other"]),
+            _clamp(self.depth, 255),
+            NO_SCORE if self.score is None else max(-32000, min(32000, int(self.score))),
+            _clamp(self.clock_ms, U32), _clamp(self.think_ms, U32), _clamp(self.nodes, 2**64 - 1),
+            _clamp(self.nps, U32), _clamp(self.latency_ms, 0xFFFF))
+
+    @classmethod
+    def unpack(cls, raw):
+        ply, code, src, depth, score, clock, think, nodes, nps, latency = MOVE_RECORD.unpack(raw)
+        return cls(ply, decode_move(code), SOURCES[src] if src < len(SOURCES) else "other", depth,
+                   None if score == NO_SCORE else score, clock, think, nodes, nps, latency)
+
+    def as_dict(self):
+        return {k: (getattr(self, k).uci() if k == "move" else getattr(self, k)) for k in self.__slots__}
+
+
+class GameRecorder:
+    """Bir oyunun saatlerini ve bizim hamlelerimizin arama bilgisini toplar.
+
+    Hamle listesi oyun sonunda tahtadan alınır; oyun sırasında sadece ply → veri
+    sözlükleri doldurulur, böylece hamle yolunda iş yok denecek kadar azdır.
+    """
+
+    def __init__(self, game_id, headers):
+        self.game_id = game_id
+        self.headers = headers
+        self.started = time.time()
+        self.clocks  = {}   # ply → (wtime_ms, btime_ms) bu ply oynandıktan sonraki saatler
+        self.ours    = {}   # ply (1'den başlar) → bizim hamlemizin raporu
+
+    def observe_clocks(self, ply, wtime, btime):
+        if wtime is not None and btime is not None:
+            self.clocks[ply] = (int(wtime), int(btime))
+
+    def record_move(self, ply, report, think_s, latency_s):
+        fields = dict(report or {})
+        fields["think_ms"]   = think_s * 1000.0
+        fields["latency_ms"] = latency_s * 1000.0
+        self.ours[ply] = fields
+
+    def moves(self, board):
+        """Tahtanın hamle geçmişinden MoveStat listesi (saat farkından rakip düşünme süresi)."""
+        turn        = board.root().turn
+        inc_ms      = self.headers.get("_inc_ms", 0)
+        stats, prev = [], self.clocks.get(0)
+        for ply, move in enumerate(board.move_stack, 1):
+            side   = 0 if turn == chess.WHITE else 1
+            turn   = not turn
+            clocks = self.clocks.get(ply)
+            clock  = clocks[side] if clocks else 0
+            ours   = self.ours.get(ply)
+            if ours is not None:
+                stat = MoveStat(ply, move, ours.get("source", "other"), ours.get("depth") or 0,
+                                ours.get("score"), clock, ours.get("think_ms"), ours.get("nodes"),
+                                ours.get("nps"), ours.get("latency_ms"))
+            else:
+                think = 0
+                if clocks and prev:
+                    think = max(0, prev[side] - clock + inc_ms)
+                stat = MoveStat(ply, move, clock_ms=clock, think_ms=think)
+            stats.append(stat)
+            prev = clocks
+        return stats
+
+    def pgn(self, board, stats, result):
+        game = chess.pgn.Game.from_board(board)
+        for key, value in self.headers.items():
+            if not key.startswith("_"):
+                game.headers[key] = str(value)
+        game.headers["Result"] = result
+        node = game
+        for stat in stats:
+            node = node.variations[0]
+            if stat.clock_ms:
+                node.comment = _clock_comment(stat.clock_ms)
+        return str(game) + "\n\n"
+
+    def block(self, stats):
+        body = b"".join(s.pack() for s in stats)
+        head = BLOCK_HEADER.pack(MAGIC, VERSION, self.game_id.encode()[:12].ljust(12, b"\0"), len(stats))
+        return zlib.compress(head + body, 6)
+
+
+class GameArchive:
+    """Sadece eklenen arşiv; yazma tek arka plan iş parçacığında yapılır."""
+
+    def __init__(self, directory=None):
+        self.dir    = directory or SETTINGS["DIR"]
+        self.queue  = queue.Queue(SETTINGS["QUEUE_SIZE"])
+        self.lock   = threading.Lock()
+        self.thread = None
+        self.index  = None
+
+    def _path(self, key):
+        return os.path.join(self.dir, SETTINGS[key])
+
+    def start(self):
+        with self.lock:
+            if self.thread is None:
+                os.makedirs(self.dir, exist_ok=True)
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+        return self
+
+    def submit(self, recorder, board, result, status):
+        """Oyun sonunda çağrılır; tahta kopyalanır, serileştirme yazıcıda yapılır."""
+        try:
+            self.queue.put_nowait((recorder, board.copy(), result, status))
+        except queue.Full:
+            log.warning(f"⚠️ [Archive] Kuyruk dolu, oyun arşivlenmedi: {recorder.game_id}")
+
+    def flush(self, timeout=10.0):
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            try:
+                self._write(*item)
+            except Exception as e:
+                log.warning(f"⚠️ [Archive] Yazma hatası ({item[0].game_id}): {e}")
+            finally:
+                self.queue.task_done()
+
+    def _append(self, key, data):
+        with open(self._path(key), "ab") as f:
+            offset = f.seek(0, os.SEEK_END)
+            f.write(data)
+        return offset, len(data)
+
+    def _write(self, recorder, board, result, status):
+        stats    = recorder.moves(board)
+        pgn      = gzip.compress(recorder.pgn(board, stats, result).encode("utf-8"))
+        p_off, p_len = self._append("PGN_FILE", pgn)
+        m_off, m_len = self._append("MOVES_FILE", recorder.block(stats))
+        entry = {
+            "game_id":  recorder.game_id,
+            "ts":       round(recorder.started, 1),
+            "opponent": recorder.headers.get("_opponent", ""),
+            "tc":       recorder.headers.get("_tc", ""),
+            "mode":     recorder.headers.get("_mode", ""),
+            "rated":    recorder.headers.get("_rated", False),
+            "color":    recorder.headers.get("_color", ""),
+            "result":   result,
+            "status":   status,
+            "plies":    len(stats),
+            "pgn":      [p_off, p_len],
+            "moves":    [m_off, m_len],
+        }
+        with open(self._path("INDEX_FILE"), "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        with self.lock:
+            if self.index is not None:
+                self.index[recorder.game_id] = entry
+
+    # ------------------------------------------------------
+    # Okuma (analiz araçları için)
+    # ------------------------------------------------------
+    def load_index(self):
+        with self.lock:
+            if self.index is None:
+                self.index = {}
+                try:
+                    with open(self._path("INDEX_FILE"), "r", encoding="utf-8") as f:
+                        for line in f:
+                            if line.strip():
+                                entry = json.loads(line)
+                                self.index[entry["game_id"]] = entry
+                except FileNotFoundError:
+                    pass
+            return self.index
+
+    def find(self, opponent=None, tc=None, mode=None):
+        out = []
+        for entry in self.load_index().values():
+            if opponent and entry["opponent"].lower() != opponent.lower():
+                continue
+            if tc and entry["tc"] != tc:
+                continue
+            if mode and entry["mode"] != mode:
+                continue
+            out.append(entry)
+        return out
+
+    def _read(self, key, span):
+        with open(self._path(key), "rb") as f:
+            f.seek(span[0])
+            return f.read(span[1])
+
+    def pgn(self, game_id):
+        entry = self.load_index().get(game_id)
+        return gzip.decompress(self._read("PGN_FILE", entry["pgn"])).decode("utf-8") if entry else None
+
+    def moves(self, game_id):
+        entry = self.load_index().get(game_id)
+        if entry is None:
+            return None
+        raw = zlib.decompress(self._read("MOVES_FILE", entry["moves"]))
+        magic, version, _, count = BLOCK_HEADER.unpack_from(raw)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Bilinmeyen hamle bloğu: {magic!r} v{version}")
+        base = BLOCK_HEADER.size
+        return [MoveStat.unpack(raw[base + i * MOVE_RECORD.size: base + (i + 1) * MOVE_RECORD.size])
+                for i in range(count)]
+
+
+ARCHIVE = GameArchive()
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Oyun arşivini sorgular")
+    parser.add_argument("--dir", default=SETTINGS["DIR"])
+    parser.add_argument("--opponent")
+    parser.add_argument("--tc")
+    parser.add_argument("--mode")
+    parser.add_argument("--game", help="Bu oyunun PGN'ini ve hamle tablosunu yazdır")
+    args    = parser.parse_args()
+    archive = GameArchive(args.dir)
+    if args.game:
+        print(archive.pgn(args.game) or f"❌ Bulunamadı: {args.game}")
+        for stat in archive.moves(args.game) or []:
+            print(json.dumps(stat.as_dict()))
+        return
+    for entry in archive.find(args.opponent, args.tc, args.mode):
+        print(f"{entry['game_id']}  {entry['opponent']:<20} {entry['tc']:<8} {entry['mode']:<9} "
+              f"{entry['color']:<5} {entry['result']:<4} {entry['plies']} ply")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+import heapq
+import io
+import itertools
+import threading
+import time
+from collections import Counter
+
+import chess
+import chess.engine
+import chess.pgn
+import chess.polyglot
+
+import botlog
+from game_archive import ARCHIVE
+from metrics import METRICS
+from node_budget import SETTINGS as NB_SETTINGS
+from position_cache import SETTINGS as PC_SETTINGS
+
+log = botlog.get_logger("idle")
+
+# ==========================================================
+# ⚙️ AYARLAR
+# ==========================================================
+SETTINGS = {
+    "MAX_UTILISATION":     0.5,      # Aktif oyun / MAX_PARALLEL_GAMES bunun üstündeyse iş çalışmaz
+    "SPARE_ENGINES":       1,        # Ödünç alındıktan sonra havuzda kalması gereken motor
+    "RESUME_DELAY":        1.0,      # Canlı aramadan sonra işe dönmeden önce beklenen süre (sn)
+    "TICK":                0.5,
+
+    # Oyun sonu analizi (insan rakiplere sohbetten kısa değerlendirme)
+    "POSTGAME_DEPTH":      12,
+    "POSTGAME_MISTAKE_CP": 150,      # Bu kadar kayıp hata sayılır
+    "POSTGAME_SHOWN":      3,
+    "POSTGAME_MAX_PLIES":  160,
+
+    # Arşivde sık geçen pozisyonların ön araması → pozisyon önbelleği
+    "PRESEARCH_INTERVAL":  1800.0,
+    "PRESEARCH_GAMES":     200,      # Son N arşiv oyunu taranır
+    "PRESEARCH_MIN_PLY":   8,
+    "PRESEARCH_MIN_COUNT": 2,
+    "PRESEARCH_POSITIONS": 40,       # Tur başına en fazla pozisyon
+    "PRESEARCH_DEPTH":     22,
+    "PRESEARCH_SECONDS":   15.0,
+
+    # NPS öz testi (node_budget kalibrasyonuyla aynı pozisyonlar)
+    "SELFTEST_INTERVAL":   3600.0,
+    "SELFTEST_SECONDS":    1.0,
+    "SELFTEST_DROP_RATIO": 0.7,      # Kalibrasyon NPS'inin bu oranının altı uyarı
+}
+
+PRIORITY = {"postgame": 0, "selftest": 1, "presearch": 2}
+
+_MATE = 10000
+
+
+def _white_cp(info):
+    score = info.get("score")
+    return score.white().score(mate_score=_MATE) if score else 0
+
+
+# ==========================================================
+# 📋 İŞLER
+# ==========================================================
+# Her iş bir üreteçtir: (tahta, limit) verir, karşılığında (info, hamle) alır.
+# Kesilen arama aynı istekle sonradan tekrarlanır; iş nerede kaldıysa oradan sürer.
+
+def postgame_review(board, human_color, send):
+    """İnsan rakibin en pahalı hamleleri; analiz bitince tek satır sohbet mesajı."""
+    moves  = list(board.move_stack)[:SETTINGS["POSTGAME_MAX_PLIES"]]
+    pos    = board.root()
+    limit  = chess.engine.Limit(depth=SETTINGS["POSTGAME_DEPTH"])
+    scores = []
+    bests  = []
+    for i in range(len(moves) + 1):
+        if pos.is_checkmate():
+            scores.append(-_MATE if pos.turn == chess.WHITE else _MATE)
+            bests.append(None)
+        elif pos.is_game_over():
+            scores.append(0)
+            bests.append(None)
+        else:
+            info, best = yield pos.copy(), limit
+            scores.append(_white_cp(info))
+            bests.append(best)
+        if i < len(moves):
+            pos.push(moves[i])
+
+    sign     = 1 if human_color == chess.WHITE else -1
+    pos      = board.root()
+    mistakes = []
+    for i, move in enumerate(moves):
+        if pos.turn == human_color and bests[i] is not None and bests[i] != move:
+            loss = sign * (scores[i] - scores[i + 1])
+            if loss >= SETTINGS["POSTGAME_MISTAKE_CP"] and abs(scores[i]) < 1000:
+                num = f"{pos.fullmove_number}{'.' if pos.turn == chess.WHITE else '...'}"
+                mistakes.append((loss, f"{num}{pos.san(move)} (better {pos.san(bests[i])}, -{loss / 100:.1f})"))
+        pos.push(move)
+
+    if not mistakes:
+        send("📊 Quick review: no big mistakes from you this game — well played! 👏")
+        return
+    shown = [text for _, text in sorted(mistakes, reverse=True)[:SETTINGS["POSTGAME_SHOWN"]]]
+    send(f"📊 Quick review — key moments: {' · '.join(shown)}"[:140])
+
+
+def presearch(cache):
+    """Son arşiv oyunlarında tekrar eden açılış/orta oyun pozisyonlarını derin arar, önbelleğe yazar."""
+    index  = ARCHIVE.load_index()
+    recent = sorted(index.values(), key=lambda e: e.get("ts", 0))[-SETTINGS["PRESEARCH_GAMES"]:]
+    counts = Counter()
+    boards = {}
+    for entry in recent:
+        text = ARCHIVE.pgn(entry["game_id"])
+        game = chess.pgn.read_game(io.StringIO(text)) if text else None
+        if game is None:
+            continue
+        pos = game.board()
+        for ply, move in enumerate(game.mainline_moves(), 1):
+            if ply > PC_SETTINGS["MAX_PLY"]:
+                break
+            pos.push(move)
+            if ply >= SETTINGS["PRESEARCH_MIN_PLY"] and not pos.is_game_over():
+                key = chess.polyglot.zobrist_hash(pos)
+                counts[key] += 1
+                if key not in boards:
+                    boards[key] = pos.copy(stack=False)
+
+    limit  = chess.engine.Limit(depth=SETTINGS["PRESEARCH_DEPTH"], time=SETTINGS["PRESEARCH_SECONDS"])
+    stored = 0
+    for key, count in counts.most_common(SETTINGS["PRESEARCH_POSITIONS"]):
+        if count < SETTINGS["PRESEARCH_MIN_COUNT"]:
+            break
+        entry = cache.probe(boards[key], key)
+        if entry is not None and entry.depth >= SETTINGS["PRESEARCH_DEPTH"]:
+            continue
+        info, best = yield boards[key], limit
+        score = info.get("score")
+        if cache.store(boards[key], best, score.relative.score(mate_score=32000) if score else None,
+                       info.get("depth") or 0, info.get("time") or 0.0, key):
+            stored += 1
+    METRICS.inc("idle_presearch_stored", stored)
+    log.info(f"🗂️ [Idle] Ön arama: {stored} pozisyon önbelleğe yazıldı")
+
+
+def nps_selftest(node_budget):
+    """Kalibrasyon pozisyonlarında NPS ölçer; açılış kalibrasyonuna göre düşüşü bildirir."""
+    limit   = chess.engine.Limit(time=SETTINGS["SELFTEST_SECONDS"])
+    samples = []
+    for fen in NB_SETTINGS["CALIBRATION_FENS"]:
+        info, _ = yield chess.Board(fen), limit
+        if info.get("nodes") and info.get("time"):
+            samples.append(info["nodes"] / info["time"])
+    if not samples:
+        return
+    nps  = int(sorted(samples)[len(samples) // 2])
+    base = node_budget.stats()["nps_mean"]
+    METRICS.set("idle_selftest_nps", nps)
+    if base and nps < SETTINGS["SELFTEST_DROP_RATIO"] * base:
+        log.warning(f"⚠️ [Idle] NPS öz testi {nps:,} < kalibrasyon {base:,} (kısma / aşırı abonelik?)")
+    else:
+        log.info(f"🩺 [Idle] NPS öz testi: {nps:,}" + (f" (kalibrasyon {base:,})" if base else ""))
+
+
+# ==========================================================
+# 🕰️ ZAMANLAYICI
+# ==========================================================
+class Job:
+    __slots__ = ("name", "gen", "pending", "result")
+
+    def __init__(self, name, gen):
+        self.name    = name
+        self.gen     = gen
+        self.pending = None     # Kesilen istek; tekrar çalıştırılır
+        self.result  = None     # Üretece gönderilecek son sonuç
+
+
+class IdleScheduler:
+    """Havuzda boşta duran motoru düşük öncelikli işlere verir.
+
+    Her iş adımı tek bir motor araması. Canlı arama başlarken (begin_live) süren
+    iş araması hemen durdurulur, motor havuza döner. İş kaldığı yerden
+    RESUME_DELAY sonra, kullanım eşiğin altındaysa devam eder.
+    """
+
+    def __init__(self):
+        self.lock       = threading.Lock()
+        self.wake       = threading.Event()
+        self.jobs       = []
+        self.seq        = itertools.count()
+        self.live       = 0
+        self.last_live  = 0.0
+        self.current    = None
+        self.stopped    = False
+        self.bot        = None
+        self.active     = None
+        self.max_games  = None
+        self.thread     = None
+        self.due        = {}
+        self.counts     = Counter()
+
+    def start(self, bot, active_count, max_games):
+        self.bot       = bot
+        self.active    = active_count
+        self.max_games = max_games
+        now = time.monotonic()
+        # İlk öz test ve ön arama açılıştan kısa süre sonra
+        self.due = {"selftest": now + 60.0, "presearch": now + 120.0}
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="idle-jobs", daemon=True)
+            self.thread.start()
+        return self
+
+    def submit(self, name, gen):
+        with self.lock:
+            heapq.heappush(self.jobs, (PRIORITY.get(name, 9), next(self.seq), Job(name, gen)))
+        self.wake.set()
+
+    # ------------------------------------------------------
+    # Canlı arama ile koordinasyon
+    # ------------------------------------------------------
+    def begin_live(self):
+        """Canlı hamle araması başlıyor: süren iş araması beklemeden durdurulur."""
+        with self.lock:
+            self.live += 1
+            current = self.current
+            if current is not None:
+                self.stopped = True
+        if current is not None:
+            current.stop()
+            METRICS.inc("idle_preemptions")
+
+    def end_live(self):
+        with self.lock:
+            self.live      = max(0, self.live - 1)
+            self.last_live = time.monotonic()
+
+    def preempt(self):
+        """Yeni oyun başladı: canlı arama gibi davranır."""
+        self.begin_live()
+        self.end_live()
+
+    def _can_run(self):
+        if self.live or time.monotonic() - self.last_live < SETTINGS["RESUME_DELAY"]:
+            return False
+        if self.active() > SETTINGS["MAX_UTILISATION"] * self.max_games():
+            return False
+        return self.bot.engine_pool.qsize() > SETTINGS["SPARE_ENGINES"]
+
+    # ------------------------------------------------------
+    # Çalıştırma
+    # ------------------------------------------------------
+    def _search(self, engine, board, limit):
+        """Kesilirse None; tamamlanırsa (info, en iyi hamle)."""
+        with self.lock:
+            if not self._can_run():
+                return None
+            self.stopped = False
+        handle = engine.analysis(board, limit)
+        with self.lock:
+            self.current = handle
+            if self.live:
+                self.stopped = True
+                handle.stop()
+        try:
+            best = handle.wait()
+        finally:
+            handle.stop()
+            with self.lock:
+                self.current = None
+                stopped      = self.stopped
+        if stopped:
+            return None
+        return dict(handle.info), best.move
+
+    def _schedule_periodic(self):
+        now = time.monotonic()
+        with self.lock:
+            queued = {job.name for _, _, job in self.jobs}
+        if "selftest" not in queued and now >= self.due["selftest"]:
+            self.due["selftest"] = now + SETTINGS["SELFTEST_INTERVAL"]
+            self.submit("selftest", nps_selftest(self.bot.node_budget))
+        if ("presearch" not in queued and now >= self.due["presearch"]
+                and self.bot.position_cache is not None):
+            self.due["presearch"] = now + SETTINGS["PRESEARCH_INTERVAL"]
+            self.submit("presearch", presearch(self.bot.position_cache))
+
+    def _step(self):
+        """En öncelikli işi motor elde kaldıkça ilerletir."""
+        with self.lock:
+            if not self.jobs or not self._can_run():
+                return
+            job = self.jobs[0][2]
+        try:
+            engine = self.bot.engine_pool.get_nowait()
+        except Exception:
+            return
+        try:
+            while True:
+                if job.pending is None:
+                    try:
+                        job.pending = job.gen.send(job.result)
+                    except StopIteration:
+                        self._finish(job, "done")
+                        return
+                out = self._search(engine, *job.pending)
+                if out is None:
+                    self.counts["preempted"] += 1
+                    return
+                job.pending, job.result = None, out
+                self.counts["searches"] += 1
+        except Exception as e:
+            log.warning(f"⚠️ [Idle] '{job.name}' işi bırakıldı: {e}")
+            self._finish(job, "failed")
+        finally:
+            self.bot.engine_pool.put(engine)
+
+    def _finish(self, job, outcome):
+        with self.lock:
+            self.jobs = [entry for entry in self.jobs if entry[2] is not job]
+            heapq.heapify(self.jobs)
+        self.counts[outcome] += 1
+        METRICS.inc(f"idle_jobs_{outcome}")
+
+    def _run(self):
+        while True:
+            self.wake.wait(SETTINGS["TICK"])
+            self.wake.clear()
+            try:
+                self._schedule_periodic()
+                self._step()
+            except Exception as e:
+                log.warning(f"⚠️ [Idle] Hata: {e}")
+
+    def stats(self):
+        with self.lock:
+            return {
+                "queued":  [job.name for _, _, job in sorted(self.jobs)],
+                "running": self.current is not None,
+                **self.counts,
+            }
+
+
+IDLE = IdleScheduler()
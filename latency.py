@@ -0,0 +1,146 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# ==========================================================
+# ⚙️ AYARLAR
+# ==========================================================
+SETTINGS = {
+    "MIN_SECONDS":  1e-5,    # 10µs altı ilk kovaya düşer
+    "BUCKET_RATIO": 1.08,    # Kova genişliği: ~%8 göreli hata
+    "MAX_BUCKETS":  240,     # ~100 sn üstü son kovaya düşer
+    "PERCENTILES":  (50, 95, 99),
+}
+
+# Hamle yolundaki ölçüm noktaları (rapor sırası)
+SPANS = (
+    "stream_receive",
+    "move_replay",
+    "book_probe",
+    "tablebase_probe",
+    "engine_acquire",
+    "engine_search",
+    "make_move",
+    "move_total",
+)
+
+_LOG_RATIO = math.log(SETTINGS["BUCKET_RATIO"])
+
+
+def tc_label(clock):
+    """Saat bilgisini TC_ALL biçimine çevirir ('60+1', '180')."""
+    if not isinstance(clock, dict):
+        return 'unknown'
+    if 'initial' in clock:
+        # gameFull milisaniye verir
+        limit = int(clock.get('initial') or 0) // 1000
+        inc   = int(clock.get('increment') or 0) // 1000
+    else:
+        # challenge timeControl saniye verir
+        limit = int(clock.get('limit') or 0)
+        inc   = int(clock.get('increment') or 0)
+    return f"{limit}+{inc}" if inc else str(limit)
+
+
+class Histogram:
+    """Log ölçekli sabit kovalı histogram; kayıt O(1), bellek sabit."""
+
+    __slots__ = ("buckets", "count", "total", "max")
+
+    def __init__(self):
+        self.buckets = [0] * SETTINGS["MAX_BUCKETS"]
+        self.count   = 0
+        self.total   = 0.0
+        self.max     = 0.0
+
+    def record(self, seconds):
+        if seconds <= SETTINGS["MIN_SECONDS"]:
+            idx = 0
+        else:
+            idx = min(SETTINGS["MAX_BUCKETS"] - 1,
+                      1 + int(math.log(seconds / SETTINGS["MIN_SECONDS"]) / _LOG_RATIO))
+        self.buckets[idx] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, pct):
+        if not self.count:
+            return 0.0
+        rank = max(1, int(math.ceil(pct / 100.0 * self.count)))
+        seen = 0
+        for idx, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                upper = SETTINGS["MIN_SECONDS"] * (SETTINGS["BUCKET_RATIO"] ** idx)
+                return min(upper, self.max)
+        return self.max
+
+    def summary(self):
+        out = {
+            "count":   self.count,
+            "mean_ms": round(self.total / self.count * 1000, 2) if self.count else 0.0,
+            "max_ms":  round(self.max * 1000, 2),
+        }
+        for pct in SETTINGS["PERCENTILES"]:
+            out[f"p{pct}_ms"] = round(self.percentile(pct) * 1000, 2)
+        return out
+
+
+class LatencyRegistry:
+    """(zaman kontrolü, ölçüm noktası) başına histogram tutan süreç içi kayıt defteri."""
+
+    def __init__(self):
+        self.lock       = threading.Lock()
+        self.histograms = {}
+
+    def record(self, span, tc, seconds):
+        key = (tc or 'unknown', span)
+        with self.lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = Histogram()
+            hist.record(seconds)
+
+    @contextmanager
+    def span(self, name, tc):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, tc, time.perf_counter() - t0)
+
+    def snapshot(self):
+        with self.lock:
+            items = [(k, h.summary()) for k, h in self.histograms.items()]
+        out = {}
+        for (tc, span), summary in items:
+            out.setdefault(tc, {})[span] = summary
+        return out
+
+    def format_tc(self, tc):
+        spans = self.snapshot().get(tc, {})
+        parts = []
+        for name in SPANS:
+            s = spans.get(name)
+            if s:
+                parts.append(f"{name} p50={s['p50_ms']:.0f} p95={s['p95_ms']:.0f} "
+                             f"p99={s['p99_ms']:.0f}ms (n={s['count']})")
+        return " | ".join(parts)
+
+
+def timed_stream(stream):
+    """Akıştan gelen her olayı, onu beklerken geçen süreyle birlikte verir."""
+    it = iter(stream)
+    while True:
+        t0 = time.perf_counter()
+        try:
+            item = next(it)
+        except StopIteration:
+            return
+        yield item, time.perf_counter() - t0
+
+
+LATENCY = LatencyRegistry()
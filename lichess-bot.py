@@ -10,15 +10,39 @@ import yaml
 import requests
 import queue
 import random
+from collections import OrderedDict
 from datetime import timedelta
 from matchmaking import Matchmaker, SETTINGS as MM_SETTINGS
+import botlog
+from admission import AdmissionController
+from latency import LATENCY, tc_label, timed_stream
+from metrics import METRICS, start_metrics_server
+from adjudication import GameAdjudicator, TB_WDL, load_config as load_adjudication
+from deadlines import DEADLINES, Backoff, GameDeadlines, SETTINGS as DL_SETTINGS, pump_stream, queued_events
+from emergency_search import emergency_move
+from engine_server import EngineConnection, RemoteEngine
+from engine_telemetry import TELEMETRY
+from engines import open_engine, move_overhead
+from game_archive import ARCHIVE, GameRecorder
+from idle_jobs import IDLE, postgame_review
+from memory_monitor import MemoryMonitor, plan_hash, proc_memory
+from node_budget import NodeBudget
+from position_cache import PositionCache, DepthEstimator, SETTINGS as PC_SETTINGS
+from profiler import PROFILER, TimedLock
+
+log = botlog.get_logger("bot")
 
 # ==========================================================
 # ⚙️ AYARLAR
 # ==========================================================
 SETTINGS = {
     "TOKEN":                 os.environ.get('LICHESS_TOKEN'),
+    "LICHESS_URL":           MM_SETTINGS["LICHESS_URL"],
+    "TABLEBASE_URL":         os.environ.get('TABLEBASE_URL', "https://tablebase.lichess.ovh").rstrip("/"),
     "ENGINE_PATH":           "./src/Ethereal",
+    "ENGINE_SERVER":         os.environ.get('ENGINE_SERVER', ""),   # unix:/yol veya host:port; boşsa yerel havuz
+    "REMOTE_TIMEOUT_RATIO":  5.0,     # Uzak motor yanıtı en fazla oran × hamle bütçesi (+ pay) beklenir
+    "REMOTE_TIMEOUT_SLACK":  0.5,     # Sn; soket + kuyruk payı
     "BOOK_PATH":             "./book.bin",
 
     "MAX_PARALLEL_GAMES":         2,
@@ -28,9 +52,18 @@ SETTINGS = {
     "MIN_TIME_TO_DECLINE":        600,     # 10 dk buffer
 
     "LATENCY_BUFFER":             0.07,    # Lichess ağ gecikmesi emniyet payı (70ms)
+    "PANIC_TIME_THRESHOLD":       10.0,    # Bu sürenin altı ULTRA PANİK
+    "SAFE_TIME_THRESHOLD":        25.0,    # Bu sürenin altı güvenli geçiş bölgesi
     "TABLEBASE_PIECE_LIMIT":      7,
     "ONLINE_TABLEBASE_ENABLED":   True,
     "MIN_TIME_FOR_TABLEBASE":     12.0,
+    "INSTANT_MOVES_ENABLED":      True,    # Zorunlu / TB / PV devamı hamlelerinde motoru atla
+    "TB_CACHE_SIZE":              4096,
+    "POSITION_CACHE_ENABLED":     True,    # Önceki derin aramaları diskte sakla ve yeniden kullan
+    "NODE_BUDGET_PANIC":          True,    # Panikte saat yalanı yerine ölçülmüş NPS ile 'go nodes'
+    "GAME_ARCHIVE_ENABLED":       True,    # Oyunları ve hamle başına arama bilgisini ./archive'a yaz
+    "MEMORY_MONITOR_ENABLED":     True,    # Motor RSS/PSS izleme ve Hash'i bellek bütçesine sığdırma
+    "IDLE_JOBS_ENABLED":          True,    # Boştaki motorla oyun sonu analizi, ön arama ve NPS öz testi
     "ABORT_WAIT_SECONDS":         60,
     "LOSING_SCORE_THRESHOLD":     -300,
     "CHAT_ENABLED":               True,
@@ -89,37 +122,27 @@ def pick_message(category):
 
 
 def make_client():
-    return berserk.Client(session=berserk.TokenSession(SETTINGS["TOKEN"]))
-
-
-def active_count(active_games, active_games_lock, pending_starts=None):
-    with active_games_lock:
-        pending = pending_starts["count"] if pending_starts else 0
-        return len(active_games) + pending
-
-
-def reserve_game_slot(active_games, active_games_lock, pending_starts):
-    with active_games_lock:
-        if len(active_games) + pending_starts["count"] >= SETTINGS["MAX_PARALLEL_GAMES"]:
-            return False
-        pending_starts["count"] += 1
-        return True
+    return berserk.Client(
+        session=berserk.TokenSession(SETTINGS["TOKEN"]),
+        base_url=SETTINGS["LICHESS_URL"] + "/",
+    )
 
 
-def release_reserved_slot(active_games_lock, pending_starts):
+def active_count(active_games, active_games_lock):
     with active_games_lock:
-        if pending_starts["count"] > 0:
-            pending_starts["count"] -= 1
+        return len(active_games)
 
 
-def active_add_if_room(active_games, active_games_lock, game_id):
+def active_add(active_games, active_games_lock, game_id):
+    """Başlamış oyun her zaman izlenir; limit kabul aşamasında uygulanır (aşım sadece uyarılır)."""
     with active_games_lock:
         if game_id in active_games:
             return False
-        if len(active_games) >= SETTINGS["MAX_PARALLEL_GAMES"]:
-            return False
         active_games.add(game_id)
-        return True
+        count = len(active_games)
+    if count > SETTINGS["MAX_PARALLEL_GAMES"]:
+        log.warning(f"⚠️ Paralel oyun limiti aşıldı ({count}/{SETTINGS['MAX_PARALLEL_GAMES']}): {game_id}")
+    return True
 
 
 def active_discard(active_games, active_games_lock, game_id):
@@ -134,10 +157,12 @@ def runtime_watchdog(start_time, active_games, active_games_lock):
         if elapsed > SETTINGS["MAX_TOTAL_RUNTIME"]:
             count = active_count(active_games, active_games_lock)
             if count == 0:
-                print("⏰ [Watchdog] Çalışma süresi doldu, sistem kapatılıyor.", flush=True)
+                log.info("⏰ [Watchdog] Çalışma süresi doldu, sistem kapatılıyor.")
+                ARCHIVE.flush()
+                botlog.shutdown()
                 os._exit(0)
             else:
-                print(f"⏰ [Watchdog] Süre doldu ama {count} aktif oyun var, bekleniyor...", flush=True)
+                log.info(f"⏰ [Watchdog] Süre doldu ama {count} aktif oyun var, bekleniyor...")
 
 
 # ==========================================================
@@ -166,46 +191,261 @@ class OpeningTracker:
         return "_".join(m.uci() for m in moves)
 
 
+# ==========================================================
+# 📥 ARTIMLI HAMLE AKIŞI ÇÖZÜCÜ
+# ==========================================================
+class MoveStreamDecoder:
+    """gameState 'moves' dizisinin sadece yeni son ekini çözer.
+
+    Çözülen kısmın karakter ofseti tutulur; her güncellemede sadece ofsetten
+    sonrası ayrıştırılır. Geri alma veya uyuşmazlık görülürse tahta initialFen'den
+    yeniden kurulur.
+    """
+
+    CHECK_WINDOW = 12  # Ofsetin hemen önündeki bu kadar karakter eşleşmeli
+
+    def __init__(self, initial_fen='startpos', chess960=False):
+        self.initial_fen = initial_fen
+        self.chess960    = chess960
+        self.board       = self._fresh_board()
+        self.offset      = 0
+        self.last        = ''
+        self.rebuilds    = 0
+        self.dirty       = False
+
+    def _fresh_board(self):
+        if self.initial_fen and self.initial_fen != 'startpos':
+            return chess.Board(self.initial_fen, chess960=self.chess960)
+        return chess.Board(chess960=self.chess960)
+
+    def _in_sync(self, moves_str):
+        if self.dirty or len(moves_str) < self.offset:
+            return False
+        if self.offset and len(moves_str) > self.offset and not moves_str[self.offset].isspace():
+            return False
+        lo = max(0, self.offset - self.CHECK_WINDOW)
+        return moves_str[lo:self.offset] == self.last[lo:self.offset]
+
+    def _push_from(self, moves_str, start):
+        """start ofsetinden itibaren hamleleri uygular; eklenen hamle sayısını döndürür."""
+        pushed = 0
+        pos    = start
+        end    = len(moves_str)
+        while pos < end:
+            while pos < end and moves_str[pos].isspace():
+                pos += 1
+            if pos >= end:
+                break
+            stop = moves_str.find(' ', pos)
+            if stop < 0:
+                stop = end
+            token = moves_str[pos:stop]
+            try:
+                self.board.push(self.board.parse_uci(token))
+            except ValueError as e:
+                # Kısmi uygulanmış tahtaya güvenilmez; sonraki güncelleme baştan kurar
+                self.dirty = True
+                raise ValueError(f"{token}: {e}")
+            pushed += 1
+            pos = stop
+            self.offset = stop
+        self.last = moves_str
+        return pushed
+
+    def _rebuild(self, moves_str):
+        self.rebuilds += 1
+        self.board  = self._fresh_board()
+        self.offset = 0
+        self.last   = ''
+        self.dirty  = False
+        return self._push_from(moves_str, 0)
+
+    def update(self, moves_str):
+        """Yeni hamleleri uygular. (eklenen hamle sayısı, yeniden kuruldu mu) döndürür."""
+        moves_str = moves_str or ''
+        if self._in_sync(moves_str):
+            return self._push_from(moves_str, self.offset), False
+
+        # Geri alma: yeni dizi eskisinin öneki ise sadece fazla hamleler geri alınır
+        if (not self.dirty and len(moves_str) < self.offset
+                and self.last.startswith(moves_str.rstrip())):
+            removed = self.last[len(moves_str.rstrip()):self.offset].split()
+            if len(removed) <= len(self.board.move_stack):
+                for _ in removed:
+                    self.board.pop()
+                self.offset = len(moves_str.rstrip())
+                self.last   = moves_str
+                return 0, True
+
+        return self._rebuild(moves_str), True
+
+
+# ==========================================================
+# ⚡ ANINDA HAMLE KATMANI
+# ==========================================================
+class InstantMoveLayer:
+    """Motora gitmeden oynanabilecek hamleleri bulur: zorunlu hamle,
+    önceden bilinen tablebase sonucu ve panik kademesinde PV devamı."""
+
+    def __init__(self, tb_cache_size=None):
+        self.lock          = TimedLock("instant_moves")
+        self.pv_by_game    = {}
+        self.tb_cache      = OrderedDict()
+        self.tb_cache_size = tb_cache_size or SETTINGS["TB_CACHE_SIZE"]
+
+    def remember_pv(self, game_id, board, pv):
+        """Motorun PV'si, hamlemizden önceki yarım hamle sayısıyla birlikte saklanır."""
+        if not game_id or not pv or len(pv) < 3:
+            return
+        with self.lock:
+            self.pv_by_game[game_id] = (len(board.move_stack), list(pv))
+
+    def remember_tablebase(self, board, move):
+        with self.lock:
+            key = board.epd()
+            self.tb_cache[key] = move
+            self.tb_cache.move_to_end(key)
+            while len(self.tb_cache) > self.tb_cache_size:
+                self.tb_cache.popitem(last=False)
+
+    def forget(self, game_id):
+        with self.lock:
+            self.pv_by_game.pop(game_id, None)
+
+    def decide(self, board, game_id, tier):
+        """(hamle, sebep) veya (None, None) döndürür."""
+        legal = board.legal_moves
+        if legal.count() == 1:
+            return next(iter(legal)), 'forced'
+
+        with self.lock:
+            tb_move = self.tb_cache.get(board.epd()) if self.tb_cache else None
+            stored  = self.pv_by_game.get(game_id) if game_id else None
+        if tb_move is not None and tb_move in legal:
+            return tb_move, 'tablebase'
+
+        # Rakip, önceki aramanın tahmin ettiği hamleyi oynadıysa PV'nin üçüncü hamlesi hazırdır
+        if tier == 'panic' and stored:
+            ply, pv = stored
+            stack = board.move_stack
+            if (len(stack) == ply + 2
+                    and stack[-2] == pv[0] and stack[-1] == pv[1]
+                    and pv[2] in legal):
+                return pv[2], 'pv'
+
+        return None, None
+
+
 # ==========================================================
 # 🧠 MOTOR YÖNETİMİ
 # ==========================================================
+def clock_tier(my_seconds):
+    """Buffer düşülmüş kalan süreye göre saat kademesini döndürür."""
+    if my_seconds < SETTINGS["PANIC_TIME_THRESHOLD"]:
+        return 'panic'
+    if my_seconds < SETTINGS["SAFE_TIME_THRESHOLD"]:
+        return 'transition'
+    return 'standard'
+
+
 class OxydanV11:
-    def __init__(self, exe_path, uci_options=None):
+    def __init__(self, exe_path, uci_options=None, pool_size=None):
         self.exe_path        = exe_path
         self.book_path       = SETTINGS["BOOK_PATH"]
         self.engine_pool     = queue.Queue()
         self.opening_tracker = OpeningTracker(memory_size=10)
-
-        pool_size = SETTINGS["MAX_PARALLEL_GAMES"] + 1
-        config_overhead = 100
-        if uci_options:
-            config_overhead = uci_options.get("Move Overhead",
-                              uci_options.get("MoveOverhead", 100))
+        self.instant         = InstantMoveLayer()
+        self.depth_model     = DepthEstimator()
+        self.node_budget     = NodeBudget()
+        self.reports         = {}
+        self.engines         = []
+        self.hash_mb         = None
+        self.position_cache  = None
+        if SETTINGS.get("POSITION_CACHE_ENABLED", True):
+            try:
+                self.position_cache = PositionCache()
+            except Exception as e:
+                log.warning(f"⚠️ Pozisyon önbelleği açılamadı: {e}")
+
+        if pool_size is None:
+            pool_size = SETTINGS["MAX_PARALLEL_GAMES"] + 1
+        self.pool_size = pool_size
+        config_overhead = move_overhead(uci_options)
+
+        # Paylaşılan motor sunucusu varsa havuz, aynı bağlantıyı kullanan uzak tutamaçlardan oluşur
+        self.remote = None
+        if SETTINGS.get("ENGINE_SERVER"):
+            self.remote = EngineConnection(SETTINGS["ENGINE_SERVER"])
+        elif SETTINGS.get("MEMORY_MONITOR_ENABLED", True):
+            # Havuz açılmadan Hash bellek bütçesine sığdırılır (NNUE paylaşımlı varsayılır; izleyici düzeltir)
+            uci_options  = dict(uci_options or {})
+            requested    = int(uci_options.get("Hash", 16))
+            self.hash_mb = plan_hash(pool_size, requested, bot_mb=proc_memory(os.getpid())["rss"])
+            if self.hash_mb < requested:
+                log.warning(f"⚠️ Hash {requested}MB × {pool_size} bellek bütçesine sığmıyor → {self.hash_mb}MB")
+            uci_options["Hash"] = self.hash_mb
 
         try:
             for _ in range(pool_size):
-                eng = chess.engine.SimpleEngine.popen_uci(self.exe_path, timeout=30)
-                try:
-                    eng.configure({"Move Overhead": config_overhead})
-                except Exception:
+                if self.remote is not None:
+                    eng = RemoteEngine(self.remote)
+                else:
+                    eng = open_engine(self.exe_path, uci_options)
+                self.engines.append(eng)
+                if SETTINGS.get("NODE_BUDGET_PANIC", True):
                     try:
-                        eng.configure({"MoveOverhead": config_overhead})
-                    except Exception:
-                        pass
-                if uci_options:
-                    for opt, val in uci_options.items():
-                        if opt in ("MoveOverhead", "Move Overhead"):
-                            continue
-                        try:
-                            eng.configure({opt: val})
-                        except Exception:
-                            pass
+                        self.node_budget.calibrate(eng)
+                    except chess.engine.EngineError as e:
+                        log.warning(f"⚠️ NPS ölçümü başarısız: {e}")
                 self.engine_pool.put(eng)
-            print(f"🚀 {pool_size} Motor Hazır. Move Overhead: {config_overhead}ms", flush=True)
+            nps = self.node_budget.stats()["nps_mean"]
+            where = f" | Sunucu: {SETTINGS['ENGINE_SERVER']}" if self.remote is not None else ""
+            log.info(f"🚀 {pool_size} Motor Hazır. Move Overhead: {config_overhead}ms"
+                     + (f" | NPS: {nps:,}" if nps else "") + where)
         except Exception as e:
-            print(f"KRİTİK HATA: {e}", flush=True)
+            log.error(f"KRİTİK HATA: {e}")
+            botlog.shutdown()
             sys.exit(1)
 
+    def resize_hash(self, mb):
+        """Havuzdaki her motorun Hash'ini değiştirir; kullanımdaki motorlar için sıra beklenir.
+
+        Kuyruk FIFO olduğundan boştakiler tekrar gelir; her motor bir kez ayarlanır ve
+        hash_mb ancak hepsi ayarlandıktan sonra güncellenir (izleyici erken "bütçe tamam" demesin).
+        """
+        done = set()
+        while len(done) < len(self.engines):
+            eng = self.engine_pool.get()
+            if id(eng) in done:
+                # Kalanlar oyunda / arka plan işinde: geri dönmelerini bekle
+                self.engine_pool.put(eng)
+                time.sleep(0.05)
+                continue
+            try:
+                eng.configure({"Hash": mb})
+            except chess.engine.EngineError as e:
+                log.warning(f"⚠️ Hash ayarlanamadı: {e}")
+            finally:
+                done.add(id(eng))
+                self.engine_pool.put(eng)
+        self.hash_mb = mb
+
+    def close(self):
+        if self.position_cache is not None:
+            self.position_cache.close()
+        if self.remote is not None:
+            self.remote.close()
+        while True:
+            try:
+                eng = self.engine_pool.get_nowait()
+            except queue.Empty:
+                return
+            TELEMETRY.forget(eng)
+            try:
+                eng.quit()
+            except Exception:
+                pass
+
     def get_score(self, board):
         engine = None
         try:
@@ -215,7 +455,7 @@ class OxydanV11:
             if score:
                 return score.white().score(mate_score=10000)
         except Exception as e:
-            print(f"⚠️ Skor analizi hatası: {e}")
+            log.warning(f"⚠️ Skor analizi hatası: {e}")
         finally:
             if engine:
                 self.engine_pool.put(engine)
@@ -231,57 +471,88 @@ class OxydanV11:
         except (TypeError, ValueError):
             return 0.0
 
-    def fallback_move(self, board):
-        legal = list(board.legal_moves)
-        if not legal:
-            return None
-
-        best_move = legal[0]
-        best_score = -10**9
-        piece_values = {
-            chess.PAWN: 100,
-            chess.KNIGHT: 320,
-            chess.BISHOP: 330,
-            chess.ROOK: 500,
-            chess.QUEEN: 900,
-            chess.KING: 0,
-        }
-
-        for move in legal:
-            score = 0
-            if board.is_capture(move):
-                captured = board.piece_at(move.to_square)
-                mover = board.piece_at(move.from_square)
-                if captured:
-                    score += 10 * piece_values.get(captured.piece_type, 0)
-                if mover:
-                    score -= piece_values.get(mover.piece_type, 0)
-            if move.promotion:
-                score += piece_values.get(move.promotion, 0)
-            if board.gives_check(move):
-                score += 80
-
-            board.push(move)
-            if board.is_checkmate():
-                score += 100000
-            if board.is_repetition(2):
-                score -= 50
-            board.pop()
-
-            if score > best_score:
-                best_score = score
-                best_move = move
-
-        return best_move
-
-    def get_best_move(self, board, wtime, btime, winc, binc):
+    def _report(self, game_id, source, **fields):
+        """Son hamlenin kaynağı ve arama bilgisi (skor hamle yapan taraf açısından cp)."""
+        if game_id:
+            fields["source"] = source
+            self.reports[game_id] = fields
+
+    def last_report(self, game_id):
+        return self.reports.get(game_id)
+
+    def forget(self, game_id):
+        self.instant.forget(game_id)
+        self.reports.pop(game_id, None)
+
+    def fallback_move(self, board, my_time=1.0, my_inc=0.0):
+        """Motor yokken süre sınırlı acil arama; o da çökerse ilk yasal hamle."""
+        try:
+            move, score, depth, nodes = emergency_move(
+                board, max(0.01, my_time - SETTINGS.get("LATENCY_BUFFER", 0.07)), my_inc)
+            if move is not None and move in board.legal_moves:
+                log.info(f"🛟 Acil arama: {move.uci()} | d{depth} {nodes} düğüm | skor {score}")
+                return move
+        except Exception as e:
+            log.error(f"🚨 Acil arama hatası: {type(e).__name__} - {e}")
+        return next(iter(board.legal_moves), None)
+
+    @staticmethod
+    def send_clock(my_seconds, my_inc_seconds):
+        """Motora bildirilecek (süre, artırma) çifti."""
+        # =================================================================
+        # ⚡ AKILLI CLOCK MANİPÜLASYONU (KADEMELİ SÜRE YÖNETİMİ)
+        # =================================================================
+        tier = clock_tier(my_seconds)
+        if tier == 'panic':
+            # 🛑 1. ULTRA PANİK: Artırmayı gizle, saati çok az göster.
+            return OxydanV11.panic_budget(my_seconds, my_inc_seconds), 0.0
+        if tier == 'transition':
+            # ⚠️ 2. GÜVENLİ GEÇİŞ BÖLGESİ: Derin düşünmeyi engelle, süre biriktir.
+            return my_seconds, my_inc_seconds * 0.3
+        # 🧠 3. STANDART MOD: Süre sağlıklı, Ethereal özgür.
+        return my_seconds, my_inc_seconds
+
+    @staticmethod
+    def panic_budget(my_seconds, my_inc_seconds):
+        """Panikte tek hamleye ayrılan süre."""
+        # min(my_seconds, ...) ekleyerek botun elindeki gerçek süreden 
+        # daha büyük bir yalan söylemesini kesinlikle engelliyoruz!
+        panic_time = my_inc_seconds * 0.3 if my_inc_seconds > 0 else 0.20
+        return max(0.02, min(my_seconds * 0.5, panic_time))
+
+    @staticmethod
+    def search_budget(send_time, send_inc):
+        """Motorun bu saatle tek hamleye ayıracağı kaba süre tahmini."""
+        return send_time / 30.0 + send_inc * 0.75
+
+    @staticmethod
+    def remote_timeout(my_seconds, budget):
+        """Uzak motor yanıtı için son süre; saatin yarısı yedek hamleye kalır."""
+        wait = SETTINGS["REMOTE_TIMEOUT_RATIO"] * budget + SETTINGS["REMOTE_TIMEOUT_SLACK"]
+        return max(0.05, min(my_seconds * 0.5, wait))
+
+    def get_best_move(self, board, wtime, btime, winc, binc, tc=None, game_id=None):
+        t_enter = time.perf_counter()
         my_time = self.to_seconds(wtime if board.turn == chess.WHITE else btime)
         my_inc  = self.to_seconds(winc  if board.turn == chess.WHITE else binc)
 
+        # 0. ANINDA HAMLE (zorunlu / bilinen TB / panikte PV devamı)
+        if SETTINGS.get("INSTANT_MOVES_ENABLED", True):
+            tier = clock_tier(max(0.01, my_time - SETTINGS.get("LATENCY_BUFFER", 0.07)))
+            move, reason = self.instant.decide(board, game_id, tier)
+            if move is not None:
+                METRICS.inc(f"instant_{reason}")
+                log.info(f"⚡ Anında hamle [{reason}] {game_id or '-'} | "
+                         f"{board.fullmove_number}. {move.uci()} | Kalan: {my_time:.2f}s ({tier})")
+                self._report(game_id, f"instant_{reason}")
+                return move
+
         # 1. KİTAP DETEKSİYONU
         if not board.chess960 and os.path.exists(self.book_path):
+            METRICS.inc("book_probes")
             try:
-                with chess.polyglot.open_reader(self.book_path) as reader:
+                with LATENCY.span("book_probe", tc), \
+                        chess.polyglot.open_reader(self.book_path) as reader:
                     entries = list(reader.find_all(board))
                     if entries:
                         shuffled = list(entries)
@@ -292,37 +563,69 @@ class OxydanV11:
                             key = self.opening_tracker.get_opening_key(board)
                             board.pop()
                             if not self.opening_tracker.was_recent(key):
+                                METRICS.inc("book_hits")
+                                self._report(game_id, "book")
                                 return entry.move
                         for entry in shuffled:
                             if entry.move in board.legal_moves:
+                                METRICS.inc("book_hits")
+                                self._report(game_id, "book")
                                 return entry.move
             except Exception as e:
-                print(f"📖 Kitap Hatası: {e}")
+                log.warning(f"📖 Kitap Hatası: {e}")
 
         # 2. TABLEBASE DETEKSİYONU
         if (SETTINGS.get("ONLINE_TABLEBASE_ENABLED", True)
                 and my_time >= SETTINGS.get("MIN_TIME_FOR_TABLEBASE", 12.0)
                 and not board.chess960
                 and len(board.piece_map()) <= SETTINGS["TABLEBASE_PIECE_LIMIT"]):
+            METRICS.inc("tablebase_probes")
             try:
-                r = requests.get(
-                    "https://tablebase.lichess.ovh/standard",
-                    params={"fen": board.fen()},
-                    timeout=min(0.4, max(0.05, my_time * 0.02))
-                )
+                with LATENCY.span("tablebase_probe", tc):
+                    r = requests.get(
+                        f"{SETTINGS['TABLEBASE_URL']}/standard",
+                        params={"fen": board.fen()},
+                        timeout=min(0.4, max(0.05, my_time * 0.02))
+                    )
                 if r.status_code == 200:
                     data = r.json()
                     if data.get("moves"):
                         best = chess.Move.from_uci(data["moves"][0]["uci"])
                         if best in board.legal_moves:
+                            METRICS.inc("tablebase_hits")
+                            self.instant.remember_tablebase(board, best)
+                            self._report(game_id, "tablebase", wdl=TB_WDL.get(data.get("category")))
                             return best
             except:
                 pass
 
-        # 3. 🚀 YENİLENEN MOTOR VE ZAMAN YÖNETİMİ
+        # 3. POZİSYON ÖNBELLEĞİ (önceki oyunlardaki derin aramalar)
+        cache_key = None
+        if (self.position_cache is not None
+                and not board.chess960
+                and len(board.move_stack) <= PC_SETTINGS["MAX_PLY"]
+                and not board.is_repetition(2)):
+            METRICS.inc("position_cache_probes")
+            cache_key = chess.polyglot.zobrist_hash(board)
+            entry = self.position_cache.probe(board, cache_key)
+            if entry is not None and entry.move in board.legal_moves:
+                seconds = max(0.01, my_time - SETTINGS.get("LATENCY_BUFFER", 0.07))
+                budget = self.search_budget(*self.send_clock(seconds, my_inc))
+                reachable = self.depth_model.estimate(budget)
+                if reachable is not None and entry.depth > reachable:
+                    METRICS.inc("position_cache_hits")
+                    log.info(f"💾 Önbellek hamlesi {game_id or '-'} | {board.fullmove_number}. "
+                             f"{entry.move.uci()} | d{entry.depth} > ~d{reachable:.0f} "
+                             f"({entry.seconds:.1f}s kazanıldı)")
+                    self._report(game_id, "cache", score=entry.score, depth=entry.depth)
+                    return entry.move
+
+        # 4. 🚀 YENİLENEN MOTOR VE ZAMAN YÖNETİMİ
         engine = None
+        IDLE.begin_live()   # Boşta çalışan arka plan araması varsa hemen durur
         try:
-            engine = self.engine_pool.get(timeout=5)
+            with LATENCY.span("engine_acquire", tc):
+                engine = self.engine_pool.get(timeout=5)
             buffer = SETTINGS.get("LATENCY_BUFFER", 0.07)
 
             # Hamle sırasına göre aktif ve pasif oyuncunun sürelerini ayırıyoruz
@@ -339,27 +642,19 @@ class OxydanV11:
             my_inc_seconds = self.to_seconds(my_raw_inc)
             op_inc_seconds = self.to_seconds(op_raw_inc)
 
-            # =================================================================
-            # ⚡ AKILLI CLOCK MANİPÜLASYONU (KADEMELİ SÜRE YÖNETİMİ)
-            # =================================================================
-            if my_seconds < 10.0:
-                # 🛑 1. ULTRA PANİK: Artırmayı gizle, saati çok az göster.
-                # min(my_seconds, ...) ekleyerek botun elindeki gerçek süreden 
-                # daha büyük bir yalan söylemesini kesinlikle engelliyoruz!
-                panic_time = my_inc_seconds * 0.3 if my_inc_seconds > 0 else 0.20
-                my_send_time = max(0.02, min(my_seconds * 0.5, panic_time))
-                my_send_inc = 0.0
-            elif my_seconds < 25.0:
-                # ⚠️ 2. GÜVENLİ GEÇİŞ BÖLGESİ: Derin düşünmeyi engelle, süre biriktir.
-                my_send_time = my_seconds
-                my_send_inc = my_inc_seconds * 0.3
-            else:
-                # 🧠 3. STANDART MOD: Süre sağlıklı, Ethereal özgür.
-                my_send_time = my_seconds
-                my_send_inc = my_inc_seconds
+            my_send_time, my_send_inc = self.send_clock(my_seconds, my_inc_seconds)
 
+            # Panikte motora sahte saat yerine ölçülmüş NPS'ten düğüm bütçesi verilir
+            node_budget = None
+            if (SETTINGS.get("NODE_BUDGET_PANIC", True)
+                    and clock_tier(my_seconds) == 'panic'
+                    and self.node_budget.ready(engine)):
+                node_budget = self.panic_budget(my_seconds, my_inc_seconds)
+
+            if node_budget is not None:
+                limit = chess.engine.Limit(nodes=self.node_budget.nodes_for(engine, node_budget))
             # Renklere göre limit nesnesini dinamik olarak dolduruyoruz
-            if board.turn == chess.WHITE:
+            elif board.turn == chess.WHITE:
                 limit = chess.engine.Limit(
                     white_clock=my_send_time,
                     black_clock=op_seconds,
@@ -374,9 +669,44 @@ class OxydanV11:
                     black_inc=my_send_inc,
                 )
             
-            result = engine.play(board, limit)
-            
+            # Asılı kalan motor sunucusu saati yemesin: süre dolunca EngineError → yedek hamle
+            remote = {}
+            if self.remote is not None:
+                remote["timeout"] = self.remote_timeout(
+                    my_seconds, node_budget or self.search_budget(my_send_time, my_send_inc))
+
+            t0 = time.perf_counter()
+            with LATENCY.span("engine_search", tc):
+                result = engine.play(board, limit, info=chess.engine.INFO_ALL, **remote)
+            elapsed = time.perf_counter() - t0
+            METRICS.observe_search(result.info)
+            TELEMETRY.observe(engine, result.info, elapsed,
+                              node_budget or self.search_budget(my_send_time, my_send_inc),
+                              node_limited=node_budget is not None, tc=tc)
+            self.node_budget.observe(engine, result.info, elapsed, node_budget)
+            if node_budget is not None:
+                METRICS.inc("panic_node_searches")
+                if elapsed > node_budget:
+                    METRICS.inc("panic_node_overshoots")
+
             if result.move and result.move in board.legal_moves:
+                METRICS.inc("engine_moves")
+                depth = result.info.get("depth")
+                if depth and node_budget is None:
+                    self.depth_model.observe(self.search_budget(my_send_time, my_send_inc), depth)
+                score = result.info.get("score")
+                score = score.relative.score(mate_score=32000) if score else None
+                nodes = result.info.get("nodes")
+                self._report(game_id, "engine", score=score, depth=depth, nodes=nodes,
+                             nps=result.info.get("nps") or (int(nodes / elapsed) if nodes and elapsed else None),
+                             time=result.info.get("time") or elapsed)
+                if cache_key is not None and depth:
+                    if self.position_cache.store(board, result.move, score, depth,
+                                                 result.info.get("time") or elapsed, cache_key):
+                        METRICS.inc("position_cache_stores")
+                pv = result.info.get("pv")
+                if pv and pv[0] == result.move:
+                    self.instant.remember_pv(game_id, board, pv)
                 if len(board.move_stack) <= 10:
                     board.push(result.move)
                     self.opening_tracker.record(
@@ -384,14 +714,18 @@ class OxydanV11:
                     )
                     board.pop()
                 return result.move
-            print(f"⚠️ Motor yasal olmayan hamle: {result.move}, fallback.")
+            log.warning(f"⚠️ Motor yasal olmayan hamle: {result.move}, fallback.")
         except Exception as e:
-            print(f"🚨 Motor Hatası (Fallback tetiklendi!): {type(e).__name__} - {e}")
+            log.error(f"🚨 Motor Hatası (Fallback tetiklendi!): {type(e).__name__} - {e}")
         finally:
             if engine:
                 self.engine_pool.put(engine)
+            IDLE.end_live()
 
-        return self.fallback_move(board)
+        METRICS.inc("fallback_moves")
+        self._report(game_id, "fallback")
+        # Havuz beklemesi / motor çökmesi saatten yemiş olabilir
+        return self.fallback_move(board, my_time - (time.perf_counter() - t_enter), my_inc)
 
 # ==========================================================
 # 🎮 OYUN YÖNETİMİ VE DİĞER FONKSİYONLAR (DEĞİŞMEDİ)
@@ -415,7 +749,7 @@ def _send_message(client, game_id, text, spectator=False):
     except TypeError:
         pass
     except Exception as e:
-        print(f"⚠️ Mesaj gönderilemedi ({game_id}, spectator={spectator}): {e}")
+        log.warning(f"⚠️ Mesaj gönderilemedi ({game_id}, spectator={spectator}): {e}")
         return
 
     for kwargs in ({"room": "spectator" if spectator else "player"}, {}):
@@ -425,31 +759,148 @@ def _send_message(client, game_id, text, spectator=False):
         except TypeError:
             continue
         except Exception as e:
-            print(f"⚠️ Mesaj gönderilemedi ({game_id}, {kwargs}): {e}")
+            log.warning(f"⚠️ Mesaj gönderilemedi ({game_id}, {kwargs}): {e}")
             return
 
-    print(f"⚠️ Mesaj gönderilemedi ({game_id}): post_message imzası uyumsuz.")
+    log.warning(f"⚠️ Mesaj gönderilemedi ({game_id}): post_message imzası uyumsuz.")
+
+
+def _bot_game_action(game_id, action):
+    """berserk'te karşılığı olmayan bot oyun uç noktaları (claim-victory vb.)."""
+    try:
+        r = requests.post(
+            f"{SETTINGS['LICHESS_URL']}/api/bot/game/{game_id}/{action}",
+            headers={"Authorization": f"Bearer {SETTINGS['TOKEN']}"},
+            timeout=10,
+        )
+        if r.status_code != 200:
+            log.warning(f"⚠️ {action} reddedildi ({game_id}): {r.status_code} {r.text[:120]}")
+        return r.status_code == 200
+    except requests.RequestException as e:
+        log.warning(f"⚠️ {action} hatası ({game_id}): {e}")
+        return False
+
+
+def _game_is_ongoing(client, game_id):
+    try:
+        return any(g.get('gameId') == game_id for g in client.games.get_ongoing(count=50))
+    except Exception:
+        return True   # Emin değilsek oyunu bırakma
+
+
+def _pgn_result(winner, status):
+    if winner == 'white':
+        return '1-0'
+    if winner == 'black':
+        return '0-1'
+    return '1/2-1/2' if status in ('draw', 'stalemate', 'outoftime', 'timeout') else '*'
+
+
+def _archive_headers(state, game_id, variant, clock, my_color):
+    white, black = state.get('white', {}), state.get('black', {})
+    limit, inc   = clock.get('initial', 0), clock.get('increment', 0)
+    return {
+        "Event":       f"{'Rated' if state.get('rated') else 'Casual'} {variant} game",
+        "Site":        f"{SETTINGS['LICHESS_URL']}/{game_id}",
+        "Date":        time.strftime("%Y.%m.%d"),
+        "White":       white.get('name') or white.get('id') or '?',
+        "Black":       black.get('name') or black.get('id') or '?',
+        "WhiteElo":    white.get('rating') or '?',
+        "BlackElo":    black.get('rating') or '?',
+        "TimeControl": f"{int(limit // 1000)}+{int(inc // 1000)}" if clock else '-',
+        "Variant":     variant,
+        "_opponent":   (black if my_color == chess.WHITE else white).get('id', ''),
+        "_tc":         tc_label(clock),
+        "_mode":       'chess960' if variant == 'chess960' else _get_game_mode(clock),
+        "_rated":      bool(state.get('rated')),
+        "_color":      'white' if my_color == chess.WHITE else 'black',
+        "_inc_ms":     int(inc),
+    }
 
 
 def handle_game(client, game_id, bot, my_id, mm):
+    events    = queue.Queue()
+    stop      = threading.Event()
+    deadlines = GameDeadlines(DEADLINES, events)
+    recorder  = None
+    board     = None
     try:
-        stream = client.bots.stream_game_state(game_id)
+        threading.Thread(target=pump_stream,
+                         args=(lambda: client.bots.stream_game_state(game_id), events, stop),
+                         daemon=True).start()
 
         board            = None
+        decoder          = None
         my_color         = None
-        last_move_count  = 0
         is_vs_human      = False
-        game_started     = False
-        game_start_time  = None
         losing_msg_sent  = False
         game_mode        = 'blitz'
         rated            = False
         opp_id           = ''
+        tc               = 'unknown'
+        adjudicator      = None
+
+        for state, waited in timed_stream(queued_events(events)):
+            received_at = time.perf_counter()
+            if state.get('type') == 'streamEnd':
+                if state.get('error'):
+                    log.warning(f"⚠️ Oyun akışı bırakıldı ({game_id}): {state['error']}")
+                break
 
-        for state in stream:
-            if 'error' in state: break
+            if 'error' in state:
+                log.warning(f"⚠️ Oyun akışı hatası ({game_id}): {state['error']}")
+                break
+
+            if state['type'] == 'streamLost':
+                log.warning(f"⚠️ Oyun akışı koptu ({game_id}), yeniden bağlanılıyor: {state['reason']}")
+                METRICS.inc("stream_disconnects")
+                continue
+
+            if state['type'] == 'streamResumed':
+                # Sıradaki olay yeni akışın gameFull'u: tahta ve saatler oradan senkronlanır
+                LATENCY.record("stream_reconnect", tc, state['lost_for'])
+                METRICS.inc("stream_reconnects")
+                log.info(f"🔌 Oyun akışı yeniden bağlandı ({game_id}): "
+                         f"{state['lost_for']:.1f}s, {state['attempts']} deneme")
+                continue
+
+            if state['type'] == 'deadline':
+                if not deadlines.take(state):
+                    continue
+                kind = state['kind']
+                if kind == 'abort' and (board is None or len(board.move_stack) < 2):
+                    try:
+                        client.bots.abort_game(game_id)
+                        log.info(f"⏳ Abort: {game_id} (rakip hamle yapmadı)")
+                        METRICS.inc("deadline_aborts")
+                    except Exception as e:
+                        log.warning(f"⚠️ Abort hatası: {e}")
+                    break
+                if kind == 'claim':
+                    if _bot_game_action(game_id, 'claim-victory'):
+                        log.info(f"🏳️ Galibiyet talep edildi: {game_id} (rakip ayrıldı)")
+                        METRICS.inc("victory_claims")
+                    deadlines.arm('stall', DL_SETTINGS["STALL_RECHECK"])
+                elif kind == 'stall':
+                    if not _game_is_ongoing(client, game_id):
+                        log.info(f"🧹 Akışı ölü oyun bırakıldı: {game_id}")
+                        METRICS.inc("stalled_games_reaped")
+                        break
+                    deadlines.arm('stall', DL_SETTINGS["STALL_RECHECK"])
+                continue
+
+            if state['type'] == 'opponentGone':
+                if state.get('gone'):
+                    deadlines.arm('claim', state.get('claimWinInSeconds') or 0)
+                else:
+                    deadlines.disarm('claim')
+                continue
+
+            if state['type'] == 'gameFull' and decoder is not None:
+                # Yeniden bağlanma: oyun kurulumu tekrarlanmaz, sadece durum senkronlanır
+                curr_state = state['state']
 
-            if state['type'] == 'gameFull':
+            elif state['type'] == 'gameFull':
                 white = state.get('white', {})
                 black = state.get('black', {})
                 rated = bool(state.get('rated', False))
@@ -461,28 +912,30 @@ def handle_game(client, game_id, bot, my_id, mm):
                 is_vs_human = opp_title != 'BOT'
 
                 if opp_id.lower() in MM_SETTINGS.get("PERMANENT_BLACKLIST", set()):
-                    print(f"🚫 Blacklisted rakip: {opp_id} — resign yapılıyor.")
+                    log.info(f"🚫 Blacklisted rakip: {opp_id} — resign yapılıyor.")
                     try:
                         client.bots.resign_game(game_id)
                     except Exception as e:
-                        print(f"⚠️ Resign hatası: {e}")
+                        log.warning(f"⚠️ Resign hatası: {e}")
                     return
 
                 variant     = state.get('variant', {}).get('key', 'standard')
                 is_960      = variant == 'chess960'
                 initial_fen = state.get('initialFen', 'startpos')
-
-                if initial_fen and initial_fen != 'startpos':
-                    board = chess.Board(initial_fen, chess960=is_960)
-                else:
-                    board = chess.Board(chess960=is_960)
+                decoder     = MoveStreamDecoder(initial_fen, is_960)
+                board       = decoder.board
 
                 clock     = state.get('clock', {})
                 game_mode = 'chess960' if is_960 else _get_game_mode(clock)
+                tc        = tc_label(clock)
+                adjudicator = GameAdjudicator(game_mode, rated, is_vs_human)
+                botlog.bind(opponent=opp_id, tc=tc, mode=game_mode, rated=rated)
+                if SETTINGS.get("GAME_ARCHIVE_ENABLED", True):
+                    recorder = GameRecorder(game_id, _archive_headers(state, game_id, variant, clock, my_color))
 
-                last_move_count = 0
-                game_start_time = time.time()
                 losing_msg_sent = False
+                deadlines.arm('abort', SETTINGS["ABORT_WAIT_SECONDS"])
+                METRICS.inc("games_started")
 
                 greeting_cat = "greeting_human" if is_vs_human else "greeting_bot"
                 if not rated or SETTINGS.get("CHAT_IN_RATED", True):
@@ -496,32 +949,31 @@ def handle_game(client, game_id, bot, my_id, mm):
                 continue
 
             if board is None: continue
+            LATENCY.record("stream_receive", tc, waited)
 
-            moves_str = curr_state.get('moves', '').strip()
-            moves     = moves_str.split() if moves_str else []
-
-            if len(moves) > last_move_count:
-                game_started = True
-                for m in moves[last_move_count:]:
-                    try:
-                        board.push(board.parse_uci(m))
-                    except Exception as e:
-                        print(f"⚠️ Hamle parse hatası ({m}): {e}")
-                        break
-                last_move_count = len(board.move_stack)
-
-            if (not game_started
-                    and game_start_time
-                    and (time.time() - game_start_time) > SETTINGS["ABORT_WAIT_SECONDS"]):
-                try:
-                    client.bots.abort_game(game_id)
-                    print(f"⏳ Abort: {game_id} (rakip hamle yapmadı)")
-                except Exception as e:
-                    print(f"⚠️ Abort hatası: {e}")
-                break
+            try:
+                with LATENCY.span("move_replay", tc):
+                    pushed, rebuilt = decoder.update(curr_state.get('moves', ''))
+            except ValueError as e:
+                log.warning(f"⚠️ Hamle parse hatası: {e}")
+                continue
+            board = decoder.board
+            if rebuilt:
+                log.info(f"🔄 Hamle akışı yeniden senkronlandı ({game_id}, {len(board.move_stack)} hamle)")
+            if len(board.move_stack) >= 2:
+                deadlines.disarm('abort')
+            if recorder:
+                recorder.observe_clocks(len(board.move_stack),
+                                        bot.to_seconds(curr_state.get('wtime')) * 1000,
+                                        bot.to_seconds(curr_state.get('btime')) * 1000)
+
+            # Sıradaki tarafın saati + pay içinde yeni olay gelmezse akış ölü sayılır
+            turn_clock = curr_state.get('wtime') if board.turn == chess.WHITE else curr_state.get('btime')
+            deadlines.arm('stall', bot.to_seconds(turn_clock) + DL_SETTINGS["STALL_GRACE"])
 
             status = curr_state.get('status')
-            if status in ['mate', 'resign', 'draw', 'outoftime', 'aborted', 'stalemate']:
+            if status in ['mate', 'resign', 'draw', 'outoftime', 'aborted', 'stalemate',
+                          'timeout', 'noStart']:
                 winner       = curr_state.get('winner')
                 my_color_str = 'white' if my_color == chess.WHITE else 'black'
 
@@ -538,9 +990,23 @@ def handle_game(client, game_id, bot, my_id, mm):
                 if is_vs_human and (not rated or SETTINGS.get("CHAT_IN_RATED", True)):
                     time.sleep(1)
                     _send_message(client, game_id, pick_message("human_postgame"))
+                    # Mesajın vaat ettiği değerlendirme motor boşa çıkınca gönderilir
+                    if IDLE.thread is not None and status != 'aborted' and board.move_stack:
+                        IDLE.submit("postgame", postgame_review(
+                            board.copy(), not my_color,
+                            lambda text: _send_message(client, game_id, text)))
 
                 if mm and status != 'aborted':
                     mm.record_game_result(result, game_mode, opponent_id=opp_id)
+                METRICS.inc(f"games_{result}" if status != 'aborted' else "games_aborted")
+                if recorder and status != 'aborted':
+                    ARCHIVE.submit(recorder, board, _pgn_result(winner, status), status)
+                # İptal edilen oyun arşivlenmez; finally'deki yedek kayıt da atlanır
+                recorder = None
+
+                summary = LATENCY.format_tc(tc)
+                if summary:
+                    log.info(f"⏱️ Gecikme [{tc}]: {summary}")
                 break
 
             if (SETTINGS.get("SCORE_CHAT_ENABLED", False)
@@ -554,33 +1020,72 @@ def handle_game(client, game_id, bot, my_id, mm):
                             _send_message(client, game_id, pick_message("losing_realization"))
                             losing_msg_sent = True
                 except Exception as e:
-                    print(f"⚠️ Skor hatası: {e}")
+                    log.warning(f"⚠️ Skor hatası: {e}")
 
             if board.turn == my_color and not board.is_game_over():
+                opp_draw = curr_state.get('bdraw' if my_color == chess.WHITE else 'wdraw')
+                verdict  = adjudicator.decide(board, bool(opp_draw)) if adjudicator else None
+                if verdict == 'resign':
+                    try:
+                        client.bots.resign_game(game_id)
+                        log.info(f"🏳️ Terk (adjudication): {game_id} | {len(board.move_stack)}. yarım hamle")
+                        METRICS.inc("adjudicated_resigns")
+                        continue
+                    except Exception as e:
+                        log.warning(f"⚠️ Resign hatası: {e}")
+                elif verdict in ('accept_draw', 'claim_draw', 'offer_draw'):
+                    if _bot_game_action(game_id, 'draw/yes'):
+                        log.info(f"🤝 Beraberlik [{verdict}]: {game_id} | {len(board.move_stack)}. yarım hamle")
+                        METRICS.inc(f"adjudicated_{verdict}")
+                        # 200 sadece teklif gittiği anlamına da gelebilir; oyun bitmediyse hamle yap
+                        if verdict != 'offer_draw' and not _game_is_ongoing(client, game_id):
+                            continue
+
+                think_start = time.perf_counter()
                 move = bot.get_best_move(
                     board,
                     curr_state.get('wtime'),
                     curr_state.get('btime'),
                     curr_state.get('winc'),
-                    curr_state.get('binc')
+                    curr_state.get('binc'),
+                    tc=tc,
+                    game_id=game_id,
                 )
                 if move:
-                    for _ in range(3):
-                        try:
-                            client.bots.make_move(game_id, move.uci())
-                            break
-                        except Exception:
-                            time.sleep(0.05)
+                    with LATENCY.span("make_move", tc):
+                        for _ in range(3):
+                            try:
+                                client.bots.make_move(game_id, move.uci())
+                                METRICS.inc("moves_played")
+                                break
+                            except Exception:
+                                METRICS.inc("make_move_retries")
+                                time.sleep(0.05)
+                    done = time.perf_counter()
+                    LATENCY.record("move_total", tc, done - received_at)
+                    if adjudicator:
+                        adjudicator.record(bot.last_report(game_id))
+                    if recorder:
+                        recorder.record_move(len(board.move_stack) + 1, bot.last_report(game_id),
+                                             done - think_start, done - received_at)
 
     except Exception as e:
-        print(f"🚨 Oyun Hatası ({game_id}): {e}", flush=True)
+        log.error(f"🚨 Oyun Hatası ({game_id}): {e}")
+    finally:
+        stop.set()
+        deadlines.clear()
+        # Akış koptuysa / oyun sonu görülmediyse yine de elde olanı kaydet
+        if recorder and board is not None and board.move_stack:
+            ARCHIVE.submit(recorder, board, '*', 'unknown')
 
 
 def handle_game_wrapper(game_id, bot, my_id, active_games, active_games_lock, mm):
     client = make_client()
     try:
-        handle_game(client, game_id, bot, my_id, mm)
+        with botlog.game_context(game_id):
+            handle_game(client, game_id, bot, my_id, mm)
     finally:
+        bot.forget(game_id)
         active_discard(active_games, active_games_lock, game_id)
 
 
@@ -593,9 +1098,12 @@ def main():
             config = yaml.safe_load(f)
         my_id = client.account.get()['id']
     except Exception as e:
-        print(f"Bağlantı/Config Hatası: {e}")
+        log.error(f"Bağlantı/Config Hatası: {e}")
         return
 
+    botlog.setup(config)
+    load_adjudication(config)
+
     if config and "matchmaking" in config:
         if "max_games" in config["matchmaking"]:
             SETTINGS["MAX_PARALLEL_GAMES"] = config["matchmaking"]["max_games"]
@@ -605,8 +1113,26 @@ def main():
         uci_options=config.get('engine', {}).get('uci_options', {}) if config else {}
     )
     active_games = set()
-    active_games_lock = threading.Lock()
-    pending_starts = {"count": 0}
+    active_games_lock = TimedLock("active_games")
+
+    METRICS.register_gauge("active_games", lambda: active_count(active_games, active_games_lock))
+    METRICS.register_gauge("max_parallel_games", lambda: SETTINGS["MAX_PARALLEL_GAMES"])
+    METRICS.register_gauge("engine_pool_size", lambda: bot.pool_size)
+    METRICS.register_gauge("engine_pool_busy", lambda: bot.pool_size - bot.engine_pool.qsize())
+    METRICS.register_gauge("panic_node_budget", bot.node_budget.stats)
+    METRICS.register_gauge("log_dropped", botlog.dropped)
+    METRICS.register_gauge("engine_telemetry", TELEMETRY.stats)
+    METRICS.register_gauge("profiler", PROFILER.install().stats)
+    if bot.remote is None and SETTINGS.get("MEMORY_MONITOR_ENABLED", True):
+        METRICS.register_gauge("memory", MemoryMonitor(bot).start().stats)
+    start_metrics_server()
+    DEADLINES.start()
+    if SETTINGS.get("GAME_ARCHIVE_ENABLED", True):
+        ARCHIVE.start()
+    if bot.remote is None and SETTINGS.get("IDLE_JOBS_ENABLED", True):
+        IDLE.start(bot, lambda: active_count(active_games, active_games_lock),
+                   lambda: SETTINGS["MAX_PARALLEL_GAMES"])
+        METRICS.register_gauge("idle_jobs", IDLE.stats)
 
     mm = None
     if config and config.get("matchmaking"):
@@ -615,6 +1141,18 @@ def main():
             token=SETTINGS["TOKEN"],
             active_games_lock=active_games_lock
         )
+
+    admission = AdmissionController(
+        client, my_id, mm,
+        active_count=lambda: active_count(active_games, active_games_lock),
+        max_games=lambda: SETTINGS["MAX_PARALLEL_GAMES"],
+        session_left=lambda: SETTINGS["MAX_TOTAL_RUNTIME"] - (time.time() - start_time),
+        max_time_limit=SETTINGS["MAX_GAME_TIME_LIMIT"],
+        min_remaining=SETTINGS["MIN_GAME_SECONDS_REMAINING"],
+    ).start()
+    METRICS.register_gauge("admission", admission.stats)
+    if mm:
+        mm.admission = admission
         threading.Thread(target=mm.start, daemon=True).start()
 
     threading.Thread(
@@ -623,82 +1161,53 @@ def main():
         daemon=True
     ).start()
 
-    print(f"🔥 Oxydan 11 Hazır. ID: {my_id} | Watchdog Devrede.", flush=True)
+    log.info(f"🔥 Oxydan 11 Hazır. ID: {my_id} | Watchdog Devrede.")
 
+    backoff = Backoff()
+    lost_at = None
     while True:
+        error = None
         try:
             for event in client.bots.stream_incoming_events():
-                cur_elapsed    = time.time() - start_time
-                time_remaining = SETTINGS["MAX_TOTAL_RUNTIME"] - cur_elapsed
+                if lost_at is not None:
+                    LATENCY.record("stream_reconnect", "events", time.monotonic() - lost_at)
+                    METRICS.inc("events_stream_reconnects")
+                    log.info(f"🔌 Lichess akışı yeniden bağlandı ({time.monotonic() - lost_at:.1f}s)")
+                    lost_at = None
+                    backoff.reset()
 
                 if event['type'] == 'challenge':
-                    ch    = event['challenge']
-                    ch_id = ch['id']
+                    # Karar kuyrukta verilir: slot boşaldıkça en değerli teklif kabul edilir
+                    admission.offer(event['challenge'])
 
-                    tc         = ch.get('timeControl', {})
-                    time_limit = tc.get('limit', 0)
-                    increment  = tc.get('increment', 0)
-
-                    estimated_game_duration = (time_limit * 2) + (increment * 120)
-                    is_time_safe = time_remaining > (
-                        estimated_game_duration + SETTINGS["MIN_GAME_SECONDS_REMAINING"]
-                    )
-
-                    accept, reason = True, 'policy'
-                    if mm:
-                        accept, reason = mm.is_challenge_acceptable(ch)
-
-                    can_accept = (
-                        is_time_safe and
-                        time_limit <= SETTINGS["MAX_GAME_TIME_LIMIT"] and
-                        active_count(active_games, active_games_lock, pending_starts) < SETTINGS["MAX_PARALLEL_GAMES"] and
-                        accept
-                    )
-
-                    try:
-                        if can_accept:
-                            if not reserve_game_slot(active_games, active_games_lock, pending_starts):
-                                can_accept = False
-
-                        if can_accept:
-                            client.challenges.accept(ch_id)
-                            print(
-                                f"✅ Kabul: {ch_id} | {reason} | "
-                                f"Kalan: {int(time_remaining)}s | "
-                                f"Tahmini maç: {int(estimated_game_duration)}s",
-                                flush=True
-                            )
-                        else:
-                            if not is_time_safe:
-                                detail = f"Oturum süresi yetersiz ({int(time_remaining)}s < {int(estimated_game_duration)}s)"
-                            elif time_limit > SETTINGS["MAX_GAME_TIME_LIMIT"]:
-                                detail = f"Oyun çok uzun ({time_limit}s)"
-                            elif active_count(active_games, active_games_lock, pending_starts) >= SETTINGS["MAX_PARALLEL_GAMES"]:
-                                detail = "Paralel maç limiti dolu"
-                            else:
-                                detail = reason
-
-                            client.challenges.decline(ch_id, reason='later')
-                            print(f"❌ Reddedildi: {ch_id} | {detail}", flush=True)
-
-                    except Exception as ce:
-                        if can_accept:
-                            release_reserved_slot(active_games_lock, pending_starts)
-                        print(f"⚠️ Challenge işleme hatası: {ce}", flush=True)
+                elif event['type'] in ('challengeCanceled', 'challengeDeclined'):
+                    admission.closed(event['challenge']['id'])
 
                 elif event['type'] == 'gameStart':
                     game_id = event['game']['id']
-                    release_reserved_slot(active_games_lock, pending_starts)
-                    if active_add_if_room(active_games, active_games_lock, game_id):
+                    with active_games_lock:
+                        resumed = game_id in active_games
+                    if not resumed:
+                        IDLE.preempt()
+                    if active_add(active_games, active_games_lock, game_id):
                         threading.Thread(
                             target=handle_game_wrapper,
                             args=(game_id, bot, my_id, active_games, active_games_lock, mm),
                             daemon=True
                         ).start()
+                    # Yeniden bağlanınca tekrar gelen gameStart rezervasyon tüketmez
+                    if not resumed:
+                        admission.game_started(game_id)
 
         except Exception as e:
-            print(f"⚠️ Lichess akışı koptu, yeniden bağlanılıyor: {e}", flush=True)
-            time.sleep(5)
+            error = e
+
+        # Yeniden bağlanınca Lichess süren oyunlar için gameStart'ı tekrar gönderir
+        delay = backoff.next(error)
+        if lost_at is None:
+            lost_at = time.monotonic()
+        log.warning(f"⚠️ Lichess akışı koptu, {delay:.1f}s içinde yeniden bağlanılıyor: {error or 'akış kapandı'}")
+        time.sleep(delay)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,436 @@
+import argparse
+import json
+import math
+import os
+import queue
+import random
+import sys
+import threading
+import time
+
+import chess
+import chess.engine
+import chess.pgn
+import chess.syzygy
+import yaml
+
+from engines import open_engine
+from matchmaking import SETTINGS as MM_SETTINGS, _parse_tc
+
+# ==========================================================
+# ⚙️ AYARLAR
+# ==========================================================
+SETTINGS = {
+    "ENGINE_PATH":        "./src/Ethereal",
+    "CONFIG_PATH":        "./config.yml",
+    "GAMES":              200,
+    "CONCURRENCY":        max(1, (os.cpu_count() or 2) // 2),
+    "TC":                 "60+1",
+    "MAX_PLIES":          400,
+    "TB_PIECES":          7,
+    "TIME_MARGIN":        0.05,    # Sn; bu kadarlık aşım (GIL/IPC gecikmesi) zaman kaybı sayılmaz
+    "RESIGN_SCORE":       1000,    # İki motor da bu skoru RESIGN_MOVES hamle boyunca onaylarsa karar
+    "RESIGN_MOVES":       4,
+    "DRAW_SCORE":         8,
+    "DRAW_MOVES":         10,
+    "DRAW_MIN_PLY":       80,
+    "SPRT_ALPHA":         0.05,
+    "SPRT_BETA":          0.05,
+    "SPRT_PSEUDO":        0.5,     # Her sonuca eklenen sayım; tek taraflı sonuçta da varyans tanımlı kalır
+    "CRASH_RETRIES":      2,       # Motor çökünce oyun bu kadar tekrar oynanır, sonra hamle sırasındaki taraf kaybeder
+}
+
+# EPD verilmezse kullanılan dengeli açılışlar (her biri iki renkle oynanır)
+DEFAULT_OPENINGS = (
+    "rnbqkbnr/pppp1ppp/8/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R b KQkq - 1 2",
+    "rnbqkbnr/pp1ppppp/8/2p5/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2",
+    "rnbqkbnr/ppp1pppp/8/3p4/2PP4/8/PP2PPPP/RNBQKBNR b KQkq - 0 2",
+    "rnbqkb1r/pppppp1p/5np1/8/2PP4/8/PP2PPPP/RNBQKBNR w KQkq - 0 3",
+    "rnbqkbnr/pppp1ppp/4p3/8/3PP3/8/PPP2PPP/RNBQKBNR b KQkq - 0 2",
+    "rnbqkbnr/pp1ppppp/2p5/8/3PP3/8/PPP2PPP/RNBQKBNR b KQkq - 0 2",
+    "rnbqkb1r/pppp1ppp/5n2/4p3/2P5/2N5/PP1PPPPP/R1BQKBNR w KQkq - 2 3",
+    "rnbqkbnr/ppp2ppp/4p3/3p4/3PP3/8/PPP2PPP/RNBQKBNR w KQkq - 0 3",
+)
+
+
+class EngineSpec:
+    def __init__(self, name, path, options):
+        self.name    = name
+        self.path    = path
+        self.options = options
+
+    def open(self, cpus=None):
+        """Motoru açar ve çekirdeklere sabitler.
+
+        preexec_fn başka thread'ler çalışırken güvenli değildir; sabitleme süreç açıldıktan
+        sonra pid üzerinden, o ana kadar açılmış tüm thread'lerine (Threads seçeneği) uygulanır.
+        """
+        eng = open_engine(self.path, self.options)
+        if cpus:
+            pid = eng.transport.get_pid()
+            try:
+                for tid in os.listdir(f"/proc/{pid}/task"):
+                    os.sched_setaffinity(int(tid), set(cpus))
+            except OSError:
+                os.sched_setaffinity(pid, set(cpus))
+        return eng
+
+
+# ==========================================================
+# 📈 İSTATİSTİK
+# ==========================================================
+def elo_from_score(score):
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400.0 * math.log10(1.0 / score - 1.0)
+
+
+def elo_estimate(wins, draws, losses):
+    """(Elo, 95% hata payı) — trinomial varyanstan delta yöntemiyle."""
+    n = wins + draws + losses
+    if n == 0:
+        return 0.0, float("inf")
+    s   = (wins + 0.5 * draws) / n
+    var = (wins * (1 - s) ** 2 + draws * (0.5 - s) ** 2 + losses * s ** 2) / n
+    if var <= 0 or s in (0.0, 1.0):
+        return elo_from_score(s), float("inf")
+    margin = 1.96 * math.sqrt(var / n)
+    lo, hi = elo_from_score(s - margin), elo_from_score(s + margin)
+    return elo_from_score(s), (hi - lo) / 2.0
+
+
+def sprt_llr(wins, draws, losses, elo0, elo1):
+    """Logistic Elo hipotezleri için GSPRT log-olabilirlik oranı (normal yaklaşım)."""
+    n = wins + draws + losses
+    if n == 0:
+        return 0.0
+    # Sayım eklenmiş oranlar: hiç kayıp / galibiyet yoksa da test durabilir
+    k       = SETTINGS["SPRT_PSEUDO"]
+    w, d, l = wins + k, draws + k, losses + k
+    total   = w + d + l
+    s       = (w + 0.5 * d) / total
+    var     = (w * (1 - s) ** 2 + d * (0.5 - s) ** 2 + l * s ** 2) / total
+    if var <= 0:
+        return 0.0
+    s0 = 1.0 / (1.0 + 10 ** (-elo0 / 400.0))
+    s1 = 1.0 / (1.0 + 10 ** (-elo1 / 400.0))
+    return (s1 - s0) * (2 * s - s0 - s1) * n / (2 * var)
+
+
+def sprt_bounds(alpha, beta):
+    return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+
+
+# ==========================================================
+# ♟️ OYUN
+# ==========================================================
+class Adjudicator:
+    def __init__(self, tablebase=None):
+        self.tablebase = tablebase
+        self.resign    = 0
+        self.resign_by = None
+        self.draw      = 0
+
+    def tb_result(self, board):
+        if self.tablebase is None or board.castling_rights:
+            return None
+        if chess.popcount(board.occupied) > SETTINGS["TB_PIECES"]:
+            return None
+        try:
+            wdl = self.tablebase.probe_wdl(board)
+        except (KeyError, IndexError, ValueError):
+            return None
+        if wdl == 0 or abs(wdl) == 1:
+            return "1/2-1/2"
+        winner = board.turn if wdl > 0 else not board.turn
+        return "1-0" if winner == chess.WHITE else "0-1"
+
+    def observe(self, board, score):
+        """score: hamleyi yapan tarafın açısından cp (None = bilinmiyor)."""
+        if score is None:
+            self.resign = self.draw = 0
+            return None
+        mover = not board.turn   # hamle zaten yapıldı
+        white = score if mover == chess.WHITE else -score
+        if abs(white) >= SETTINGS["RESIGN_SCORE"]:
+            side = white > 0
+            self.resign = self.resign + 1 if self.resign_by == side else 1
+            self.resign_by = side
+            # Her iki motorun da onayı: 2 × N yarım hamle
+            if self.resign >= 2 * SETTINGS["RESIGN_MOVES"]:
+                return "1-0" if side else "0-1"
+        else:
+            self.resign = 0
+        if len(board.move_stack) >= SETTINGS["DRAW_MIN_PLY"] and abs(white) <= SETTINGS["DRAW_SCORE"]:
+            self.draw += 1
+            if self.draw >= 2 * SETTINGS["DRAW_MOVES"]:
+                return "1/2-1/2"
+        else:
+            self.draw = 0
+        return None
+
+
+def play_game(white, black, opening, tc, tablebase=None, game_tag=None):
+    """(sonuç, sebep, tahta). white/black: (isim, SimpleEngine)."""
+    base, inc = tc
+    board  = chess.Board(opening)
+    clocks = {chess.WHITE: float(base), chess.BLACK: float(base)}
+    adj    = Adjudicator(tablebase)
+    sides  = {chess.WHITE: white, chess.BLACK: black}
+
+    while True:
+        outcome = board.outcome(claim_draw=True)
+        if outcome is not None:
+            return outcome.result(), outcome.termination.name.lower(), board
+        if len(board.move_stack) >= SETTINGS["MAX_PLIES"]:
+            return "1/2-1/2", "max_plies", board
+        tb = adj.tb_result(board)
+        if tb:
+            return tb, "syzygy", board
+
+        turn   = board.turn
+        engine = sides[turn][1]
+        limit  = chess.engine.Limit(white_clock=clocks[chess.WHITE], black_clock=clocks[chess.BLACK],
+                                    white_inc=inc, black_inc=inc)
+        t0 = time.perf_counter()
+        try:
+            result = engine.play(board, limit, info=chess.engine.INFO_SCORE, game=game_tag)
+        except chess.engine.EngineTerminatedError:
+            # Maç döngüsü motoru yeniden açıp oyunu tekrarlar; hakkı biterse çökme sayılır
+            return ("0-1" if turn == chess.WHITE else "1-0"), "terminated", board
+        except chess.engine.EngineError:
+            return ("0-1" if turn == chess.WHITE else "1-0"), "crash", board
+        clocks[turn] -= time.perf_counter() - t0
+        if clocks[turn] < -SETTINGS["TIME_MARGIN"]:
+            if board.has_insufficient_material(not turn):
+                return "1/2-1/2", "time_forfeit_draw", board
+            return ("0-1" if turn == chess.WHITE else "1-0"), "time_forfeit", board
+        clocks[turn] += inc
+
+        if result.move is None or result.move not in board.legal_moves:
+            return ("0-1" if turn == chess.WHITE else "1-0"), "illegal_move", board
+        board.push(result.move)
+        score = result.info.get("score")
+        verdict = adj.observe(board, score.pov(turn).score(mate_score=32000) if score else None)
+        if verdict:
+            return verdict, "adjudication", board
+
+
+# ==========================================================
+# 🏁 MAÇ
+# ==========================================================
+class Match:
+    """İki motor arasında eşzamanlı, CPU'ya sabitlenmiş oyunlar; SPRT ile erken durma."""
+
+    def __init__(self, spec_a, spec_b, tc, openings, games, concurrency,
+                 tablebase=None, sprt=None, pgn_path=None, verbose=True):
+        self.a, self.b    = spec_a, spec_b
+        self.tc           = tc
+        self.openings     = openings
+        self.games        = games
+        self.concurrency  = concurrency
+        self.tablebase    = tablebase
+        self.sprt         = sprt          # (elo0, elo1) veya None
+        self.pgn_path     = pgn_path
+        self.verbose      = verbose
+        self.lock         = threading.Lock()
+        self.stop         = threading.Event()
+        self.wdl          = [0, 0, 0]     # A açısından galibiyet / beraberlik / mağlubiyet
+        self.reasons      = {}
+        self.played       = 0
+        self.decision     = None
+        self.tasks        = queue.Queue()
+        self.retries      = {}            # oyun sırası → çökme nedeniyle tekrar sayısı
+        for i in range(games):
+            self.tasks.put((openings[(i // 2) % len(openings)], i % 2 == 0, i))
+
+    def _cpu_sets(self):
+        cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else []
+        per  = max(int(self.a.options.get("Threads", 1)), int(self.b.options.get("Threads", 1)))
+        if not cpus or len(cpus) < self.concurrency * per:
+            if self.verbose:
+                print(f"⚠️ {self.concurrency} eşzamanlı oyun × {per} thread için yeterli çekirdek yok "
+                      f"({len(cpus)}); sabitleme kapalı.", flush=True)
+            return [None] * self.concurrency
+        return [cpus[i * per:(i + 1) * per] for i in range(self.concurrency)]
+
+    def _record(self, a_white, result, reason, board, index):
+        a_score = {"1-0": 1.0, "0-1": 0.0}.get(result, 0.5)
+        if not a_white:
+            a_score = 1.0 - a_score
+        with self.lock:
+            self.wdl[0 if a_score == 1.0 else 1 if a_score == 0.5 else 2] += 1
+            self.reasons[reason] = self.reasons.get(reason, 0) + 1
+            self.played += 1
+            if self.pgn_path:
+                game = chess.pgn.Game.from_board(board)
+                game.headers.update({"Event": "match_runner", "Round": str(index + 1),
+                                     "White": self.a.name if a_white else self.b.name,
+                                     "Black": self.b.name if a_white else self.a.name,
+                                     "Result": result, "Termination": reason,
+                                     "TimeControl": f"{self.tc[0]}+{self.tc[1]}"})
+                with open(self.pgn_path, "a", encoding="utf-8") as f:
+                    f.write(str(game) + "\n\n")
+            if self.sprt and self.decision is None:
+                llr    = sprt_llr(*self.wdl, *self.sprt)
+                lo, hi = sprt_bounds(SETTINGS["SPRT_ALPHA"], SETTINGS["SPRT_BETA"])
+                if llr <= lo or llr >= hi:
+                    self.decision = "H0" if llr <= lo else "H1"
+                    self.stop.set()
+            if self.verbose:
+                elo, err = elo_estimate(*self.wdl)
+                line = f"   🎯 {self.played}/{self.games} | +{self.wdl[0]} ={self.wdl[1]} -{self.wdl[2]} | Elo {elo:+.1f} ±{err:.1f}"
+                if self.sprt:
+                    line += f" | LLR {sprt_llr(*self.wdl, *self.sprt):+.2f}"
+                print(line, flush=True)
+
+    def _worker(self, cpus):
+        engines = {}
+        try:
+            while not self.stop.is_set():
+                try:
+                    opening, a_white, index = self.tasks.get_nowait()
+                except queue.Empty:
+                    return
+                for key, spec in (("a", self.a), ("b", self.b)):
+                    if key not in engines:
+                        engines[key] = spec.open(cpus)
+                a = (self.a.name, engines["a"])
+                b = (self.b.name, engines["b"])
+                white, black = (a, b) if a_white else (b, a)
+                result, reason, board = play_game(white, black, opening, self.tc,
+                                                  self.tablebase, game_tag=index)
+                if reason == "terminated":
+                    # Çöken motor yeniden açılır; aynı açılışta hep çöken motor maçı kilitlemesin
+                    for key in list(engines):
+                        try:
+                            engines.pop(key).quit()
+                        except Exception:
+                            pass
+                    with self.lock:
+                        self.retries[index] = self.retries.get(index, 0) + 1
+                        retry = self.retries[index] <= SETTINGS["CRASH_RETRIES"]
+                    if retry:
+                        self.tasks.put((opening, a_white, index))
+                        continue
+                    reason = "crash"
+                self._record(a_white, result, reason, board, index)
+        finally:
+            for eng in engines.values():
+                try:
+                    eng.quit()
+                except Exception:
+                    pass
+
+    def run(self):
+        threads = [threading.Thread(target=self._worker, args=(cpus,), daemon=True)
+                   for cpus in self._cpu_sets()]
+        for t in threads:
+            t.start()
+        try:
+            for t in threads:
+                while t.is_alive():
+                    t.join(0.5)
+        except KeyboardInterrupt:
+            self.stop.set()
+        return self.summary()
+
+    def summary(self):
+        elo, err = elo_estimate(*self.wdl)
+        out = {
+            "a": self.a.name, "b": self.b.name, "tc": f"{self.tc[0]}+{self.tc[1]}",
+            "games": self.played, "wins": self.wdl[0], "draws": self.wdl[1], "losses": self.wdl[2],
+            "score": round((self.wdl[0] + 0.5 * self.wdl[1]) / self.played, 4) if self.played else None,
+            "elo": round(elo, 1), "elo_95": round(err, 1) if math.isfinite(err) else None,
+            "reasons": self.reasons,
+        }
+        if self.sprt:
+            lo, hi = sprt_bounds(SETTINGS["SPRT_ALPHA"], SETTINGS["SPRT_BETA"])
+            out["sprt"] = {"elo0": self.sprt[0], "elo1": self.sprt[1],
+                           "llr": round(sprt_llr(*self.wdl, *self.sprt), 3),
+                           "bounds": [round(lo, 3), round(hi, 3)], "decision": self.decision}
+        return out
+
+
+# ==========================================================
+# 🚀 CLI
+# ==========================================================
+def load_openings(path, shuffle_seed=None):
+    if not path:
+        openings = list(DEFAULT_OPENINGS)
+    else:
+        openings = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    board, _ = chess.Board.from_epd(line)
+                    openings.append(board.fen())
+    if shuffle_seed is not None:
+        random.Random(shuffle_seed).shuffle(openings)
+    return openings
+
+
+def parse_options(pairs, base):
+    options = dict(base)
+    for pair in pairs or []:
+        key, _, value = pair.partition("=")
+        options[key.strip()] = value.strip()
+    return options
+
+
+def open_tablebase(path):
+    if not path or not os.path.isdir(path):
+        return None
+    try:
+        return chess.syzygy.open_tablebase(path)
+    except Exception as e:
+        print(f"⚠️ Syzygy açılamadı ({path}): {e}", flush=True)
+        return None
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="İki motor derlemesi/ayarı arasında yerel maç")
+    parser.add_argument("--a", default=SETTINGS["ENGINE_PATH"], help="A motoru (test)")
+    parser.add_argument("--b", default=SETTINGS["ENGINE_PATH"], help="B motoru (referans)")
+    parser.add_argument("--a-name", default="A")
+    parser.add_argument("--b-name", default="B")
+    parser.add_argument("--a-opt", action="append", help="A için UCI seçeneği, örn. Hash=256")
+    parser.add_argument("--b-opt", action="append", help="B için UCI seçeneği")
+    parser.add_argument("--config", default=SETTINGS["CONFIG_PATH"], help="Temel UCI seçenekleri")
+    parser.add_argument("--tc", default=SETTINGS["TC"], choices=MM_SETTINGS["TC_ALL"])
+    parser.add_argument("--games", type=int, default=SETTINGS["GAMES"])
+    parser.add_argument("--concurrency", type=int, default=SETTINGS["CONCURRENCY"])
+    parser.add_argument("--openings", help="EPD açılış dosyası")
+    parser.add_argument("--seed", type=int, help="Açılış sırasını karıştır")
+    parser.add_argument("--syzygy", help="Syzygy klasörü (varsayılan: config SyzygyPath)")
+    parser.add_argument("--sprt", nargs=2, type=float, metavar=("ELO0", "ELO1"))
+    parser.add_argument("--pgn", help="Oyunları bu dosyaya ekle")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    base = {}
+    try:
+        with open(args.config, "r", encoding="utf-8") as f:
+            base = dict((yaml.safe_load(f) or {}).get("engine", {}).get("uci_options", {}) or {})
+    except FileNotFoundError:
+        pass
+    # Eşzamanlı oyunlarda ponder çekirdek çalar; her iki tarafta da kapalı
+    base.update({"Ponder": False})
+
+    spec_a = EngineSpec(args.a_name, args.a, parse_options(args.a_opt, base))
+    spec_b = EngineSpec(args.b_name, args.b, parse_options(args.b_opt, base))
+    tb     = open_tablebase(args.syzygy or base.get("SyzygyPath"))
+    match  = Match(spec_a, spec_b, _parse_tc(args.tc), load_openings(args.openings, args.seed),
+                   args.games, args.concurrency, tablebase=tb,
+                   sprt=tuple(args.sprt) if args.sprt else None, pgn_path=args.pgn)
+
+    print(f"🏁 {spec_a.name} vs {spec_b.name} | {args.tc} | {args.games} oyun | "
+          f"{args.concurrency} eşzamanlı | Syzygy: {'açık' if tb else 'kapalı'}", flush=True)
+    print(json.dumps(match.run(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
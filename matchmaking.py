@@ -7,6 +7,13 @@ import json
 import threading
 from datetime import datetime, timedelta
 
+import botlog
+from game_archive import ARCHIVE
+from metrics import METRICS
+from profiler import TimedLock
+
+log = botlog.get_logger("matchmaking")
+
 # ==========================================================
 # ⚙️ AYARLAR
 # ==========================================================
@@ -19,6 +26,7 @@ SETTINGS = {
     "BLACKLIST_MINUTES":     60,
     "FAILED_CHALLENGE_BLACKLIST_MINUTES": 10,
     "CHESS960_CHANCE":       0.10,
+    "LICHESS_URL":           os.environ.get("LICHESS_URL", "https://lichess.org").rstrip("/"),
 
     # Turnuva
     "AUTO_TOURNAMENT":       True,
@@ -96,9 +104,9 @@ class RatingTracker:
                         if mode in perfs and 'rating' in perfs[mode]:
                             self.baseline[mode] = perfs[mode]['rating']
                     self.current = dict(self.baseline)
-                print(f"📊 [RatingTracker] Baseline yüklendi: {self.current}")
+                log.info(f"📊 [RatingTracker] Baseline yüklendi: {self.current}")
             except Exception as e:
-                print(f"⚠️ [RatingTracker] Baseline alınamadı, varsayılanlar aktif: {e}")
+                log.warning(f"⚠️ [RatingTracker] Baseline alınamadı, varsayılanlar aktif: {e}")
 
     def record_result(self, result, mode, new_rating=None):
         with self.lock:  # ✅ GÜNCELLEME: Çoklu oyun bitişlerinde yarış durumları engellendi
@@ -128,12 +136,12 @@ class RatingTracker:
                 if self.protection_games <= 0:
                     self.in_protection = False
                     self.losing_streak = 0
-                    print("✅ [Koruma] Koruma modu sona erdi, normal dağılıma dönülüyor.")
+                    log.info("✅ [Koruma] Koruma modu sona erdi, normal dağılıma dönülüyor.")
 
     def _activate_protection(self, reason):
         if not self.in_protection:
-            print(f"🛡️ [Koruma] {reason}")
-            print(f"🛡️ [Koruma] Sonraki {SETTINGS['PROTECTION_GAME_COUNT']} maç Mid tier'da oynanacak.")
+            log.info(f"🛡️ [Koruma] {reason}")
+            log.info(f"🛡️ [Koruma] Sonraki {SETTINGS['PROTECTION_GAME_COUNT']} maç Mid tier'da oynanacak.")
         self.in_protection    = True
         self.protection_games = SETTINGS["PROTECTION_GAME_COUNT"]
 
@@ -160,8 +168,9 @@ class Matchmaker:
         self.last_tournament_join   = 0
         self.last_cleanup           = 0
         self.token             = token
-        self.cleanup_lock      = threading.Lock()
-        self.opponent_lock     = threading.Lock()
+        self.cleanup_lock      = TimedLock("cleanup")
+        self.opponent_lock     = TimedLock("opponent")
+        self.admission         = None   # AdmissionController; gelen tekliflerle slot paylaşımı
 
         self._apply_config_overrides()
         self.rating_tracker = RatingTracker(self.client)
@@ -174,6 +183,11 @@ class Matchmaker:
                 return len(self.active_games)
         return len(self.active_games)
 
+    def _has_free_slot(self):
+        if self.admission:
+            return self.admission.free_slots() > 0 and not self.admission.holding()
+        return self._active_game_count() < SETTINGS["MAX_PARALLEL_GAMES"]
+
     def _apply_config_overrides(self):
         """YAML ayarlarını global SETTINGS'e enjekte eder."""
         if "rated_mode" in self.config:
@@ -197,15 +211,17 @@ class Matchmaker:
     def _initialize_id(self):
         try:
             self.my_id = self.client.account.get()['id']
-            print(f"[Matchmaker] Bağlantı Başarılı. ID: {self.my_id}")
+            log.info(f"[Matchmaker] Bağlantı Başarılı. ID: {self.my_id}")
         except Exception as e:
-            print(f"⚠️ [Matchmaker] ID alınamadı: {e}")
+            log.warning(f"⚠️ [Matchmaker] ID alınamadı: {e}")
             self.my_id = "oxydan"
 
     def _is_stop_triggered(self):
         if os.path.exists(SETTINGS["STOP_FILE"]):
             if self._active_game_count() == 0:
-                print("🏁 [Matchmaker] Sistem kapatılıyor.")
+                log.info("🏁 [Matchmaker] Sistem kapatılıyor.")
+                ARCHIVE.flush()
+                botlog.shutdown()
                 os._exit(0)
             return True
         return False
@@ -215,13 +231,16 @@ class Matchmaker:
             ongoing = self.client.games.get_ongoing()
             return any(g.get('tournamentId') or g.get('swissId') for g in ongoing)
         except Exception as e:
-            print(f"⚠️ [Matchmaker] Turnuva kontrolü başarısız: {e}")
+            log.warning(f"⚠️ [Matchmaker] Turnuva kontrolü başarısız: {e}")
             return False
 
     # ==========================================================
     # 🏆 TURNUVA YÖNETİMİ
     # ==========================================================
 
+    def _api_url(self, path):
+        return f"{SETTINGS['LICHESS_URL']}{path}"
+
     def _auth_headers(self):
         h = {"User-Agent": "OxydanBot/3.0"}
         if self.token:
@@ -231,7 +250,7 @@ class Matchmaker:
     def _fetch_arena_tournaments(self):
         try:
             r = requests.get(
-                "https://lichess.org/api/tournament",
+                self._api_url("/api/tournament"),
                 headers=self._auth_headers(), timeout=10
             )
             if r.status_code == 429: raise Exception("HTTP 429")
@@ -240,7 +259,7 @@ class Matchmaker:
                 return data.get('created', []) + data.get('started', [])
         except Exception as e:
             if "429" in str(e): raise
-            print(f"⚠️ [Arena] Liste çekilemedi: {e}")
+            log.warning(f"⚠️ [Arena] Liste çekilemedi: {e}")
         return []
 
     def _fetch_swiss_tournaments(self):
@@ -249,7 +268,7 @@ class Matchmaker:
         for team in bot_teams:
             try:
                 r = requests.get(
-                    f"https://lichess.org/api/team/{team}/swiss",
+                    self._api_url(f"/api/team/{team}/swiss"),
                     headers=self._auth_headers(),
                     params={"status": "created"}, timeout=10
                 )
@@ -261,33 +280,33 @@ class Matchmaker:
                             except: pass
             except Exception as e:
                 if "429" in str(e): raise
-                print(f"⚠️ [Swiss] {team}: {e}")
+                log.warning(f"⚠️ [Swiss] {team}: {e}")
         return swiss_list
 
     def _join_arena(self, tid):
         try:
             r = requests.post(
-                f"https://lichess.org/api/tournament/{tid}/join",
+                self._api_url(f"/api/tournament/{tid}/join"),
                 headers=self._auth_headers(), timeout=10
             )
             if r.status_code == 429: raise Exception("HTTP 429")
             return r.status_code == 200
         except Exception as e:
             if "429" in str(e): raise
-            print(f"⚠️ [Arena] Katılım hatası: {e}")
+            log.warning(f"⚠️ [Arena] Katılım hatası: {e}")
             return False
 
     def _join_swiss(self, sid):
         try:
             r = requests.post(
-                f"https://lichess.org/api/swiss/{sid}/join",
+                self._api_url(f"/api/swiss/{sid}/join"),
                 headers=self._auth_headers(), timeout=10
             )
             if r.status_code == 429: raise Exception("HTTP 429")
             return r.status_code == 200
         except Exception as e:
             if "429" in str(e): raise
-            print(f"⚠️ [Swiss] Katılım hatası: {e}")
+            log.warning(f"⚠️ [Swiss] Katılım hatası: {e}")
             return False
 
     def _manage_tournaments(self):
@@ -296,7 +315,7 @@ class Matchmaker:
         if (time.time() - self.last_tournament_join) < SETTINGS["TOURNAMENT_COOLDOWN"]:
             return
 
-        print("[Matchmaker] Turnuvalar taranıyor (Arena + Swiss)...")
+        log.info("[Matchmaker] Turnuvalar taranıyor (Arena + Swiss)...")
 
         for t in self._fetch_arena_tournaments():
             tid  = t.get('id')
@@ -308,7 +327,7 @@ class Matchmaker:
             if self._join_arena(tid):
                 self.registered_tournaments.add(tid)
                 self.last_tournament_join = time.time()
-                print(f"🏆 [Arena] KATILINDI: {t.get('fullName')}")
+                log.info(f"🏆 [Arena] KATILINDI: {t.get('fullName')}")
                 return
 
         for s in self._fetch_swiss_tournaments():
@@ -321,7 +340,7 @@ class Matchmaker:
             if self._join_swiss(sid):
                 self.registered_tournaments.add(sid)
                 self.last_tournament_join = time.time()
-                print(f"🏆 [Swiss] KATILINDI: {s.get('name')}")
+                log.info(f"🏆 [Swiss] KATILINDI: {s.get('name')}")
                 return
 
     def _cleanup_history(self):
@@ -330,12 +349,12 @@ class Matchmaker:
                 self.registered_tournaments = set(
                     list(self.registered_tournaments)[-250:]
                 )
-                print("🧹 [Cleanup] Turnuva hafızası budandı.")
+                log.info("🧹 [Cleanup] Turnuva hafızası budandı.")
 
             with self.opponent_lock:
                 old_count = len(self.opponent_tracker)
                 self.opponent_tracker.clear()
-            print(f"🧹 [Cleanup] opponent_tracker sıfırlandı ({old_count} kayıt temizlendi).")
+            log.info(f"🧹 [Cleanup] opponent_tracker sıfırlandı ({old_count} kayıt temizlendi).")
 
     # ==========================================================
     # 📋 PROTOKOL — Gelen Meydan Okuma Kabulü
@@ -410,7 +429,7 @@ class Matchmaker:
 
     def _pick_tier(self):
         if self.rating_tracker.is_in_protection():
-            print(f"🛡️ [Koruma] Mid kilitli — kalan: {self.rating_tracker.protection_games} maç")
+            log.info(f"🛡️ [Koruma] Mid kilitli — kalan: {self.rating_tracker.protection_games} maç")
             return SETTINGS["TIER_MID"]
 
         r = random.random()
@@ -434,10 +453,10 @@ class Matchmaker:
                 ]
                 random.shuffle(self.bot_pool)
                 self.last_pool_update = now
-                print(f"[Matchmaker] Bot havuzu: {len(self.bot_pool)} bot")
+                log.info(f"[Matchmaker] Bot havuzu: {len(self.bot_pool)} bot")
             except Exception as e:
                 if "429" in str(e): raise
-                print(f"⚠️ [Matchmaker] Havuz yenileme hatası: {e}")
+                log.warning(f"⚠️ [Matchmaker] Havuz yenileme hatası: {e}")
                 time.sleep(10)
 
     def _find_suitable_target(self):
@@ -477,7 +496,7 @@ class Matchmaker:
 
         try:
             r = requests.post(
-                "https://lichess.org/api/users",
+                self._api_url("/api/users"),
                 headers=self._auth_headers(),
                 data=",".join(candidates),
                 timeout=10
@@ -497,7 +516,7 @@ class Matchmaker:
         except Exception as e:
             if "429" in str(e):
                 raise  # ✅ GÜNCELLEME: Rate limit bypass edilmiyor, üst metoda fırlatılıyor
-            print(f"⚠️ [Matchmaker] Toplu çekme başarısız: {e} — tekli moda geçildi")
+            log.warning(f"⚠️ [Matchmaker] Toplu çekme başarısız: {e} — tekli moda geçildi")
             for bot_id in candidates[:5]:
                 try:
                     data   = self.client.users.get_public_data(bot_id)
@@ -527,12 +546,12 @@ class Matchmaker:
 
     def start(self):
         if not self.enabled:
-            print("🚫 Matchmaker YAML ile devre dışı.")
+            log.info("🚫 Matchmaker YAML ile devre dışı.")
             return
 
-        print("🚀 Matchmaker v3.6 Aktif — Oxydan Aegis Protokolü")
-        print("   Dağılım: Elite %32 | High %35 | Mid %23 | Low %10")
-        print(f"   Max per opponent: {SETTINGS['MAX_GAMES_PER_OPPONENT']}")
+        log.info("🚀 Matchmaker v3.6 Aktif — Oxydan Aegis Protokolü")
+        log.info("   Dağılım: Elite %32 | High %35 | Mid %23 | Low %10")
+        log.info(f"   Max per opponent: {SETTINGS['MAX_GAMES_PER_OPPONENT']}")
 
         while True:
             try:
@@ -546,10 +565,18 @@ class Matchmaker:
                     time.sleep(60)
                     continue
 
-                if self._active_game_count() < SETTINGS["MAX_PARALLEL_GAMES"]:
+                if self._has_free_slot():
                     target, rating, limit_sn, inc_sn, is_rated, tier_name = \
                         self._find_suitable_target()
 
+                    slot = None
+                    if target and self.admission:
+                        # Hedef ararken gelen teklif kuyruğa girdiyse ona öncelik ver
+                        slot = self.admission.reserve_outgoing()
+                        if slot is None:
+                            time.sleep(5)
+                            continue
+
                     if target:
                         variant   = 'chess960' if random.random() < SETTINGS["CHESS960_CHANCE"] else 'standard'
                         rated_str = "Rated" if is_rated else "Casual"
@@ -559,7 +586,7 @@ class Matchmaker:
                         with self.opponent_lock:
                             played = self.opponent_tracker.get(target.lower(), 0)
 
-                        print(
+                        log.info(
                             f"[{tier_name}] → {target} ({rating}) | "
                             f"{rated_str} | {tc_label} | {variant} | "
                             f"Oyun {played}/{SETTINGS['MAX_GAMES_PER_OPPONENT']}"
@@ -570,15 +597,19 @@ class Matchmaker:
                             minutes=SETTINGS["BLACKLIST_MINUTES"]
                         )
                         try:
-                            self.client.challenges.create(
+                            response = self.client.challenges.create(
                                 username=target,
                                 rated=is_rated,
                                 variant=variant,
                                 clock_limit=limit_sn,
                                 clock_increment=inc_sn
                             )
+                            if slot is not None:
+                                self.admission.outgoing_sent(slot, response)
                             self.wait_timeout = 120
                         except Exception as ce:
+                            if slot is not None:
+                                self.admission.release_outgoing(slot)
                             if "429" in str(ce): raise
                             self.blacklist[target_key] = datetime.now() + timedelta(
                                 minutes=SETTINGS["FAILED_CHALLENGE_BLACKLIST_MINUTES"]
@@ -594,9 +625,12 @@ class Matchmaker:
             except Exception as e:
                 err = str(e)
                 if "429" in err:
-                    print(f"⚠️ Rate limit (429), {self.wait_timeout}sn bekleniyor.")
+                    log.warning(f"⚠️ Rate limit (429), {self.wait_timeout}sn bekleniyor.")
+                    METRICS.inc("ratelimit_backoffs")
+                    METRICS.inc("ratelimit_backoff_seconds", self.wait_timeout)
+                    METRICS.set("ratelimit_wait_timeout", self.wait_timeout)
                     time.sleep(self.wait_timeout)
                     self.wait_timeout = min(self.wait_timeout * 2, 900)
                 else:
-                    print(f"⚠️ [Matchmaker] Hata: {err}")
+                    log.warning(f"⚠️ [Matchmaker] Hata: {err}")
                     time.sleep(30)
@@ -0,0 +1,199 @@
+import os
+import threading
+import time
+
+import botlog
+from metrics import METRICS
+
+log = botlog.get_logger("memory")
+
+# ==========================================================
+# ⚙️ AYARLAR
+# ==========================================================
+SETTINGS = {
+    "BUDGET_MB":        int(os.environ.get("MEMORY_BUDGET_MB", "0")),   # 0 = MemTotal'ın BUDGET_RATIO'su
+    "BUDGET_RATIO":     0.6,
+    "ENGINE_BASE_MB":   96,      # Hash dışı motor yükü (thread yığınları, tablolar); ilk ölçümle güncellenir
+    "NETWORK_MB":       80,      # Paylaşılmayan NNUE kopyası başına (büyük + küçük ağ)
+    "MIN_HASH_MB":      16,
+    "HASH_STEP_MB":     16,
+    "INTERVAL":         60.0,    # Sn; izleme aralığı
+    "ENFORCE":          True,    # Ölçülen toplam bütçeyi aşarsa boştaki motorların Hash'i küçültülür
+}
+
+
+# ==========================================================
+# 🔍 /proc OKUMA
+# ==========================================================
+def _kb_fields(path, wanted):
+    out = {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in wanted:
+                    out[key] = int(rest.split()[0])
+    except (OSError, ValueError, IndexError):
+        pass
+    return out
+
+
+def proc_memory(pid):
+    """Süreç belleği (MB): rss, pss, shared, anon_huge (THP ile ayrılmış anonim bellek)."""
+    fields = _kb_fields(f"/proc/{pid}/smaps_rollup",
+                        ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "AnonHugePages"))
+    if not fields:
+        # smaps_rollup yok (eski çekirdek): sadece RSS
+        status = _kb_fields(f"/proc/{pid}/status", ("VmRSS",))
+        return {"rss": status.get("VmRSS", 0) / 1024, "pss": None, "shared": None, "anon_huge": None}
+    return {
+        "rss":       round(fields.get("Rss", 0) / 1024, 1),
+        "pss":       round(fields.get("Pss", 0) / 1024, 1),
+        "shared":    round((fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0)) / 1024, 1),
+        "anon_huge": round(fields.get("AnonHugePages", 0) / 1024, 1),
+    }
+
+
+def shared_network_mb(pid):
+    """Motorun /dev/shm'den eşlediği (sistem çapında paylaşılan NNUE) bellek, MB."""
+    total = 0
+    try:
+        with open(f"/proc/{pid}/maps", "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 6 and parts[5].startswith("/dev/shm/sf_"):
+                    lo, hi = (int(x, 16) for x in parts[0].split("-"))
+                    total += hi - lo
+    except OSError:
+        return None
+    return round(total / (1024 * 1024), 1)
+
+
+def thp_mode():
+    try:
+        with open("/sys/kernel/mm/transparent_hugepage/enabled", "r", encoding="utf-8") as f:
+            text = f.read()
+        return text[text.index("[") + 1:text.index("]")]
+    except (OSError, ValueError):
+        return None
+
+
+def total_memory_mb():
+    fields = _kb_fields("/proc/meminfo", ("MemTotal", "MemAvailable"))
+    return fields.get("MemTotal", 0) / 1024, fields.get("MemAvailable", 0) / 1024
+
+
+def engine_pid(engine):
+    """SimpleEngine alt sürecinin pid'i; uzak motorlarda None."""
+    transport = getattr(engine, "transport", None)
+    try:
+        return transport.get_pid() if transport is not None else None
+    except Exception:
+        return None
+
+
+def budget_mb():
+    if SETTINGS["BUDGET_MB"]:
+        return SETTINGS["BUDGET_MB"]
+    total, _ = total_memory_mb()
+    return int(total * SETTINGS["BUDGET_RATIO"]) if total else 0
+
+
+def plan_hash(engines, requested, budget=None, base_mb=None, shared_net=True, bot_mb=0.0):
+    """Bütçeye sığan motor başına Hash (MB); istenen değeri asla aşmaz."""
+    budget = budget_mb() if budget is None else budget
+    if not budget or engines <= 0:
+        return requested
+    base  = SETTINGS["ENGINE_BASE_MB"] if base_mb is None else base_mb
+    nets  = SETTINGS["NETWORK_MB"] * (1 if shared_net else engines)
+    free  = budget - bot_mb - nets - engines * base
+    step  = SETTINGS["HASH_STEP_MB"]
+    fit   = int(free / engines // step * step)
+    return max(SETTINGS["MIN_HASH_MB"], min(int(requested), fit))
+
+
+# ==========================================================
+# 📡 İZLEME
+# ==========================================================
+class MemoryMonitor:
+    """Motor süreçlerinin RSS/PSS'ini izler; bütçe aşılırsa Hash'i küçültür."""
+
+    def __init__(self, bot):
+        self.bot      = bot
+        self.lock     = threading.Lock()
+        self.snapshot = {}
+        self.thread   = None
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+        return self
+
+    def sample(self):
+        engines, total_pss, shared = [], 0.0, None
+        for i, eng in enumerate(list(self.bot.engines)):
+            pid = engine_pid(eng)
+            if pid is None:
+                continue
+            mem = proc_memory(pid)
+            net = shared_network_mb(pid)
+            mem.update({"engine": f"engine-{i + 1}", "pid": pid, "shm_network": net,
+                        "large_pages": bool(mem["anon_huge"]) if mem["anon_huge"] is not None else None})
+            engines.append(mem)
+            total_pss += mem["pss"] if mem["pss"] is not None else mem["rss"]
+            shared = bool(net) if shared is None else (shared and bool(net))
+        bot_mem      = proc_memory(os.getpid())
+        total, avail = total_memory_mb()
+        snap = {
+            "ts":              round(time.time(), 1),
+            "budget_mb":       budget_mb(),
+            "engines_pss_mb":  round(total_pss, 1),
+            "bot_pss_mb":      bot_mem["pss"] if bot_mem["pss"] is not None else bot_mem["rss"],
+            "system_total_mb": round(total, 1),
+            "system_avail_mb": round(avail, 1),
+            "thp":             thp_mode(),
+            "network_shared":  shared,
+            "hash_mb":         self.bot.hash_mb,
+            "engines":         engines,
+        }
+        with self.lock:
+            self.snapshot = snap
+        return snap
+
+    def stats(self):
+        with self.lock:
+            return dict(self.snapshot)
+
+    def enforce(self, snap):
+        budget = snap["budget_mb"]
+        used   = snap["engines_pss_mb"] + (snap["bot_pss_mb"] or 0)
+        if not budget or not snap["engines"] or used <= budget or not self.bot.hash_mb:
+            return
+        n = len(snap["engines"])
+        # Ölçülen Hash dışı yük ile yeniden planla
+        base = max(0.0, snap["engines_pss_mb"] / n - self.bot.hash_mb)
+        new  = plan_hash(n, self.bot.hash_mb, budget, base_mb=base, shared_net=True,
+                         bot_mb=snap["bot_pss_mb"] or 0)
+        if new < self.bot.hash_mb:
+            log.warning(f"⚠️ [Memory] {used:.0f}MB > bütçe {budget}MB — Hash {self.bot.hash_mb} → {new}MB")
+            METRICS.inc("memory_hash_shrinks")
+            self.bot.resize_hash(new)
+
+    def _run(self):
+        first = True
+        while True:
+            try:
+                snap = self.sample()
+                if first:
+                    first = False
+                    lp = [e["large_pages"] for e in snap["engines"]]
+                    log.info(f"🧮 [Memory] Motorlar {snap['engines_pss_mb']:.0f}MB PSS | "
+                             f"Hash {snap['hash_mb']}MB × {len(lp)} | bütçe {snap['budget_mb']}MB | "
+                             f"NNUE paylaşımlı: {snap['network_shared']} | "
+                             f"Büyük sayfa: {sum(1 for x in lp if x)}/{len(lp)} (THP: {snap['thp']})")
+                if SETTINGS["ENFORCE"]:
+                    self.enforce(snap)
+            except Exception as e:
+                log.warning(f"⚠️ [Memory] İzleme hatası: {e}")
+            time.sleep(SETTINGS["INTERVAL"])
@@ -0,0 +1,160 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import botlog
+from latency import LATENCY
+
+log = botlog.get_logger("metrics")
+
+# ==========================================================
+# ⚙️ AYARLAR
+# ==========================================================
+SETTINGS = {
+    "HOST":            os.environ.get("METRICS_HOST", "127.0.0.1"),
+    "PORT":            int(os.environ.get("METRICS_PORT", "8377")),   # 0 = kapalı
+    "SSE_INTERVAL":    2.0,     # Dashboard'a gönderim aralığı (sn)
+    "NPS_WINDOW":      50,      # Son N aramanın NPS ortalaması
+}
+
+
+class Metrics:
+    """Tek kilitli sayaç/gösterge deposu; hamle yolunda sadece tamsayı artırımı yapılır."""
+
+    def __init__(self):
+        self.lock     = threading.Lock()
+        self.started  = time.time()
+        self.counters = {}
+        self.gauges   = {}
+        self.probes   = {}
+        self.nps      = deque(maxlen=SETTINGS["NPS_WINDOW"])
+
+    def inc(self, name, n=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def set(self, name, value):
+        with self.lock:
+            self.gauges[name] = value
+
+    def register_gauge(self, name, fn):
+        """Değeri snapshot anında fn() ile okunan gösterge (aktif oyun, havuz doluluğu)."""
+        with self.lock:
+            self.probes[name] = fn
+
+    def observe_search(self, info):
+        nps = info.get("nps") if info else None
+        if not nps:
+            nodes   = info.get("nodes") if info else None
+            elapsed = info.get("time") if info else None
+            nps     = int(nodes / elapsed) if nodes and elapsed else None
+        if nps:
+            with self.lock:
+                self.nps.append(nps)
+                self.counters["searches"] = self.counters.get("searches", 0) + 1
+
+    def _rate(self, hits, total):
+        t = self.counters.get(total, 0)
+        return round(self.counters.get(hits, 0) / t, 3) if t else None
+
+    def snapshot(self):
+        with self.lock:
+            counters = dict(self.counters)
+            gauges   = dict(self.gauges)
+            probes   = list(self.probes.items())
+            nps      = list(self.nps)
+            rates    = {
+                "book_hit_rate":      self._rate("book_hits", "book_probes"),
+                "tablebase_hit_rate": self._rate("tablebase_hits", "tablebase_probes"),
+                "position_cache_hit_rate": self._rate("position_cache_hits", "position_cache_probes"),
+            }
+        for name, fn in probes:
+            try:
+                gauges[name] = fn()
+            except Exception:
+                gauges[name] = None
+
+        size = gauges.get("engine_pool_size")
+        busy = gauges.get("engine_pool_busy")
+        if size and busy is not None:
+            gauges["engine_pool_utilisation"] = round(busy / size, 3)
+
+        return {
+            "ts":       round(time.time(), 3),
+            "uptime_s": round(time.time() - self.started, 1),
+            "counters": counters,
+            "gauges":   gauges,
+            "rates":    rates,
+            "nps": {
+                "last":  nps[-1] if nps else None,
+                "mean":  int(sum(nps) / len(nps)) if nps else None,
+                "min":   min(nps) if nps else None,
+                "count": counters.get("searches", 0),
+            },
+            "latency":  LATENCY.snapshot(),
+        }
+
+
+# ==========================================================
+# 📡 HTTP / SSE UÇ NOKTASI
+# ==========================================================
+class MetricsHandler(BaseHTTPRequestHandler):
+    server_version = "VoidMetrics/1.0"
+    metrics = None
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _headers(self, status, content_type, length=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        # Dashboard dosyadan ya da GitHub Pages'ten açılabilir
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Cache-Control", "no-cache")
+        if length is not None:
+            self.send_header("Content-Length", str(length))
+        self.end_headers()
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/metrics":
+            data = json.dumps(self.metrics.snapshot()).encode("utf-8")
+            self._headers(200, "application/json", len(data))
+            self.wfile.write(data)
+        elif path == "/events":
+            self._headers(200, "text/event-stream")
+            try:
+                while True:
+                    data = json.dumps(self.metrics.snapshot())
+                    self.wfile.write(f"data: {data}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                    time.sleep(SETTINGS["SSE_INTERVAL"])
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+        else:
+            data = b'{"error": "not found"}'
+            self._headers(404, "application/json", len(data))
+            self.wfile.write(data)
+
+
+def start_metrics_server(metrics=None, host=None, port=None):
+    port = SETTINGS["PORT"] if port is None else port
+    if not port:
+        return None
+    handler = type("BoundMetricsHandler", (MetricsHandler,), {"metrics": metrics or METRICS})
+    try:
+        httpd = ThreadingHTTPServer((host or SETTINGS["HOST"], port), handler)
+    except OSError as e:
+        log.warning(f"⚠️ [Metrics] {port} portu açılamadı: {e}")
+        return None
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    log.info(f"📡 [Metrics] http://{host or SETTINGS['HOST']}:{port}/metrics (SSE: /events)")
+    return httpd
+
+
+METRICS = Metrics()
@@ -0,0 +1,892 @@
+import argparse
+import importlib.util
+import json
+import os
+import queue
+import random
+import re
+import string
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import chess
+
+from matchmaking import SETTINGS as MM_SETTINGS, _parse_tc
+
+# ==========================================================
+# ⚙️ AYARLAR
+# ==========================================================
+SETTINGS = {
+    "HOST":               "127.0.0.1",
+    "PORT":               8765,
+    "BOT_ID":             "void_bot",
+    "KEEPALIVE_SECONDS":  6,        # Lichess akışları boş satırla canlı tutar
+    "CONCURRENCY":        2,        # Aynı anda açık tutulacak gelen meydan okuma / oyun sayısı
+    "TOTAL_GAMES":        20,
+    "OPPONENT_COUNT":     8,
+    "OPPONENT_RATING":    (2300, 2800),
+    "THINK_MS":           (200, 1500),
+    "ACCEPT_RATE":        0.8,      # Botun gönderdiği meydan okumaları kabul etme oranı
+    "MEMORY_SAMPLE_SECONDS": 2,
+    "CLAIM_WIN_SECONDS":  10,       # opponentGone sonrası galibiyet talep süresi
+    "DRAW_ACCEPT_RATE":   0.5,      # Botun beraberlik teklifini kabul etme oranı
+    "DROP_EVERY":         0,        # Sn; >0 ise açık akışlar bu aralıkla koparılır (yeniden bağlanma testi)
+}
+
+
+def _new_id(n=8):
+    return ''.join(random.choices(string.ascii_letters + string.digits, k=n))
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+def _speed(limit_sn):
+    if limit_sn < 180:    return 'bullet'
+    elif limit_sn < 480:  return 'blitz'
+    elif limit_sn < 1500: return 'rapid'
+    return 'classical'
+
+
+# ==========================================================
+# 🤖 SENARYOLU RAKİPLER
+# ==========================================================
+class Opponent:
+    """Sahte rakip: hamle seçimi ve düşünme süresi senaryo ile değiştirilebilir."""
+
+    def __init__(self, user_id, rating, title='BOT', think_ms=None, script=None):
+        self.id       = user_id
+        self.rating   = rating
+        self.title    = title
+        self.think_ms = think_ms or SETTINGS["THINK_MS"]
+        self.script   = script
+
+    def public(self):
+        return {"id": self.id, "name": self.id, "title": self.title, "rating": self.rating}
+
+    def user_data(self):
+        perfs = {mode: {"rating": self.rating, "games": 500}
+                 for mode in ('bullet', 'blitz', 'rapid', 'classical', 'chess960')}
+        return {"id": self.id, "username": self.id, "title": self.title, "perfs": perfs}
+
+    def think_time(self, board, game):
+        if self.script and hasattr(self.script, "think_time"):
+            return self.script.think_time(board, game)
+        return random.uniform(*self.think_ms) / 1000.0
+
+    def choose_move(self, board, game):
+        if self.script and hasattr(self.script, "choose_move"):
+            return self.script.choose_move(board, game)
+        legal    = list(board.legal_moves)
+        captures = [m for m in legal if board.is_capture(m)]
+        return random.choice(captures if captures and random.random() < 0.5 else legal)
+
+
+def load_script(path):
+    """choose_move(board, game) ve/veya think_time(board, game) tanımlayan modülü yükler."""
+    spec   = importlib.util.spec_from_file_location("mock_opponent_script", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# ==========================================================
+# ♟️ OYUN DURUMU
+# ==========================================================
+class MockGame:
+    def __init__(self, server, opponent, limit_sn, inc_sn, rated, bot_color, variant='standard',
+                 game_id=None):
+        self.server      = server
+        self.id          = game_id or _new_id()
+        self.opponent    = opponent
+        self.limit_ms    = limit_sn * 1000
+        self.inc_ms      = inc_sn * 1000
+        self.rated       = rated
+        self.variant     = variant
+        self.bot_color   = bot_color
+        self.board       = chess.Board(chess960=variant == 'chess960')
+        self.clock       = {chess.WHITE: self.limit_ms, chess.BLACK: self.limit_ms}
+        self.last_move_at = time.monotonic()
+        self.status      = 'started'
+        self.winner      = None
+        self.lock        = threading.RLock()
+        self.subscribers = []
+        self.bot_turn_since = None
+        self.opponent_turn  = threading.Event()
+        self.gone_at        = None
+
+    # --- Görünümler ---
+    def _player(self, color):
+        if color == self.bot_color:
+            return {"id": self.server.bot_id, "name": self.server.bot_id, "title": "BOT", "rating": 2900}
+        return self.opponent.public()
+
+    def _live_clock(self):
+        clock = dict(self.clock)
+        if len(self.board.move_stack) >= 2 and self.status == 'started':
+            clock[self.board.turn] -= int((time.monotonic() - self.last_move_at) * 1000)
+        return clock
+
+    def state_event(self):
+        clock = self._live_clock()
+        event = {
+            "type":   "gameState",
+            "moves":  " ".join(m.uci() for m in self.board.move_stack),
+            "wtime":  max(0, clock[chess.WHITE]),
+            "btime":  max(0, clock[chess.BLACK]),
+            "winc":   self.inc_ms,
+            "binc":   self.inc_ms,
+            "wdraw":  False,
+            "bdraw":  False,
+            "status": self.status,
+        }
+        if self.winner:
+            event["winner"] = self.winner
+        return event
+
+    def full_event(self):
+        return {
+            "type":       "gameFull",
+            "id":         self.id,
+            "rated":      self.rated,
+            "variant":    {"key": self.variant},
+            "clock":      {"initial": self.limit_ms, "increment": self.inc_ms},
+            "speed":      _speed(self.limit_ms // 1000),
+            "white":      self._player(chess.WHITE),
+            "black":      self._player(chess.BLACK),
+            "initialFen": "startpos",
+            "state":      self.state_event(),
+        }
+
+    def summary(self):
+        return {
+            "id":       self.id,
+            "gameId":   self.id,
+            "fullId":   self.id,
+            "color":    "white" if self.bot_color == chess.WHITE else "black",
+            "isMyTurn": self.board.turn == self.bot_color,
+            "opponent": {"id": self.opponent.id, "username": self.opponent.id, "rating": self.opponent.rating},
+            "speed":    _speed(self.limit_ms // 1000),
+            "rated":    self.rated,
+        }
+
+    # --- Akış ---
+    def subscribe(self):
+        q = queue.Queue()
+        with self.lock:
+            self.subscribers.append(q)
+            q.put(self.full_event())
+            if self.status != 'started':
+                q.put(None)
+            elif self.board.turn == self.bot_color:
+                self.bot_turn_since = time.perf_counter()
+        return q
+
+    def unsubscribe(self, q):
+        with self.lock:
+            if q in self.subscribers:
+                self.subscribers.remove(q)
+
+    def _broadcast(self, event):
+        for q in list(self.subscribers):
+            q.put(event)
+
+    # --- Hamleler ---
+    def apply_move(self, uci, color):
+        with self.lock:
+            if self.status != 'started' or self.board.turn != color:
+                return False, "Not your turn, or game already over"
+            try:
+                move = self.board.parse_uci(uci)
+            except ValueError:
+                return False, f"Illegal move: {uci}"
+
+            now = time.monotonic()
+            if len(self.board.move_stack) >= 2:
+                self.clock[color] -= int((now - self.last_move_at) * 1000)
+                if self.clock[color] <= 0:
+                    self._finish('outoftime', winner=not color)
+                    return False, "Out of time"
+                self.clock[color] += self.inc_ms
+            self.last_move_at = now
+
+            if color == self.bot_color and self.bot_turn_since is not None:
+                self.server.stats.record_move_latency(
+                    _speed(self.limit_ms // 1000), time.perf_counter() - self.bot_turn_since
+                )
+                self.bot_turn_since = None
+
+            self.board.push(move)
+            outcome = self.board.outcome(claim_draw=True)
+            if outcome:
+                status = 'mate' if outcome.termination == chess.Termination.CHECKMATE else (
+                    'stalemate' if outcome.termination == chess.Termination.STALEMATE else 'draw')
+                self._finish(status, winner=outcome.winner)
+                return True, None
+
+            self._broadcast(self.state_event())
+            if self.board.turn == self.bot_color:
+                self.bot_turn_since = time.perf_counter()
+            else:
+                self.opponent_turn.set()
+            return True, None
+
+    def check_flag(self):
+        with self.lock:
+            if self.status != 'started' or len(self.board.move_stack) < 2:
+                return
+            if self._live_clock()[self.board.turn] <= 0:
+                self.clock[self.board.turn] = 0
+                self._finish('outoftime', winner=not self.board.turn)
+
+    def _finish(self, status, winner=None):
+        """Kilit altında çağrılır."""
+        if self.status != 'started':
+            return
+        self.status = status
+        if winner is not None:
+            self.winner = 'white' if winner == chess.WHITE else 'black'
+        self._broadcast(self.state_event())
+        self._broadcast(None)
+        self.opponent_turn.set()
+        self.server.on_game_finished(self)
+
+    def finish(self, status, winner=None):
+        with self.lock:
+            self._finish(status, winner)
+
+    def run_opponent(self):
+        """Rakip tarafın hamlelerini oynayan iş parçacığı."""
+        if self.board.turn != self.bot_color:
+            self.opponent_turn.set()
+        while True:
+            self.opponent_turn.wait()
+            self.opponent_turn.clear()
+            with self.lock:
+                if self.status != 'started':
+                    return
+                if self.board.turn == self.bot_color:
+                    continue
+                board = self.board.copy()
+            time.sleep(max(0.0, self.opponent.think_time(board, self)))
+            move = self.opponent.choose_move(board, self)
+            if move is not None:
+                self.apply_move(move.uci(), not self.bot_color)
+            else:
+                # Senaryo None döndürürse rakip oyunu terk etmiş sayılır
+                with self.lock:
+                    self.gone_at = time.monotonic()
+                    self._broadcast({"type": "opponentGone", "gone": True,
+                                     "claimWinInSeconds": SETTINGS["CLAIM_WIN_SECONDS"]})
+                return
+
+    def draw_offer(self):
+        """Bot beraberlik istedi: hak varsa talep, yoksa rakibe teklif.
+
+        Talep yalnızca pozisyon zaten 50 hamle / üçlü tekrar ise geçerlidir (Lichess gibi);
+        can_claim_draw() bir sonraki hamleyle doğacak hakkı da sayar.
+        """
+        with self.lock:
+            if self.status != 'started':
+                return False
+            if (self.board.is_fifty_moves() or self.board.is_repetition(3)
+                    or (self.opponent.script and hasattr(self.opponent.script, "accept_draw")
+                        and self.opponent.script.accept_draw(self.board, self))
+                    or random.random() < SETTINGS["DRAW_ACCEPT_RATE"]):
+                self._finish('draw')
+            return True
+
+    def claim_victory(self):
+        with self.lock:
+            if (self.status != 'started' or self.gone_at is None
+                    or time.monotonic() - self.gone_at < SETTINGS["CLAIM_WIN_SECONDS"]):
+                return False
+            self._finish('timeout', winner=self.bot_color)
+            return True
+
+
+# ==========================================================
+# 📈 YÜK ÖLÇÜMLERİ
+# ==========================================================
+class MockStats:
+    def __init__(self, bot_pid=None):
+        self.lock           = threading.Lock()
+        self.started        = time.time()
+        self.move_latency   = {}
+        self.events_sent    = 0
+        self.bytes_sent     = 0
+        self.requests       = 0
+        self.games_started  = 0
+        self.games_finished = 0
+        self.max_concurrent = 0
+        self.bot_pid        = bot_pid
+        self.rss_samples    = []
+
+    def record_move_latency(self, speed, seconds):
+        with self.lock:
+            self.move_latency.setdefault(speed, []).append(seconds)
+
+    def record_sent(self, nbytes, events=1):
+        with self.lock:
+            self.bytes_sent  += nbytes
+            self.events_sent += events
+
+    def sample_memory(self):
+        if not self.bot_pid:
+            return
+        total = 0
+        for pid in _process_tree(self.bot_pid):
+            total += _rss_kb(pid)
+        if total:
+            with self.lock:
+                self.rss_samples.append(total)
+
+    def report(self, active):
+        with self.lock:
+            elapsed = max(1e-9, time.time() - self.started)
+            latency = {
+                speed: {
+                    "moves": len(v),
+                    "p50_ms": round(_percentile(v, 50) * 1000, 1),
+                    "p95_ms": round(_percentile(v, 95) * 1000, 1),
+                    "p99_ms": round(_percentile(v, 99) * 1000, 1),
+                    "max_ms": round(max(v) * 1000, 1),
+                }
+                for speed, v in self.move_latency.items()
+            }
+            return {
+                "elapsed_s":        round(elapsed, 1),
+                "requests":         self.requests,
+                "games_started":    self.games_started,
+                "games_finished":   self.games_finished,
+                "active_games":     active,
+                "max_concurrent":   self.max_concurrent,
+                "events_sent":      self.events_sent,
+                "events_per_s":     round(self.events_sent / elapsed, 2),
+                "bytes_per_s":      round(self.bytes_sent / elapsed, 1),
+                "move_latency":     latency,
+                "bot_rss_mb_last":  round(self.rss_samples[-1] / 1024, 1) if self.rss_samples else None,
+                "bot_rss_mb_peak":  round(max(self.rss_samples) / 1024, 1) if self.rss_samples else None,
+            }
+
+
+def _process_tree(pid):
+    pids, stack = [], [pid]
+    while stack:
+        p = stack.pop()
+        pids.append(p)
+        try:
+            for task in os.listdir(f"/proc/{p}/task"):
+                with open(f"/proc/{p}/task/{task}/children") as f:
+                    stack.extend(int(c) for c in f.read().split())
+        except OSError:
+            pass
+    return pids
+
+
+def _rss_kb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+# ==========================================================
+# 🌐 SAHTE LICHESS
+# ==========================================================
+class MockLichess:
+    def __init__(self, bot_id=None, opponents=None, tcs=None, concurrency=None, total_games=None,
+                 accept_rate=None, bot_pid=None):
+        self.bot_id       = bot_id or SETTINGS["BOT_ID"]
+        self.opponents    = {o.id.lower(): o for o in (opponents or [])}
+        self.tcs          = tcs or MM_SETTINGS["TC_ALL"]
+        self.concurrency  = SETTINGS["CONCURRENCY"] if concurrency is None else concurrency
+        self.total_games  = SETTINGS["TOTAL_GAMES"] if total_games is None else total_games
+        self.accept_rate  = SETTINGS["ACCEPT_RATE"] if accept_rate is None else accept_rate
+        self.lock         = threading.RLock()
+        self.games        = {}
+        self.challenges   = {}
+        self.event_subs   = []
+        self.issued       = 0
+        self.stats        = MockStats(bot_pid)
+        self.done         = threading.Event()
+
+    # --- Hesap olay akışı ---
+    def subscribe_events(self):
+        q = queue.Queue()
+        with self.lock:
+            self.event_subs.append(q)
+            for game in self.games.values():
+                if game.status == 'started':
+                    q.put({"type": "gameStart", "game": game.summary()})
+            for ch in self.challenges.values():
+                if ch["direction"] == "in" and ch["status"] == "created":
+                    q.put({"type": "challenge", "challenge": ch["json"]})
+        return q
+
+    def unsubscribe_events(self, q):
+        with self.lock:
+            if q in self.event_subs:
+                self.event_subs.remove(q)
+
+    def _emit(self, event):
+        for q in list(self.event_subs):
+            q.put(event)
+
+    # --- Meydan okumalar ---
+    def _challenge_json(self, ch_id, challenger, dest, limit_sn, inc_sn, rated, variant):
+        return {
+            "id":          ch_id,
+            "url":         f"http://{SETTINGS['HOST']}/{ch_id}",
+            "status":      "created",
+            "challenger":  challenger,
+            "destUser":    dest,
+            "variant":     {"key": variant},
+            "rated":       rated,
+            "speed":       _speed(limit_sn),
+            "timeControl": {"type": "clock", "limit": limit_sn, "increment": inc_sn,
+                            "show": f"{limit_sn // 60}+{inc_sn}"},
+            "color":       "random",
+            "perf":        {"name": _speed(limit_sn).capitalize()},
+        }
+
+    def issue_incoming_challenge(self):
+        opponent = random.choice(list(self.opponents.values()))
+        limit_sn, inc_sn = _parse_tc(random.choice(self.tcs))
+        ch_id = _new_id()
+        me    = {"id": self.bot_id, "name": self.bot_id, "title": "BOT", "rating": 2900}
+        ch    = self._challenge_json(ch_id, opponent.public(), me, limit_sn, inc_sn, True, 'standard')
+        with self.lock:
+            self.challenges[ch_id] = {"json": ch, "direction": "in", "status": "created",
+                                      "opponent": opponent, "tc": (limit_sn, inc_sn)}
+            self.issued += 1
+        self._emit({"type": "challenge", "challenge": ch})
+
+    def accept_challenge(self, ch_id):
+        with self.lock:
+            ch = self.challenges.get(ch_id)
+            if not ch or ch["status"] != "created":
+                return False
+            ch["status"] = "accepted"
+        limit_sn, inc_sn = ch["tc"]
+        # Lichess'te oyun kimliği kabul edilen teklifin kimliğidir
+        self.start_game(ch["opponent"], limit_sn, inc_sn, ch["json"]["rated"], ch["json"]["variant"]["key"],
+                        game_id=ch_id)
+        return True
+
+    def decline_challenge(self, ch_id):
+        with self.lock:
+            ch = self.challenges.get(ch_id)
+            if not ch:
+                return False
+            ch["status"] = "declined"
+        self._emit({"type": "challengeDeclined", "challenge": ch["json"]})
+        return True
+
+    def cancel_challenge(self, ch_id):
+        with self.lock:
+            ch = self.challenges.get(ch_id)
+            if not ch or ch["status"] != "created":
+                return False
+            ch["status"] = "canceled"
+        self._emit({"type": "challengeCanceled", "challenge": ch["json"]})
+        return True
+
+    def create_outgoing_challenge(self, username, form):
+        opponent = self.opponents.get(username.lower())
+        if opponent is None:
+            return None
+        limit_sn = int(form.get("clock.limit", 180))
+        inc_sn   = int(form.get("clock.increment", 0))
+        rated    = str(form.get("rated", "false")).lower() == "true"
+        variant  = form.get("variant", "standard")
+        ch_id    = _new_id()
+        me       = {"id": self.bot_id, "name": self.bot_id, "title": "BOT", "rating": 2900}
+        ch       = self._challenge_json(ch_id, me, opponent.public(), limit_sn, inc_sn, rated, variant)
+        with self.lock:
+            self.challenges[ch_id] = {"json": ch, "direction": "out", "status": "created",
+                                      "opponent": opponent, "tc": (limit_sn, inc_sn)}
+        if random.random() < self.accept_rate:
+            threading.Timer(random.uniform(0.2, 2.0), self.accept_challenge, args=(ch_id,)).start()
+        return ch
+
+    # --- Oyunlar ---
+    def start_game(self, opponent, limit_sn, inc_sn, rated, variant, game_id=None):
+        game = MockGame(self, opponent, limit_sn, inc_sn, rated,
+                        random.choice([chess.WHITE, chess.BLACK]), variant, game_id)
+        with self.lock:
+            self.games[game.id] = game
+            self.stats.games_started += 1
+            active = sum(1 for g in self.games.values() if g.status == 'started')
+            self.stats.max_concurrent = max(self.stats.max_concurrent, active)
+        self._emit({"type": "gameStart", "game": game.summary()})
+        threading.Thread(target=game.run_opponent, daemon=True).start()
+        return game
+
+    def on_game_finished(self, game):
+        with self.lock:
+            self.stats.games_finished += 1
+        self._emit({"type": "gameFinish", "game": game.summary()})
+
+    def active_games(self):
+        with self.lock:
+            return [g for g in self.games.values() if g.status == 'started']
+
+    # --- Arka plan işleri ---
+    def feeder_loop(self):
+        """Hedef eşzamanlılığı korumak için yeni gelen meydan okumalar üretir."""
+        while not self.done.is_set():
+            with self.lock:
+                pending = sum(1 for c in self.challenges.values()
+                              if c["direction"] == "in" and c["status"] == "created")
+                active  = len(self.active_games())
+                issued  = self.issued
+            if issued >= self.total_games:
+                if active == 0 and pending == 0:
+                    self.done.set()
+                    return
+            elif active + pending < self.concurrency and self.event_subs:
+                self.issue_incoming_challenge()
+            time.sleep(0.5)
+
+    def clock_loop(self):
+        last_sample = 0
+        while not self.done.is_set():
+            for game in self.active_games():
+                game.check_flag()
+            if time.time() - last_sample > SETTINGS["MEMORY_SAMPLE_SECONDS"]:
+                self.stats.sample_memory()
+                last_sample = time.time()
+            time.sleep(0.05)
+
+    def drop_loop(self, every):
+        """Ağ kesintisi taklidi: tüm olay ve oyun akışlarını kapatır; bot yeniden bağlanmalı."""
+        while not self.done.wait(every):
+            with self.lock:
+                queues = list(self.event_subs)
+                for game in self.games.values():
+                    queues.extend(game.subscribers)
+            for q in queues:
+                q.put(None)
+            print(f"✂️ {len(queues)} akış koparıldı", flush=True)
+
+    def report(self):
+        return self.stats.report(len(self.active_games()))
+
+
+# ==========================================================
+# 🔌 HTTP KATMANI
+# ==========================================================
+_ROUTES = []
+
+
+def route(method, pattern):
+    def decorator(func):
+        _ROUTES.append((method, re.compile(f"^{pattern}$"), func))
+        return func
+    return decorator
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    server_version   = "MockLichess/1.0"
+    # Akışlar gerçek Lichess gibi chunked gönderilir; aksi halde requests 512 baytlık blok bekler
+    protocol_version = "HTTP/1.1"
+    mock = None
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _dispatch(self, method):
+        parsed = urlparse(self.path)
+        with self.mock.stats.lock:
+            self.mock.stats.requests += 1
+        for m, pattern, func in _ROUTES:
+            match = pattern.match(parsed.path)
+            if m == method and match:
+                return func(self, parse_qs(parsed.query), *match.groups())
+        self._json({"error": f"Not found: {parsed.path}"}, status=404)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length).decode("utf-8") if length else ""
+
+    def _form(self):
+        body = self._body()
+        if self.headers.get("Content-Type", "").startswith("application/json"):
+            try:
+                return json.loads(body or "{}")
+            except ValueError:
+                return {}
+        return {k: v[-1] for k, v in parse_qs(body).items()}
+
+    def _json(self, payload, status=200):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _ndjson_list(self, items):
+        data = "".join(json.dumps(i) + "\n" for i in items).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _stream(self, q, close):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            while not self.mock.done.is_set():
+                try:
+                    event = q.get(timeout=SETTINGS["KEEPALIVE_SECONDS"])
+                except queue.Empty:
+                    self._write_chunk(b"\n")
+                    continue
+                if event is None:
+                    break
+                line = (json.dumps(event) + "\n").encode("utf-8")
+                self._write_chunk(line)
+                self.mock.stats.record_sent(len(line))
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.close_connection = True
+            close(q)
+
+
+@route("GET", r"/api/account")
+def _account(h, query):
+    h._json({"id": h.mock.bot_id, "username": h.mock.bot_id, "title": "BOT",
+             "perfs": {m: {"rating": 2900} for m in ('bullet', 'blitz', 'rapid', 'classical', 'chess960')}})
+
+
+@route("GET", r"/api/account/playing")
+def _playing(h, query):
+    h._json({"nowPlaying": [g.summary() for g in h.mock.active_games()]})
+
+
+@route("GET", r"/api/stream/event")
+def _event_stream(h, query):
+    h._stream(h.mock.subscribe_events(), h.mock.unsubscribe_events)
+
+
+@route("GET", r"/api/bot/game/stream/([\w]+)")
+def _game_stream(h, query, game_id):
+    game = h.mock.games.get(game_id)
+    if not game:
+        return h._json({"error": "No such game"}, status=404)
+    h._stream(game.subscribe(), game.unsubscribe)
+
+
+@route("POST", r"/api/bot/game/([\w]+)/move/([a-h1-8qrbn]+)")
+def _move(h, query, game_id, uci):
+    h._body()
+    game = h.mock.games.get(game_id)
+    if not game:
+        return h._json({"error": "No such game"}, status=404)
+    ok, error = game.apply_move(uci, game.bot_color)
+    h._json({"ok": True} if ok else {"error": error}, status=200 if ok else 400)
+
+
+@route("POST", r"/api/bot/game/([\w]+)/chat")
+def _chat(h, query, game_id):
+    h._form()
+    h._json({"ok": True})
+
+
+@route("POST", r"/api/bot/game/([\w]+)/(abort|resign)")
+def _end_game(h, query, game_id, action):
+    h._body()
+    game = h.mock.games.get(game_id)
+    if not game:
+        return h._json({"error": "No such game"}, status=404)
+    if action == 'abort':
+        game.finish('aborted')
+    else:
+        game.finish('resign', winner=not game.bot_color)
+    h._json({"ok": True})
+
+
+@route("POST", r"/api/bot/game/([\w]+)/draw/(yes|no)")
+def _draw(h, query, game_id, answer):
+    h._body()
+    game = h.mock.games.get(game_id)
+    if not game:
+        return h._json({"error": "No such game"}, status=404)
+    if answer == 'yes':
+        game.draw_offer()
+    h._json({"ok": True})
+
+
+@route("POST", r"/api/bot/game/([\w]+)/claim-victory")
+def _claim_victory(h, query, game_id):
+    h._body()
+    game = h.mock.games.get(game_id)
+    if not game:
+        return h._json({"error": "No such game"}, status=404)
+    ok = game.claim_victory()
+    h._json({"ok": True} if ok else {"error": "Cannot claim victory"}, status=200 if ok else 400)
+
+
+@route("POST", r"/api/challenge/([\w]+)/(accept|decline|cancel)")
+def _challenge_reply(h, query, ch_id, action):
+    h._form()
+    handler = {"accept": h.mock.accept_challenge, "decline": h.mock.decline_challenge,
+               "cancel": h.mock.cancel_challenge}[action]
+    ok = handler(ch_id)
+    h._json({"ok": True} if ok else {"error": "No such challenge"}, status=200 if ok else 404)
+
+
+@route("POST", r"/api/challenge/([\w-]+)")
+def _challenge_create(h, query, username):
+    ch = h.mock.create_outgoing_challenge(username, h._form())
+    if ch is None:
+        return h._json({"error": f"No such user: {username}"}, status=400)
+    h._json({"challenge": ch})
+
+
+@route("GET", r"/api/bot/online")
+def _online_bots(h, query):
+    h._ndjson_list([o.user_data() for o in h.mock.opponents.values() if o.title == 'BOT'])
+
+
+@route("POST", r"/api/users")
+def _users(h, query):
+    ids   = [i.strip().lower() for i in h._body().split(",") if i.strip()]
+    users = [h.mock.opponents[i].user_data() for i in ids if i in h.mock.opponents]
+    h._json(users)
+
+
+@route("GET", r"/api/user/([\w-]+)")
+def _user(h, query, username):
+    if username.lower() == h.mock.bot_id.lower():
+        return _account(h, query)
+    opponent = h.mock.opponents.get(username.lower())
+    if not opponent:
+        return h._json({"error": "Not found"}, status=404)
+    h._json(opponent.user_data())
+
+
+@route("GET", r"/api/tournament")
+def _tournaments(h, query):
+    h._json({"created": [], "started": [], "finished": []})
+
+
+@route("GET", r"/api/team/([\w-]+)/swiss")
+def _swiss(h, query, team):
+    h._ndjson_list([])
+
+
+@route("GET", r"/standard")
+def _tablebase(h, query):
+    # Online tablebase istekleri de yerelde cevaplanır; boş liste motora düşürür
+    h._json({"category": "unknown", "moves": []})
+
+
+@route("GET", r"/mock/stats")
+def _stats(h, query):
+    h._json(h.mock.report())
+
+
+def build_opponents(count=None, rating=None, think_ms=None, script=None):
+    lo, hi = rating or SETTINGS["OPPONENT_RATING"]
+    return [
+        Opponent(f"mock-bot-{i}", random.randint(lo, hi), think_ms=think_ms, script=script)
+        for i in range(count or SETTINGS["OPPONENT_COUNT"])
+    ]
+
+
+def serve(mock, host=None, port=None):
+    handler = type("BoundMockHandler", (MockHandler,), {"mock": mock})
+    httpd   = ThreadingHTTPServer((host or SETTINGS["HOST"], port or SETTINGS["PORT"]), handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    threading.Thread(target=mock.feeder_loop, daemon=True).start()
+    threading.Thread(target=mock.clock_loop, daemon=True).start()
+    return httpd
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Yük testi için yerel Lichess Bot API taklidi.")
+    parser.add_argument("--host", default=SETTINGS["HOST"])
+    parser.add_argument("--port", type=int, default=SETTINGS["PORT"])
+    parser.add_argument("--bot-id", default=SETTINGS["BOT_ID"])
+    parser.add_argument("--concurrency", type=int, default=SETTINGS["CONCURRENCY"],
+                        help="Aynı anda açık tutulacak gelen meydan okuma/oyun sayısı")
+    parser.add_argument("--games", type=int, default=SETTINGS["TOTAL_GAMES"], help="Toplam gelen meydan okuma")
+    parser.add_argument("--opponents", type=int, default=SETTINGS["OPPONENT_COUNT"])
+    parser.add_argument("--tc", action="append", help="Kullanılacak TC'ler (varsayılan: TC_ALL)")
+    parser.add_argument("--think-ms", type=int, nargs=2, default=None, metavar=("MIN", "MAX"))
+    parser.add_argument("--accept-rate", type=float, default=SETTINGS["ACCEPT_RATE"])
+    parser.add_argument("--script", default=None, help="choose_move/think_time tanımlayan rakip senaryosu")
+    parser.add_argument("--bot-pid", type=int, default=None, help="Bellek ölçümü için bot süreç kimliği")
+    parser.add_argument("--report", default=None, help="Bitişte istatistikleri bu JSON dosyasına yaz")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--drop-every", type=float, default=SETTINGS["DROP_EVERY"],
+                        help="Açık akışları bu kadar saniyede bir kopar")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    script    = load_script(args.script) if args.script else None
+    opponents = build_opponents(args.opponents, think_ms=args.think_ms, script=script)
+    mock      = MockLichess(args.bot_id, opponents, args.tc, args.concurrency, args.games,
+                            args.accept_rate, args.bot_pid)
+    httpd     = serve(mock, args.host, args.port)
+    if args.drop_every > 0:
+        threading.Thread(target=mock.drop_loop, args=(args.drop_every,), daemon=True).start()
+
+    base = f"http://{args.host}:{args.port}"
+    print(f"🧪 Sahte Lichess hazır: {base}", flush=True)
+    print(f"   Bot: LICHESS_URL={base} TABLEBASE_URL={base} LICHESS_TOKEN=mock python lichess-bot.py", flush=True)
+
+    try:
+        while not mock.done.wait(10):
+            print(f"📈 {json.dumps(mock.report())}", flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        mock.done.set()
+        httpd.shutdown()
+
+    report = mock.report()
+    print(f"🏁 Sonuç: {json.dumps(report, indent=2)}", flush=True)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
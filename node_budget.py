@@ -0,0 +1,109 @@
+import threading
+from collections import deque
+
+import chess
+import chess.engine
+
+# ==========================================================
+# ⚙️ AYARLAR
+# ==========================================================
+SETTINGS = {
+    "CALIBRATION_SECONDS": 0.15,     # Pozisyon başına açılış ölçümü
+    "CALIBRATION_FENS": (
+        "r1bq1rk1/pp2bppp/2n1pn2/2pp4/3P4/2PBPN2/PP1N1PPP/R2QK2R w KQ - 0 8",
+        "2rq1rk1/pb1nbppp/1p2pn2/2pp4/3P4/1P1BPN2/PBPN1PPP/2RQ1RK1 w - - 0 11",
+        "8/5pk1/6p1/3R4/5P2/6P1/r5K1/8 b - - 0 45",
+    ),
+    "EMA_ALPHA":           0.2,      # Oyun içi NPS/ek yük güncelleme ağırlığı
+    "SAFETY":              0.75,     # Bütçenin düğüme çevrilen başlangıç oranı
+    "SAFETY_MIN":          0.3,
+    "SAFETY_MAX":          0.9,
+    "MIN_NODES":           2000,
+    "STATS_WINDOW":        500,      # Aşım istatistiği için son N panik araması
+}
+
+
+class NodeBudget:
+    """Motor başına ölçülen NPS ile panik süresini 'go nodes N' bütçesine çevirir.
+
+    Süre modeli: duvar saati = sabit ek yük + düğüm / NPS. NPS motorun kendi
+    raporundan, ek yük duvar saati ile raporlanan süre farkından öğrenilir;
+    bütçe aşılırsa güvenlik oranı küçülür, rahat kalınırsa yavaşça büyür.
+    """
+
+    def __init__(self):
+        self.lock      = threading.Lock()
+        self.nps       = {}
+        self.overhead  = {}
+        self.safety    = SETTINGS["SAFETY"]
+        self.searches  = 0
+        self.overshoot = 0
+        self.ratios    = deque(maxlen=SETTINGS["STATS_WINDOW"])
+
+    def _blend(self, table, key, value):
+        old = table.get(key)
+        a   = SETTINGS["EMA_ALPHA"]
+        table[key] = value if old is None else old + a * (value - old)
+
+    def calibrate(self, engine):
+        """Açılışta kısa sabit süreli aramalarla motorun NPS'ini ölçer."""
+        samples = []
+        for fen in SETTINGS["CALIBRATION_FENS"]:
+            info = engine.analyse(chess.Board(fen),
+                                  chess.engine.Limit(time=SETTINGS["CALIBRATION_SECONDS"]))
+            nodes, elapsed = info.get("nodes"), info.get("time")
+            if nodes and elapsed:
+                samples.append(nodes / elapsed)
+        if not samples:
+            return None
+        samples.sort()
+        nps = samples[len(samples) // 2]
+        with self.lock:
+            self.nps[id(engine)] = nps
+        return nps
+
+    def ready(self, engine):
+        with self.lock:
+            return id(engine) in self.nps
+
+    def nodes_for(self, engine, budget):
+        with self.lock:
+            nps      = self.nps.get(id(engine))
+            overhead = self.overhead.get(id(engine), 0.0)
+            safety   = self.safety
+        if not nps:
+            return None
+        return max(SETTINGS["MIN_NODES"], int((budget - overhead) * nps * safety))
+
+    def observe(self, engine, info, wall, budget=None):
+        """Her aramadan sonra NPS/ek yük güncellenir; budget verilirse aşım kaydedilir."""
+        nodes, elapsed = (info.get("nodes"), info.get("time")) if info else (None, None)
+        key = id(engine)
+        with self.lock:
+            if nodes and elapsed:
+                self._blend(self.nps, key, nodes / elapsed)
+                self._blend(self.overhead, key, max(0.0, wall - elapsed))
+            if budget:
+                ratio = wall / budget
+                self.searches += 1
+                self.ratios.append(ratio)
+                if ratio > 1.0:
+                    self.overshoot += 1
+                    self.safety = max(SETTINGS["SAFETY_MIN"], self.safety * 0.85)
+                elif ratio < 0.7:
+                    self.safety = min(SETTINGS["SAFETY_MAX"], self.safety * 1.03)
+
+    def stats(self):
+        with self.lock:
+            ratios = sorted(self.ratios)
+            nps    = list(self.nps.values())
+            return {
+                "searches":       self.searches,
+                "overshoots":     self.overshoot,
+                "overshoot_rate": round(self.overshoot / self.searches, 3) if self.searches else None,
+                "ratio_p50":      round(ratios[len(ratios) // 2], 3) if ratios else None,
+                "ratio_p95":      round(ratios[min(len(ratios) - 1, int(len(ratios) * 0.95))], 3) if ratios else None,
+                "ratio_max":      round(ratios[-1], 3) if ratios else None,
+                "safety":         round(self.safety, 3),
+                "nps_mean":       int(sum(nps) / len(nps)) if nps else None,
+            }
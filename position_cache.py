@@ -0,0 +1,159 @@
+import math
+import mmap
+import os
+import struct
+import threading
+
+import chess
+import chess.polyglot
+
+# ==========================================================
+# ⚙️ AYARLAR
+# ==========================================================
+SETTINGS = {
+    "PATH":          "./position_cache.bin",
+    "BUCKETS":       1 << 16,   # 64K kova × 4 kayıt = 262K pozisyon, 4 MB
+    "MIN_DEPTH":     16,        # Bunun altındaki aramalar saklanmaz
+    "MAX_PLY":       60,        # Sadece açılış/orta oyun; oyun sonunda TB var
+}
+
+_MAGIC        = b"VOIDPC01"
+_HEADER       = struct.Struct("<8sIII12x")     # magic, sürüm, kova sayısı, nesil
+_RECORD       = struct.Struct("<QHhBBH")       # anahtar, hamle, skor, derinlik, nesil, süre (cs)
+_SLOTS        = 4                              # Kova başına kayıt (64 bayt = 1 cache line)
+_BUCKET_SIZE  = _RECORD.size * _SLOTS
+_VERSION      = 1
+_SCORE_LIMIT  = 32000
+
+
+def encode_move(move):
+    return move.from_square | (move.to_square << 6) | ((move.promotion or 0) << 12)
+
+
+def decode_move(code):
+    promotion = (code >> 12) & 0x7
+    return chess.Move(code & 0x3F, (code >> 6) & 0x3F, promotion or None)
+
+
+class CacheEntry:
+    __slots__ = ("move", "score", "depth", "seconds")
+
+    def __init__(self, move, score, depth, seconds):
+        self.move    = move
+        self.score   = score
+        self.depth   = depth
+        self.seconds = seconds
+
+
+class PositionCache:
+    """Zobrist anahtarlı, sabit kayıtlı, mmap'li kalıcı pozisyon→hamle önbelleği.
+
+    Dosya 4 kayıtlık kovalardan oluşur. Yer açmak gerektiğinde Stockfish TT'sindeki
+    gibi 'derinlik - 8 × yaş' değeri en düşük kayıt silinir; yaş oturum sayısıdır.
+    """
+
+    def __init__(self, path=None, buckets=None):
+        self.path    = path or SETTINGS["PATH"]
+        self.lock    = threading.Lock()
+        buckets      = buckets or SETTINGS["BUCKETS"]
+        # Anahtar maskeyle kovaya düşsün diye ikinin kuvvetine yuvarlanır
+        self.buckets = 1 << max(4, int(math.log2(buckets)))
+        self.size    = _HEADER.size + self.buckets * _BUCKET_SIZE
+
+        self._file = self._open()
+        self._mm   = mmap.mmap(self._file.fileno(), self.size)
+        magic, version, n_buckets, generation = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC or version != _VERSION or n_buckets != self.buckets:
+            self._mm[:] = bytes(self.size)
+            generation  = 0
+        self.generation = (generation + 1) & 0xFF
+        _HEADER.pack_into(self._mm, 0, _MAGIC, _VERSION, self.buckets, self.generation)
+
+    def _open(self):
+        mode = "r+b" if os.path.exists(self.path) else "w+b"
+        f = open(self.path, mode)
+        f.seek(0, os.SEEK_END)
+        if f.tell() != self.size:
+            f.truncate(self.size)
+        return f
+
+    def _bucket_offset(self, key):
+        return _HEADER.size + (key & (self.buckets - 1)) * _BUCKET_SIZE
+
+    def probe(self, board, key=None):
+        key  = chess.polyglot.zobrist_hash(board) if key is None else key
+        base = self._bucket_offset(key)
+        with self.lock:
+            for i in range(_SLOTS):
+                k, move, score, depth, _, centis = _RECORD.unpack_from(self._mm, base + i * _RECORD.size)
+                if k == key and move:
+                    return CacheEntry(decode_move(move), score, depth, centis / 100.0)
+        return None
+
+    def store(self, board, move, score, depth, seconds, key=None):
+        if depth < SETTINGS["MIN_DEPTH"] or move is None:
+            return False
+        key    = chess.polyglot.zobrist_hash(board) if key is None else key
+        base   = self._bucket_offset(key)
+        score  = max(-_SCORE_LIMIT, min(_SCORE_LIMIT, int(score or 0)))
+        centis = max(0, min(0xFFFF, int(seconds * 100)))
+        depth  = min(depth, 0xFF)
+
+        with self.lock:
+            victim, victim_value = None, None
+            for i in range(_SLOTS):
+                off = base + i * _RECORD.size
+                k, code, _, old_depth, gen, _ = _RECORD.unpack_from(self._mm, off)
+                if k == key or not code:
+                    if k == key and old_depth > depth + 2:
+                        return False   # Daha derin sonuç zaten var
+                    victim = off
+                    break
+                age   = (self.generation - gen) & 0xFF
+                value = old_depth - 8 * age
+                if victim_value is None or value < victim_value:
+                    victim, victim_value = off, value
+            _RECORD.pack_into(self._mm, victim, key, encode_move(move), score, depth,
+                              self.generation, centis)
+        return True
+
+    def close(self):
+        with self.lock:
+            if self._mm is not None:
+                self._mm.flush()
+                self._mm.close()
+                self._file.close()
+                self._mm = None
+
+
+class DepthEstimator:
+    """Düşünme süresi → ulaşılan derinlik ilişkisini log2(ms) kovalarında EMA ile öğrenir."""
+
+    def __init__(self, alpha=0.2):
+        self.alpha  = alpha
+        self.lock   = threading.Lock()
+        self.depths = {}
+
+    @staticmethod
+    def _bucket(seconds):
+        return int(round(math.log2(max(1.0, seconds * 1000))))
+
+    def observe(self, seconds, depth):
+        if not seconds or not depth:
+            return
+        b = self._bucket(seconds)
+        with self.lock:
+            old = self.depths.get(b)
+            self.depths[b] = depth if old is None else old + self.alpha * (depth - old)
+
+    def estimate(self, seconds):
+        """Verilen süreyle beklenen derinlik; hiç veri yoksa None."""
+        b = self._bucket(seconds)
+        with self.lock:
+            if not self.depths:
+                return None
+            if b in self.depths:
+                return self.depths[b]
+            nearest = min(self.depths, key=lambda k: abs(k - b))
+            # Her iki katı süre yaklaşık bir ply getirir
+            return self.depths[nearest] + (b - nearest)
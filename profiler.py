@@ -0,0 +1,290 @@
+import json
+import linecache
+import os
+import re
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+
+import botlog
+from metrics import METRICS
+
+log = botlog.get_logger("profiler")
+
+# ==========================================================
+# ⚙️ AYARLAR
+# ==========================================================
+SETTINGS = {
+    "TRIGGER_FILE":   "PROFILE.txt",   # Oluşturulunca profil başlar; içerik varsa pencere süresi (sn)
+    "SIGNAL":         "SIGUSR2",       # kill -USR2 <pid> ile de başlatılır
+    "POLL_SECONDS":   1.0,
+    "RATE_HZ":        50,              # Örnekleme sıklığı (100 Hz'de ek yük ~%5)
+    "WINDOW":         30.0,            # Varsayılan pencere (sn)
+    "MAX_WINDOW":     600.0,
+    "MAX_DEPTH":      64,              # Yığın başına en fazla çerçeve (kök tarafı kırpılır)
+    "OUT_DIR":        "./profiles",
+    "TOP":            25,
+}
+
+
+# ==========================================================
+# 🔒 BEKLEME SÜRESİ ÖLÇEN KİLİT
+# ==========================================================
+class TimedLock:
+    """threading.Lock yerine geçer; sadece çekişmede (kilit doluyken) bekleme süresini ölçer.
+
+    Çekişmesiz yol tek bir acquire(blocking=False) olduğu için ek yük yok denecek kadar azdır.
+    """
+
+    _registry      = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, name):
+        self.name       = name
+        self._lock      = threading.Lock()
+        self.acquires   = 0
+        self.contended  = 0
+        self.wait_total = 0.0
+        self.wait_max   = 0.0
+        with TimedLock._registry_lock:
+            TimedLock._registry[name] = self
+
+    def acquire(self, blocking=True, timeout=-1):
+        if self._lock.acquire(False):
+            self.acquires += 1
+            return True
+        if not blocking:
+            return False
+        t0 = time.perf_counter()
+        ok = self._lock.acquire(True, timeout)
+        waited = time.perf_counter() - t0
+        if ok:
+            # Kilit tutulurken güncellenir; ayrı bir sayaç kilidi gerekmez
+            self.acquires   += 1
+            self.contended  += 1
+            self.wait_total += waited
+            self.wait_max    = max(self.wait_max, waited)
+        return ok
+
+    def release(self):
+        self._lock.release()
+
+    def locked(self):
+        return self._lock.locked()
+
+    __enter__ = acquire
+
+    def __exit__(self, *exc):
+        self.release()
+
+    def snapshot(self):
+        return {
+            "acquires":     self.acquires,
+            "contended":    self.contended,
+            "wait_total_s": round(self.wait_total, 4),
+            "wait_mean_ms": round(1000 * self.wait_total / self.contended, 3) if self.contended else 0.0,
+            "wait_max_ms":  round(1000 * self.wait_max, 3),
+        }
+
+
+def lock_stats():
+    with TimedLock._registry_lock:
+        locks = list(TimedLock._registry.values())
+    return {lk.name: lk.snapshot() for lk in locks}
+
+
+# ==========================================================
+# 🔥 ÖRNEKLEYİCİ
+# ==========================================================
+_THREAD_SUFFIX = re.compile(r"^Thread-\d+ \((.+)\)$")
+
+
+def _thread_label(name):
+    """'Thread-12 (handle_game_wrapper)' → 'handle_game_wrapper'; aynı işi yapan thread'ler birleşir."""
+    m = _THREAD_SUFFIX.match(name)
+    return m.group(1) if m else re.sub(r"[-_]?\d+$", "", name) or name
+
+
+# Yaprağı bunlar olan örnekler thread'in boşta beklediğini gösterir (kilit, soket, select)
+IDLE_LEAVES = {
+    "wait (threading.py)", "select (selectors.py)", "readinto (socket.py)",
+    "_do_waitpid (unix_events.py)", "get (queue.py)", "accept (socket.py)",
+}
+
+_labels = {}
+_idle   = {}
+_IDLE_CALL = re.compile(r"\b(sleep|wait|select|poll)\(")
+
+
+def _frame_label(frame):
+    code  = frame.f_code
+    label = _labels.get(code)
+    if label is None:
+        label = _labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)})"
+    return label
+
+
+def is_idle(frame):
+    """Yaprak boşta mı: bilinen bekleme çerçevesi ya da satırı sleep/wait çağıran Python kodu
+    (time.sleep gibi C çağrıları yığında çerçeve bırakmaz)."""
+    key   = (frame.f_code, frame.f_lineno)
+    state = _idle.get(key)
+    if state is None:
+        line  = linecache.getline(frame.f_code.co_filename, frame.f_lineno)
+        state = _idle[key] = _frame_label(frame) in IDLE_LEAVES or bool(_IDLE_CALL.search(line))
+    return state
+
+
+def collapse(frame, max_depth):
+    """Yığını kökten yaprağa 'a;b;c' biçiminde döndürür."""
+    parts = []
+    while frame is not None and len(parts) < max_depth:
+        parts.append(_frame_label(frame))
+        frame = frame.f_back
+    parts.reverse()
+    return ";".join(parts)
+
+
+class Profiler:
+    """Tüm thread'lerin yığınlarını sys._current_frames ile örnekler; çıktı collapsed-stack (flamegraph)."""
+
+    def __init__(self):
+        self.lock    = threading.Lock()
+        self.request = threading.Event()
+        self.window  = SETTINGS["WINDOW"]
+        self.running = False
+        self.last    = None
+        self.thread  = None
+
+    def install(self):
+        """Sinyal işleyicisi ana thread'de kurulmalı; tetik dosyası arka planda izlenir."""
+        signum = getattr(signal, SETTINGS["SIGNAL"], None)
+        if signum is not None and threading.current_thread() is threading.main_thread():
+            signal.signal(signum, lambda *_: self.trigger())
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+            self.thread.start()
+        return self
+
+    def trigger(self, window=None):
+        if window:
+            self.window = min(float(window), SETTINGS["MAX_WINDOW"])
+        self.request.set()
+
+    def _poll_file(self):
+        path = SETTINGS["TRIGGER_FILE"]
+        if not os.path.exists(path):
+            return
+        window = None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read().strip()
+            window = float(text) if text else None
+            os.remove(path)
+        except (OSError, ValueError):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self.trigger(window)
+
+    def _run(self):
+        while True:
+            if self.request.wait(SETTINGS["POLL_SECONDS"]):
+                self.request.clear()
+                window, self.window = self.window, SETTINGS["WINDOW"]
+                try:
+                    self.profile(window)
+                except Exception as e:
+                    log.warning(f"⚠️ [Profiler] Hata: {e}")
+            else:
+                self._poll_file()
+
+    def profile(self, window):
+        interval = 1.0 / SETTINGS["RATE_HZ"]
+        me       = threading.get_ident()
+        stacks   = Counter()
+        leaves   = Counter()
+        busy     = Counter()
+        threads  = Counter()
+        locks0   = lock_stats()
+        log.info(f"🔥 [Profiler] {window:.0f}s örnekleniyor ({SETTINGS['RATE_HZ']} Hz)")
+        with self.lock:
+            self.running = True
+        t0, samples, cost = time.perf_counter(), 0, 0.0
+        try:
+            deadline = t0 + window
+            next_at  = t0
+            while True:
+                now = time.perf_counter()
+                if now >= deadline:
+                    break
+                names = {t.ident: t.name for t in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    if ident == me:
+                        continue
+                    label = _thread_label(names.get(ident, str(ident)))
+                    stack = collapse(frame, SETTINGS["MAX_DEPTH"])
+                    stacks[f"{label};{stack}"] += 1
+                    leaves[_frame_label(frame)] += 1
+                    if not is_idle(frame):
+                        busy[_frame_label(frame)] += 1
+                    threads[label] += 1
+                samples += 1
+                cost    += time.perf_counter() - now
+                next_at += interval
+                time.sleep(max(0.0, next_at - time.perf_counter()))
+        finally:
+            with self.lock:
+                self.running = False
+        elapsed = time.perf_counter() - t0
+        return self._write(stacks, leaves, busy, threads, locks0, samples, elapsed, cost)
+
+    def _write(self, stacks, leaves, busy, threads, locks0, samples, elapsed, cost):
+        os.makedirs(SETTINGS["OUT_DIR"], exist_ok=True)
+        stamp  = time.strftime("%Y%m%d-%H%M%S")
+        base   = os.path.join(SETTINGS["OUT_DIR"], f"profile-{stamp}")
+        with open(base + ".folded", "w", encoding="utf-8") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        # Pencere içindeki kilit beklemeleri (başlangıç anına göre fark)
+        locks = {}
+        for name, now in lock_stats().items():
+            before    = locks0.get(name, {})
+            contended = now["contended"] - before.get("contended", 0)
+            wait      = now["wait_total_s"] - before.get("wait_total_s", 0.0)
+            locks[name] = {
+                "acquires":     now["acquires"] - before.get("acquires", 0),
+                "contended":    contended,
+                "wait_total_s": round(wait, 4),
+                "wait_mean_ms": round(1000 * wait / contended, 3) if contended else 0.0,
+                "wait_max_ms":  now["wait_max_ms"],
+            }
+        summary = {
+            "samples":      samples,
+            "seconds":      round(elapsed, 2),
+            "rate_hz":      round(samples / elapsed, 1) if elapsed else 0,
+            "overhead_pct": round(100 * cost / elapsed, 2) if elapsed else 0,
+            "threads":      dict(threads.most_common()),
+            "top_leaves":   dict(leaves.most_common(SETTINGS["TOP"])),
+            "busy_leaves":  dict(busy.most_common(SETTINGS["TOP"])),
+            "locks":        locks,
+            "folded":       base + ".folded",
+        }
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=1, ensure_ascii=False)
+        with self.lock:
+            self.last = {k: summary[k] for k in ("samples", "seconds", "overhead_pct", "folded")}
+        METRICS.inc("profiles_written")
+        log.info(f"🔥 [Profiler] {samples} örnek, ek yük %{summary['overhead_pct']} → {base}.folded")
+        return summary
+
+    def stats(self):
+        with self.lock:
+            return {"running": self.running, "last": self.last, "locks": lock_stats()}
+
+
+PROFILER = Profiler()
@@ -0,0 +1,258 @@
+import argparse
+import hashlib
+import json
+import os
+import platform
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+# ==========================================================
+# ⚙️ AYARLAR
+# ==========================================================
+SETTINGS = {
+    "SRC_DIR":         "./src",
+    "INSTALL_PATH":    "./src/Ethereal",
+    "CACHE_DIR":       os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+                                    "void-bot", "builds"),
+    "REPORT_PATH":     "./build_report.json",
+    "COMP":            os.environ.get("COMP", "gcc"),
+    "MAX_CANDIDATES":  3,       # Desteklenen en güçlü N mimari denenir
+    "BENCH_RUNS":      3,       # Medyan NPS için bench tekrar sayısı
+    "BENCH_ARGS":      ["bench", "16", "1", "13", "default", "depth"],
+    "BUILD_TIMEOUT":   1800,
+    "BENCH_TIMEOUT":   300,
+}
+
+# scripts/get_native_properties.sh ile aynı sıra ve koşullar (güçlüden zayıfa)
+X86_64_ARCHES = (
+    ("x86-64-avx512icl", ("avx512f", "avx512cd", "avx512vl", "avx512dq", "avx512bw", "avx512ifma",
+                          "avx512vbmi", "avx512vbmi2", "avx512vpopcntdq", "avx512bitalg",
+                          "avx512vnni", "vpclmulqdq", "gfni", "vaes")),
+    ("x86-64-vnni512",   ("avx512vnni", "avx512dq", "avx512f", "avx512bw", "avx512vl")),
+    ("x86-64-avx512",    ("avx512f", "avx512bw")),
+    ("x86-64-avxvnni",   ("avxvnni",)),
+    ("x86-64-bmi2",      ("bmi2",)),
+    ("x86-64-avx2",      ("avx2",)),
+    ("x86-64-sse41-popcnt", ("sse41", "popcnt")),
+    ("x86-64",           ()),
+)
+
+NPS_RE   = re.compile(r"Nodes/second\s*:\s*(\d+)")
+NODES_RE = re.compile(r"Nodes searched\s*:\s*(\d+)")
+NET_RE   = re.compile(r'#define\s+EvalFileDefaultName\w*\s+"(nn-[a-z0-9]{12}\.nnue)"')
+
+
+# ==========================================================
+# 🔍 DONANIM
+# ==========================================================
+def cpu_flags(path="/proc/cpuinfo"):
+    """cpuinfo bayrakları; '_' ve '.' kaldırılır (get_native_properties.sh gibi)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith(("flags", "Features")):
+                    raw = line.split(":", 1)[1]
+                    return set(raw.replace("_", "").replace(".", "").lower().split())
+    except OSError:
+        pass
+    return set()
+
+
+def is_znver_1_2(path="/proc/cpuinfo"):
+    info = {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                info.setdefault(key.strip(), value.strip())
+    except OSError:
+        return False
+    return info.get("vendor_id") == "AuthenticAMD" and info.get("cpu family") == "23"
+
+
+def native_arch(src_dir):
+    script = os.path.join(src_dir, "..", "scripts", "get_native_properties.sh")
+    try:
+        out = subprocess.run(["sh", script], capture_output=True, text=True, timeout=30)
+        return out.stdout.split()[0] if out.returncode == 0 and out.stdout.strip() else None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def candidate_arches(flags, native=None, limit=None):
+    """Bu CPU'da çalışabilecek mimariler, güçlüden zayıfa."""
+    if platform.machine() not in ("x86_64", "AMD64"):
+        return [native] if native else []
+    out = []
+    for arch, needs in X86_64_ARCHES:
+        if arch == "x86-64-bmi2" and is_znver_1_2():
+            continue   # Zen 1/2'de pext/pdep mikro kodla çalışır, yavaştır
+        if all(f in flags for f in needs):
+            out.append(arch)
+    if native and native not in out:
+        out.insert(0, native)
+    return out[:limit or SETTINGS["MAX_CANDIDATES"]]
+
+
+# ==========================================================
+# 🧠 NNUE ÖNBELLEĞİ
+# ==========================================================
+def network_names(src_dir):
+    with open(os.path.join(src_dir, "evaluate.h"), "r", encoding="utf-8") as f:
+        return NET_RE.findall(f.read())
+
+
+def _net_valid(path, name):
+    if not os.path.exists(path):
+        return False
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return name == f"nn-{h.hexdigest()[:12]}.nnue"
+
+
+def restore_networks(src_dir, cache_dir):
+    """Önbellekteki ağlar src/'ye kopyalanır; net.sh doğrulayıp indirmeyi atlar."""
+    for name in network_names(src_dir):
+        cached, target = os.path.join(cache_dir, "nnue", name), os.path.join(src_dir, name)
+        if not _net_valid(target, name) and _net_valid(cached, name):
+            shutil.copyfile(cached, target)
+
+
+def save_networks(src_dir, cache_dir):
+    os.makedirs(os.path.join(cache_dir, "nnue"), exist_ok=True)
+    for name in network_names(src_dir):
+        src, cached = os.path.join(src_dir, name), os.path.join(cache_dir, "nnue", name)
+        if _net_valid(src, name) and not _net_valid(cached, name):
+            shutil.copyfile(src, cached)
+
+
+# ==========================================================
+# 🔨 DERLEME VE BENCH
+# ==========================================================
+def build(src_dir, arch, pgo, comp, jobs, log_path):
+    target = "profile-build" if pgo else "build"
+    cmd    = ["make", f"-j{jobs}", target, f"ARCH={arch}", f"COMP={comp}"]
+    t0     = time.time()
+    with open(log_path, "w", encoding="utf-8") as log:
+        subprocess.run(["make", "clean"], cwd=src_dir, stdout=log, stderr=subprocess.STDOUT)
+        proc = subprocess.run(cmd, cwd=src_dir, stdout=log, stderr=subprocess.STDOUT,
+                              timeout=SETTINGS["BUILD_TIMEOUT"])
+    binary = os.path.join(src_dir, "stockfish")
+    if proc.returncode != 0 or not os.path.exists(binary):
+        return None, time.time() - t0
+    return binary, time.time() - t0
+
+
+def bench(binary, runs=None):
+    """(medyan NPS, tüm NPS'ler, düğüm imzası)."""
+    results, signature = [], None
+    for _ in range(runs or SETTINGS["BENCH_RUNS"]):
+        proc = subprocess.run([binary] + SETTINGS["BENCH_ARGS"], capture_output=True, text=True,
+                              timeout=SETTINGS["BENCH_TIMEOUT"])
+        text  = proc.stdout + proc.stderr
+        nps   = NPS_RE.search(text)
+        nodes = NODES_RE.search(text)
+        if proc.returncode != 0 or not nps:
+            return None, results, signature
+        results.append(int(nps.group(1)))
+        signature = int(nodes.group(1)) if nodes else signature
+    return int(statistics.median(results)), results, signature
+
+
+def install(binary, path):
+    tmp = f"{path}.tmp"
+    shutil.copyfile(binary, tmp)
+    os.chmod(tmp, 0o755)
+    os.replace(tmp, path)
+
+
+# ==========================================================
+# 🚀 CLI
+# ==========================================================
+def parse_args():
+    parser = argparse.ArgumentParser(description="Bu makine için en hızlı motor derlemesini seçer")
+    parser.add_argument("--src", default=SETTINGS["SRC_DIR"])
+    parser.add_argument("--install", default=SETTINGS["INSTALL_PATH"])
+    parser.add_argument("--cache", default=SETTINGS["CACHE_DIR"])
+    parser.add_argument("--report", default=SETTINGS["REPORT_PATH"])
+    parser.add_argument("--comp", default=SETTINGS["COMP"])
+    parser.add_argument("--arch", action="append", help="Denenecek ARCH (tekrarlanabilir)")
+    parser.add_argument("--max-candidates", type=int, default=SETTINGS["MAX_CANDIDATES"])
+    parser.add_argument("--no-pgo", action="store_true", help="profile-build yerine düz build")
+    parser.add_argument("--compare-pgo", action="store_true", help="Her ARCH için PGO'lu ve PGO'suz derle")
+    parser.add_argument("--runs", type=int, default=SETTINGS["BENCH_RUNS"])
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--dry-run", action="store_true", help="Sadece adayları listele")
+    return parser.parse_args()
+
+
+def main():
+    args   = parse_args()
+    flags  = cpu_flags()
+    native = native_arch(args.src)
+    arches = args.arch or candidate_arches(flags, native, args.max_candidates)
+    modes  = [True, False] if args.compare_pgo else [not args.no_pgo]
+
+    print(f"🔍 CPU: {platform.processor() or platform.machine()} | native: {native} | "
+          f"adaylar: {', '.join(arches)}", flush=True)
+    if args.dry_run or not arches:
+        return 0 if arches else 1
+
+    os.makedirs(args.cache, exist_ok=True)
+    restore_networks(args.src, args.cache)
+
+    rows = []
+    for arch in arches:
+        for pgo in modes:
+            label = f"{arch}{'-pgo' if pgo else ''}"
+            print(f"🔨 Derleniyor: {label} ...", flush=True)
+            binary, seconds = build(args.src, arch, pgo, args.comp, args.jobs,
+                                    os.path.join(args.cache, f"{label}.log"))
+            row = {"arch": arch, "pgo": pgo, "build_s": round(seconds, 1), "ok": binary is not None}
+            if binary is not None:
+                save_networks(args.src, args.cache)
+                kept = os.path.join(args.cache, f"stockfish-{label}")
+                shutil.copyfile(binary, kept)
+                os.chmod(kept, 0o755)
+                nps, runs, signature = bench(kept, args.runs)
+                row.update({"binary": kept, "nps": nps, "nps_runs": runs, "signature": signature})
+                print(f"   📊 {label}: {nps or 0:,} nps (imza: {signature})", flush=True)
+            else:
+                print(f"   ❌ {label} derlenemedi (log: {args.cache}/{label}.log)", flush=True)
+            rows.append(row)
+
+    # Aynı kaynaktan çıkan tüm derlemeler aynı düğüm sayısını vermeli; vermeyen hatalıdır
+    signatures = [r["signature"] for r in rows if r.get("nps")]
+    expected   = statistics.mode(signatures) if signatures else None
+    valid      = [r for r in rows if r.get("nps") and r["signature"] == expected]
+    best       = max(valid, key=lambda r: r["nps"]) if valid else None
+
+    if best:
+        install(best["binary"], args.install)
+        print(f"✅ Kuruldu: {best['arch']}{' (PGO)' if best['pgo'] else ''} → {args.install} "
+              f"| {best['nps']:,} nps", flush=True)
+    else:
+        print("🚨 Geçerli derleme yok; mevcut motor korunuyor.", flush=True)
+
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump({
+            "ts":        time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "machine":   platform.machine(),
+            "cpu":       platform.processor(),
+            "native":    native,
+            "flags":     sorted(f for f in flags if f.startswith(("avx", "bmi", "sse", "popcnt", "vnni"))),
+            "signature": expected,
+            "builds":    rows,
+            "installed": best and {k: best[k] for k in ("arch", "pgo", "nps")},
+        }, f, indent=2)
+    return 0 if best else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import yaml
+
+from engines import open_engine
+from match_runner import EngineSpec, Match, load_openings
+from matchmaking import SETTINGS as MM_SETTINGS, _parse_tc
+
+# ==========================================================
+# ⚙️ AYARLAR
+# ==========================================================
+SETTINGS = {
+    "ENGINE_PATH":     "./src/Ethereal",
+    "CONFIG_PATH":     "./config.yml",
+    "CHECKPOINT":      "./spsa_state.json",
+    "OUTPUT":          "./tuned_options.yml",
+    "ITERATIONS":      2000,
+    "PAIRS":           max(1, (os.cpu_count() or 2) // 2),   # İterasyon başına oyun çifti (eşzamanlı)
+    # Bullet ağırlıklı TC karışımı; her iterasyon birini ağırlığına göre seçer
+    "TC_MIX":          {"30": 2, "60": 3, "60+1": 3, "120+1": 2},
+    # Fishtest varsayılanları (tune.cpp çıktısıyla aynı): c_end = aralık / 20, r_end = 0.002
+    "C_END_DIVISOR":   20.0,
+    "R_END":           0.002,
+    "ALPHA":           0.602,
+    "GAMMA":           0.101,
+    "A_RATIO":         0.1,      # A = A_RATIO × iterasyon sayısı
+}
+
+# Motorun kendi spin seçenekleri; TUNE() dışı olduğu için ayarlanmaz
+STANDARD_SPINS = {
+    "Threads", "Hash", "MultiPV", "Skill Level", "Move Overhead", "nodestime",
+    "UCI_Elo", "SyzygyProbeDepth", "SyzygyProbeLimit",
+}
+
+
+def tunable_options(engine_path, include=None):
+    """Motorun 'uci' ile duyurduğu TUNE() parametreleri: {isim: (varsayılan, min, max)}."""
+    eng = open_engine(engine_path)
+    try:
+        params = {}
+        for name, opt in eng.options.items():
+            if opt.type != "spin" or name in STANDARD_SPINS:
+                continue
+            if include and not any(p in name for p in include):
+                continue
+            params[name] = (int(opt.default), int(opt.min), int(opt.max))
+        return params
+    finally:
+        eng.quit()
+
+
+class SPSA:
+    """Fishtest tarzı SPSA: c_k = c / k^γ, a_k = a / (A + k)^α, θ += a_k · sonuç / c_k · Δ."""
+
+    def __init__(self, params, iterations):
+        self.names      = sorted(params)
+        self.bounds     = {n: params[n][1:] for n in self.names}
+        self.theta      = {n: float(params[n][0]) for n in self.names}
+        self.iterations = iterations
+        self.k          = 0
+        self.history    = []
+        self.A          = SETTINGS["A_RATIO"] * iterations
+        self.c          = {}
+        self.a          = {}
+        for n in self.names:
+            lo, hi = self.bounds[n]
+            c_end  = (hi - lo) / SETTINGS["C_END_DIVISOR"]
+            self.c[n] = c_end * iterations ** SETTINGS["GAMMA"]
+            self.a[n] = SETTINGS["R_END"] * c_end ** 2 * (self.A + iterations) ** SETTINGS["ALPHA"]
+
+    def _clamp(self, n, v):
+        lo, hi = self.bounds[n]
+        return min(hi, max(lo, v))
+
+    def perturb(self):
+        """(θ+, θ-, Δ, c_k) — tam sayıya yuvarlanmış UCI değerleri."""
+        k      = self.k + 1
+        delta  = {n: random.choice((-1, 1)) for n in self.names}
+        ck     = {n: self.c[n] / k ** SETTINGS["GAMMA"] for n in self.names}
+        plus   = {n: int(round(self._clamp(n, self.theta[n] + ck[n] * delta[n]))) for n in self.names}
+        minus  = {n: int(round(self._clamp(n, self.theta[n] - ck[n] * delta[n]))) for n in self.names}
+        return plus, minus, delta, ck
+
+    def update(self, result, delta, ck):
+        """result: θ+'nın θ-'ya karşı net skoru (galibiyet − mağlubiyet)."""
+        self.k += 1
+        for n in self.names:
+            ak = self.a[n] / (self.A + self.k) ** SETTINGS["ALPHA"]
+            self.theta[n] = self._clamp(n, self.theta[n] + ak * result * delta[n] / ck[n])
+        self.history.append((self.k, result))
+
+    def values(self):
+        return {n: int(round(v)) for n, v in self.theta.items()}
+
+    def save(self, path):
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"k": self.k, "iterations": self.iterations, "theta": self.theta,
+                       "bounds": self.bounds, "history": self.history[-1000:]}, f, indent=1)
+        os.replace(tmp, path)
+
+    def load(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if set(state["theta"]) != set(self.names):
+            raise ValueError("Checkpoint parametreleri motorun duyurduklarıyla uyuşmuyor")
+        self.k       = state["k"]
+        self.theta   = {n: float(v) for n, v in state["theta"].items()}
+        self.history = [tuple(h) for h in state.get("history", [])]
+
+
+def write_options(path, values, base):
+    """config.yml engine.uci_options'a yapıştırılabilir YAML."""
+    options = dict(base)
+    options.update(values)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"# SPSA sonucu — {time.strftime('%Y-%m-%d %H:%M')}\n")
+        yaml.safe_dump({"engine": {"uci_options": options}}, f, sort_keys=False, allow_unicode=True)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="TUNE() parametrelerini SPSA ile ayarlar")
+    parser.add_argument("--engine", default=SETTINGS["ENGINE_PATH"])
+    parser.add_argument("--config", default=SETTINGS["CONFIG_PATH"])
+    parser.add_argument("--iterations", type=int, default=SETTINGS["ITERATIONS"])
+    parser.add_argument("--pairs", type=int, default=SETTINGS["PAIRS"])
+    parser.add_argument("--tc", action="append", choices=MM_SETTINGS["TC_ALL"],
+                        help="Sadece bu TC'ler (varsayılan: TC_MIX)")
+    parser.add_argument("--param", action="append", help="Sadece adı bunu içeren parametreler")
+    parser.add_argument("--openings", help="EPD açılış dosyası")
+    parser.add_argument("--checkpoint", default=SETTINGS["CHECKPOINT"])
+    parser.add_argument("--output", default=SETTINGS["OUTPUT"])
+    return parser.parse_args()
+
+
+def main():
+    args   = parse_args()
+    params = tunable_options(args.engine, args.param)
+    if not params:
+        print("❌ Motor TUNE() parametresi duyurmuyor (tune.cpp'de TUNE(...) ile derleyin).", flush=True)
+        return 1
+
+    base = {}
+    try:
+        with open(args.config, "r", encoding="utf-8") as f:
+            base = dict((yaml.safe_load(f) or {}).get("engine", {}).get("uci_options", {}) or {})
+    except FileNotFoundError:
+        pass
+    configured = dict(base)
+    # Çiftler çekirdeklere dağıtılır: motor başına tek thread, ponder kapalı
+    base.update({"Threads": 1, "Ponder": False})
+
+    spsa = SPSA(params, args.iterations)
+    if os.path.exists(args.checkpoint):
+        spsa.load(args.checkpoint)
+        print(f"♻️ Checkpoint yüklendi: iterasyon {spsa.k}", flush=True)
+
+    mix      = {tc: 1 for tc in args.tc} if args.tc else SETTINGS["TC_MIX"]
+    openings = load_openings(args.openings)
+    print(f"🎛️ {len(params)} parametre | {args.iterations} iterasyon × {args.pairs} çift | "
+          f"TC: {', '.join(mix)}", flush=True)
+
+    try:
+        while spsa.k < args.iterations:
+            plus, minus, delta, ck = spsa.perturb()
+            tc     = random.choices(list(mix), weights=list(mix.values()))[0]
+            chosen = random.sample(openings, min(args.pairs, len(openings)))
+            match  = Match(EngineSpec("plus", args.engine, {**base, **plus}),
+                           EngineSpec("minus", args.engine, {**base, **minus}),
+                           _parse_tc(tc), chosen, 2 * args.pairs, args.pairs, verbose=False)
+            summary = match.run()
+            spsa.update(summary["wins"] - summary["losses"], delta, ck)
+            spsa.save(args.checkpoint)
+            if spsa.k % 10 == 0 or spsa.k == args.iterations:
+                shown = ", ".join(f"{n}={v}" for n, v in list(spsa.values().items())[:6])
+                print(f"   🔁 {spsa.k}/{args.iterations} | {tc} | {shown}"
+                      f"{' ...' if len(params) > 6 else ''}", flush=True)
+    except KeyboardInterrupt:
+        print("⏸️ Durduruldu; checkpoint'ten devam edilebilir.", flush=True)
+
+    write_options(args.output, spsa.values(), configured)
+    print(f"✅ Ayarlar yazıldı: {args.output}", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
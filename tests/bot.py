@@ -0,0 +1,343 @@
+import importlib.util
+import pathlib
+import sys
+import time
+
+import chess
+
+PATH = pathlib.Path(__file__).parent.resolve()
+ROOT = PATH.parent
+
+sys.path.insert(0, str(ROOT))
+
+from testing import MiniTestFramework, OrderedClassMembers
+
+import adjudication
+from adjudication import GameAdjudicator
+from deadlines import TimerWheel
+from emergency_search import Position, perft
+from position_cache import PositionCache
+
+
+def load_bot():
+    # Dosya adında tire olduğu için normal import ile yüklenemez
+    spec = importlib.util.spec_from_file_location("lichess_bot", ROOT / "lichess-bot.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+KIWIPETE = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+
+
+class TestMoveStreamDecoder(metaclass=OrderedClassMembers):
+    def beforeAll(self):
+        self.Decoder = load_bot().MoveStreamDecoder
+
+    def test_incremental_offsets(self):
+        decoder = self.Decoder()
+
+        assert decoder.update("") == (0, False)
+        assert decoder.update("e2e4") == (1, False)
+        assert decoder.offset == 4
+        assert decoder.update("e2e4 e7e5 g1f3") == (2, False)
+        assert decoder.offset == 14
+        assert decoder.update("e2e4 e7e5 g1f3") == (0, False)
+        assert decoder.board == chess.Board("rnbqkbnr/pppp1ppp/8/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R b KQkq - 1 2")
+        assert decoder.rebuilds == 0
+
+    def test_initial_fen(self):
+        fen = "4k3/8/8/8/8/8/4P3/4K3 w - - 0 1"
+        decoder = self.Decoder(fen)
+
+        assert decoder.update("e2e4 e8d7") == (2, False)
+        assert decoder.board.fen() == "8/3k4/8/8/4P3/8/8/4K3 w - - 1 2"
+
+    def test_takeback(self):
+        decoder = self.Decoder()
+        decoder.update("e2e4 e7e5 g1f3")
+
+        assert decoder.update("e2e4 e7e5") == (0, True)
+        assert len(decoder.board.move_stack) == 2
+        assert decoder.offset == 9
+        assert decoder.rebuilds == 0
+
+        # Geri alınan hamlenin yerine farklı bir hamle gelirse yine artımlı devam edilir
+        assert decoder.update("e2e4 e7e5 b1c3") == (1, False)
+        assert decoder.board.peek() == chess.Move.from_uci("b1c3")
+
+    def test_mismatch_rebuilds(self):
+        decoder = self.Decoder()
+        decoder.update("e2e4 e7e5")
+
+        assert decoder.update("d2d4 d7d5 c2c4") == (3, True)
+        assert decoder.rebuilds == 1
+        assert decoder.board.move_stack == [chess.Move.from_uci(m) for m in ("d2d4", "d7d5", "c2c4")]
+
+    def test_rebuild_after_value_error(self):
+        decoder = self.Decoder()
+        decoder.update("e2e4 e7e5")
+
+        try:
+            decoder.update("e2e4 e7e5 e1e3")
+            assert False, "illegal move accepted"
+        except ValueError:
+            pass
+        assert decoder.dirty
+
+        assert decoder.update("e2e4 e7e5 g1f3") == (3, True)
+        assert not decoder.dirty
+        assert decoder.rebuilds == 1
+        assert len(decoder.board.move_stack) == 3
+
+
+class TestTimerWheel(metaclass=OrderedClassMembers):
+    def advances_until_due(self, wheel, timer, limit=100):
+        for n in range(1, limit + 1):
+            if timer in wheel._advance():
+                return n
+        return None
+
+    def test_slot_math(self):
+        wheel = TimerWheel(tick=1.0, slots=8)
+        timer = wheel.schedule(3, None)
+
+        assert timer.rounds == 0
+        assert timer in wheel.slots[4]
+        assert self.advances_until_due(wheel, timer) == 4
+
+    def test_partial_tick_rounds_up(self):
+        wheel = TimerWheel(tick=1.0, slots=8)
+
+        assert self.advances_until_due(wheel, wheel.schedule(2.1, None)) == 4
+
+    def test_full_round_lands_on_cursor(self):
+        wheel = TimerWheel(tick=1.0, slots=8)
+        for _ in range(3):
+            wheel._advance()
+        timer = wheel.schedule(7, None)
+
+        assert timer.rounds == 0
+        assert timer in wheel.slots[wheel.cursor]
+        assert self.advances_until_due(wheel, timer) == 8
+
+    def test_multiple_rounds(self):
+        wheel = TimerWheel(tick=1.0, slots=8)
+        timer = wheel.schedule(20, None)
+
+        assert timer.rounds == 2
+        assert timer in wheel.slots[5]
+        assert self.advances_until_due(wheel, timer) == 21
+
+    def test_cancel(self):
+        wheel = TimerWheel(tick=1.0, slots=8)
+        kept = wheel.schedule(3, None)
+        dropped = wheel.schedule(3, None)
+        dropped.cancel()
+
+        for _ in range(3):
+            wheel._advance()
+        assert wheel._advance() == [kept]
+        assert wheel.slots[4] == []
+
+    def test_cancel_waiting_round(self):
+        wheel = TimerWheel(tick=1.0, slots=8)
+        timer = wheel.schedule(10, None)
+
+        for _ in range(3):
+            wheel._advance()
+        assert timer in wheel.slots[3]
+
+        timer.cancel()
+        due = []
+        for _ in range(16):
+            due += wheel._advance()
+        assert due == []
+        assert all(not slot for slot in wheel.slots)
+
+    def test_thread_fires_callback(self):
+        wheel = TimerWheel(tick=0.01, slots=8).start()
+        fired = []
+        wheel.schedule(0.02, fired.append, "late")
+        wheel.schedule(0.02, fired.append, "never").cancel()
+
+        deadline = time.monotonic() + 2
+        while not fired and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.05)
+        assert fired == ["late"]
+
+
+class TestPositionCache(metaclass=OrderedClassMembers):
+    MOVE = chess.Move.from_uci("e2e4")
+
+    def beforeEach(self):
+        self.board = chess.Board()
+        self.cache = PositionCache("cache.bin", buckets=16)
+
+    def afterEach(self):
+        self.cache.close()
+        pathlib.Path("cache.bin").unlink()
+
+    def reopen(self):
+        self.cache.close()
+        self.cache = PositionCache("cache.bin", buckets=16)
+
+    def store(self, key, depth):
+        return self.cache.store(self.board, self.MOVE, 10, depth, 1.0, key=key)
+
+    def probe(self, key):
+        return self.cache.probe(self.board, key=key)
+
+    def test_roundtrip(self):
+        move = chess.Move.from_uci("a7a8q")
+        assert self.cache.store(self.board, move, -40000, 20, 2.5, key=7)
+
+        entry = self.probe(7)
+        assert entry.move == move
+        assert entry.score == -32000
+        assert entry.depth == 20
+        assert entry.seconds == 2.5
+        assert self.probe(7 + 16) is None
+
+    def test_shallow_not_stored(self):
+        assert not self.store(1, 15)
+        assert self.probe(1) is None
+
+    def test_same_key_replacement(self):
+        assert self.store(1, 30)
+        assert not self.store(1, 27)
+        assert self.probe(1).depth == 30
+        assert self.store(1, 28)
+        assert self.probe(1).depth == 28
+
+    def test_bucket_replaces_shallowest(self):
+        # Aynı kovaya düşen anahtarlar: alt 4 bit eşit
+        for i, depth in enumerate((24, 18, 30, 22)):
+            assert self.store(3 + 16 * i, depth)
+
+        assert self.store(3 + 16 * 4, 20)
+        assert self.probe(3 + 16 * 1) is None
+        for i in (0, 2, 3, 4):
+            assert self.probe(3 + 16 * i) is not None
+
+    def test_depth_minus_age_eviction(self):
+        assert self.store(5, 30)
+        self.reopen()
+        assert self.cache.generation == 2
+
+        for i in (1, 2, 3):
+            assert self.store(5 + 16 * i, 25)
+
+        # Eski kayıt daha derin ama 30 - 8 × 1 = 22 < 25, önce o gider
+        assert self.store(5 + 16 * 4, 20)
+        assert self.probe(5) is None
+        for i in (1, 2, 3, 4):
+            assert self.probe(5 + 16 * i) is not None
+
+    def test_persistence(self):
+        assert self.store(9, 20)
+        self.reopen()
+        assert self.probe(9).depth == 20
+
+
+class TestAdjudicator(metaclass=OrderedClassMembers):
+    def beforeAll(self):
+        self.saved = (adjudication.SETTINGS["ENABLED"], adjudication.SETTINGS["RESIGN_RATED_HUMANS"])
+
+    def afterEach(self):
+        adjudication.SETTINGS["ENABLED"], adjudication.SETTINGS["RESIGN_RATED_HUMANS"] = self.saved
+
+    def board_after(self, fen, moves):
+        board = chess.Board(fen)
+        for move in moves.split():
+            board.push_uci(move)
+        return board
+
+    def test_claim_fifty_moves(self):
+        adj = GameAdjudicator("blitz", rated=True, vs_human=True)
+
+        board = chess.Board("8/8/4k3/8/8/2R5/4K3/8 w - - 99 80")
+        assert adj.decide(board, False) != 'claim_draw'
+
+        board.push_uci("c3c4")
+        assert board.halfmove_clock == 100
+        assert adj.decide(board, False) == 'claim_draw'
+
+    def test_claim_threefold(self):
+        adj = GameAdjudicator("blitz", rated=True, vs_human=True)
+        board = chess.Board()
+        for move in "g1f3 g8f6 f3g1 f6g8 g1f3 g8f6 f3g1".split():
+            board.push_uci(move)
+        assert adj.decide(board, False) != 'claim_draw'
+
+        board.push_uci("f6g8")
+        assert adj.decide(board, False) == 'claim_draw'
+
+    def test_no_claim_when_ahead(self):
+        adj = GameAdjudicator("blitz", rated=True, vs_human=True)
+        adj.record({"score": 300, "source": "engine"})
+        board = chess.Board("8/8/4k3/8/8/2R5/4K3/8 w - - 100 80")
+
+        assert adj.decide(board, False) != 'claim_draw'
+
+    def test_may_resign(self):
+        assert not GameAdjudicator("blitz", rated=True, vs_human=True).may_resign
+        assert GameAdjudicator("blitz", rated=False, vs_human=True).may_resign
+        assert GameAdjudicator("blitz", rated=True, vs_human=False).may_resign
+
+        adjudication.SETTINGS["RESIGN_RATED_HUMANS"] = True
+        assert GameAdjudicator("blitz", rated=True, vs_human=True).may_resign
+
+    def test_resign_streak(self):
+        adj = GameAdjudicator("blitz", rated=False, vs_human=True)
+        board = chess.Board()
+        for _ in range(5):
+            adj.record({"score": -1200, "source": "engine"})
+            assert adj.decide(board, False) is None
+
+        adj.record({"score": -1200, "source": "engine"})
+        assert adj.decide(board, False) == 'resign'
+
+    def test_rated_human_accepts_instead_of_resigning(self):
+        adj = GameAdjudicator("blitz", rated=True, vs_human=True)
+        board = chess.Board()
+        adj.record({"wdl": -2, "score": -900, "source": "tablebase"})
+
+        assert adj.decide(board, False) is None
+        assert adj.decide(board, True) == 'accept_draw'
+
+    def test_tablebase_loss_resigns(self):
+        adj = GameAdjudicator("blitz", rated=False, vs_human=False)
+        adj.record({"wdl": -2, "source": "tablebase"})
+
+        assert adj.decide(chess.Board(), False) == 'resign'
+
+    def test_disabled(self):
+        adjudication.SETTINGS["ENABLED"] = False
+        adj = GameAdjudicator("blitz", rated=False, vs_human=False)
+        adj.record({"wdl": -2, "source": "tablebase"})
+
+        assert adj.decide(chess.Board(), False) is None
+
+
+class TestEmergencySearch(metaclass=OrderedClassMembers):
+    def test_perft_startpos(self):
+        pos = Position(chess.Board())
+        assert [perft(pos, d) for d in (1, 2, 3)] == [20, 400, 8902]
+
+    def test_perft_kiwipete(self):
+        pos = Position(chess.Board(KIWIPETE))
+        assert [perft(pos, d) for d in (1, 2, 3)] == [48, 2039, 97862]
+
+
+if __name__ == "__main__":
+    framework = MiniTestFramework()
+
+    # Her test grubu geçici bir dizinde çalışır
+    framework.run([TestMoveStreamDecoder, TestTimerWheel, TestPositionCache, TestAdjudicator, TestEmergencySearch])
+
+    if framework.has_failed():
+        sys.exit(1)
+
+    sys.exit(0)
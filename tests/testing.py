@@ -10,11 +10,12 @@ from functools import wraps
 from contextlib import redirect_stdout
 import io
 import tarfile
+import hashlib
+import json
 import pathlib
 import concurrent.futures
 import tempfile
 import shutil
-import requests
 
 CYAN_COLOR = "\033[36m"
 GRAY_COLOR = "\033[2m"
@@ -83,30 +84,200 @@ r4rk1/1b2ppbp/pq4pn/2pp1PB1/1p2P3/1P1P1NN1/1PP3PP/R2Q1RK1 w - - 0 13
 
 
 class Syzygy:
+    URL = "https://api.github.com/repos/niklasf/python-chess/tarball/9b9aa13f9f36d08aadfabff872882f4ab1494e95"
+    SUFFIXES = (".rtbw", ".rtbz")
+
+    # Optional pin for the tarball digest. When unset, the digest recorded on the
+    # first download is trusted and every later cache hit is verified against it.
+    TARBALL_SHA256 = os.environ.get("SYZYGY_TARBALL_SHA256", "")
+
     @staticmethod
     def get_syzygy_path():
         return os.path.abspath("syzygy")
 
     @staticmethod
-    def download_syzygy():
-        if not os.path.isdir(os.path.join(PATH, "syzygy")):
-            url = "https://api.github.com/repos/niklasf/python-chess/tarball/9b9aa13f9f36d08aadfabff872882f4ab1494e95"
-            file = "niklasf-python-chess-9b9aa13"
+    def get_cache_dir():
+        cache_dir = os.environ.get("SYZYGY_CACHE_DIR")
+        if not cache_dir:
+            base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+                os.path.expanduser("~"), ".cache"
+            )
+            cache_dir = os.path.join(base, "stockfish-tests", "syzygy")
+        return os.path.abspath(cache_dir)
 
-            with tempfile.TemporaryDirectory() as tmpdirname:
-                tarball_path = os.path.join(tmpdirname, f"{file}.tar.gz")
+    @staticmethod
+    def sha256(path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _ref_path(cache_dir: str) -> str:
+        url_key = hashlib.sha256(Syzygy.URL.encode()).hexdigest()[:16]
+        return os.path.join(cache_dir, "refs", url_key)
+
+    @staticmethod
+    def _verify_tarball(tarball_path: str) -> str:
+        digest = Syzygy.sha256(tarball_path)
+        if Syzygy.TARBALL_SHA256 and digest != Syzygy.TARBALL_SHA256:
+            raise RuntimeError(
+                f"Syzygy tarball checksum mismatch: got {digest}, "
+                f"expected {Syzygy.TARBALL_SHA256}"
+            )
+        return digest
+
+    @staticmethod
+    def _cached_tarball_valid(tarball_path: str, digest: str) -> bool:
+        # The file name is the digest of its content, anything else is corruption
+        actual = Syzygy.sha256(tarball_path)
+        if actual != digest:
+            return False
+        return not Syzygy.TARBALL_SHA256 or actual == Syzygy.TARBALL_SHA256
+
+    @staticmethod
+    def _fetch_tarball(cache_dir: str) -> str:
+        tarball_dir = os.path.join(cache_dir, "tarballs")
+        os.makedirs(tarball_dir, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=tarball_dir, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                # An explicitly provided tarball always wins, this is how
+                # air-gapped machines seed their cache.
+                local = os.environ.get("SYZYGY_TARBALL")
+                if local:
+                    with open(local, "rb") as source:
+                        shutil.copyfileobj(source, f)
+                else:
+                    Syzygy._download(f, cache_dir)
+
+            digest = Syzygy._verify_tarball(tmp_path)
+            os.replace(tmp_path, os.path.join(tarball_dir, f"{digest}.tar.gz"))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        ref_path = Syzygy._ref_path(cache_dir)
+        os.makedirs(os.path.dirname(ref_path), exist_ok=True)
+        with open(ref_path, "w") as f:
+            f.write(digest)
+
+        return digest
+
+    @staticmethod
+    def _download(f, cache_dir: str):
+        # Only needed on a cache miss, offline machines may not have it installed
+        import requests
+
+        try:
+            response = requests.get(Syzygy.URL, stream=True, timeout=60)
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=8192):
+                f.write(chunk)
+        except requests.RequestException as e:
+            raise RuntimeError(
+                f"Syzygy tables are not cached in {cache_dir} and the download "
+                f"failed ({e}). Set SYZYGY_TARBALL to a local copy of {Syzygy.URL}"
+            )
 
-                response = requests.get(url, stream=True)
-                with open(tarball_path, "wb") as f:
-                    for chunk in response.iter_content(chunk_size=8192):
+    @staticmethod
+    def _populate(cache_dir: str, digest: str) -> dict:
+        tarball_path = os.path.join(cache_dir, "tarballs", f"{digest}.tar.gz")
+        objects_dir = os.path.join(cache_dir, "objects")
+        os.makedirs(objects_dir, exist_ok=True)
+
+        files = {}
+        with tarfile.open(tarball_path, "r:gz") as tar:
+            for member in tar:
+                name = os.path.basename(member.name)
+                if not member.isfile() or not name.endswith(Syzygy.SUFFIXES):
+                    continue
+                if name in files:
+                    continue
+
+                source = tar.extractfile(member)
+                fd, tmp_path = tempfile.mkstemp(dir=objects_dir, suffix=".part")
+                file_digest = hashlib.sha256()
+                with os.fdopen(fd, "wb") as f:
+                    for chunk in iter(lambda: source.read(1 << 16), b""):
+                        file_digest.update(chunk)
                         f.write(chunk)
 
-                with tarfile.open(tarball_path, "r:gz") as tar:
-                    tar.extractall(tmpdirname)
+                files[name] = file_digest.hexdigest()
+                os.replace(tmp_path, os.path.join(objects_dir, files[name]))
 
-                shutil.move(
-                    os.path.join(tmpdirname, file), os.path.join(PATH, "syzygy")
-                )
+        if not files:
+            raise RuntimeError(f"No Syzygy tables found in {tarball_path}")
+
+        manifest_dir = os.path.join(cache_dir, "manifests")
+        os.makedirs(manifest_dir, exist_ok=True)
+        with open(os.path.join(manifest_dir, f"{digest}.json"), "w") as f:
+            json.dump({"tarball": digest, "files": files}, f, indent=1, sort_keys=True)
+
+        return files
+
+    @staticmethod
+    def _load_manifest(cache_dir: str):
+        try:
+            with open(Syzygy._ref_path(cache_dir)) as f:
+                digest = f.read().strip()
+        except FileNotFoundError:
+            return None, None
+
+        try:
+            with open(os.path.join(cache_dir, "manifests", f"{digest}.json")) as f:
+                return digest, json.load(f)["files"]
+        except (FileNotFoundError, ValueError, KeyError):
+            return digest, None
+
+    @staticmethod
+    def _objects_valid(cache_dir: str, files: dict) -> bool:
+        for digest in files.values():
+            obj = os.path.join(cache_dir, "objects", digest)
+            if not os.path.isfile(obj) or Syzygy.sha256(obj) != digest:
+                return False
+        return True
+
+    @staticmethod
+    def _link(cache_dir: str, files: dict, target: str):
+        os.makedirs(target, exist_ok=True)
+        for name, digest in files.items():
+            obj = os.path.join(cache_dir, "objects", digest)
+            dst = os.path.join(target, name)
+
+            if os.path.exists(dst):
+                if os.path.samefile(obj, dst):
+                    continue
+                os.remove(dst)
+
+            try:
+                os.link(obj, dst)
+            except OSError:
+                # Cache and test tree live on different filesystems
+                shutil.copyfile(obj, dst)
+
+    @staticmethod
+    def download_syzygy():
+        cache_dir = Syzygy.get_cache_dir()
+        target = os.path.join(PATH, "syzygy")
+
+        digest, files = Syzygy._load_manifest(cache_dir)
+
+        if files is None or not Syzygy._objects_valid(cache_dir, files):
+            tarball = digest and os.path.join(cache_dir, "tarballs", f"{digest}.tar.gz")
+
+            if tarball and os.path.isfile(tarball) and not Syzygy._cached_tarball_valid(tarball, digest):
+                os.remove(tarball)
+
+            if not tarball or not os.path.isfile(tarball):
+                digest = Syzygy._fetch_tarball(cache_dir)
+
+            files = Syzygy._populate(cache_dir, digest)
+
+        Syzygy._link(cache_dir, files, target)
 
 
 class OrderedClassMembers(type):